@@ -1,3 +1,7 @@
 #!/usr/bin/env python3
 from .basic_agent import BasicStrategyAgent
-from .q_agent import QLearningAgent
\ No newline at end of file
+from .q_agent import QLearningAgent
+from .optimal_agent import OptimalStrategyAgent
+from .q_table import QTable, StateIndex, CanonicalIndex
+from .replay_buffer import ReplayBuffer
+from .lambda_agent import QLambdaAgent
@@ -1 +1,126 @@
 #!/usr/bin/env python3
+import numpy as np
+import torch
+from torch import nn
+
+from blackjack.strategy import hand_category
+from .policy import QNetwork, encode_states, epsilon_greedy, BASE_FEATURES, COUNT_FEATURES
+from .replay_buffer import ReplayBuffer
+
+
+class DQNAgent:
+    def __init__(self, actions=(0, 1, 2, 3), count_features=False, hidden=(128, 128), lr=1e-3, gamma=1.0,
+                 batch_size=1024, buffer_size=1000000, target_sync=500, epsilon=1.0, epsilon_min=0.05,
+                 epsilon_steps=20000, reward_scale=0.1, seed=None):
+        """
+        Double DQN agent for batched environments.
+
+        States are StrategyTable-style rows (see encode_states), optionally with
+        the shoe's count features, so one network covers every hand the tabular
+        agents see and can also condition on the count.
+        Args:
+            actions: List of possible actions.
+            count_features: Feed the true count and penetration to the network.
+            hidden: Sizes of the hidden layers.
+            lr: Adam learning rate.
+            gamma: Discount factor.
+            batch_size: Transitions per gradient step.
+            buffer_size: Replay buffer capacity.
+            target_sync: Gradient steps between two copies of the online network into the target network.
+            epsilon: Initial exploration rate.
+            epsilon_min: Final exploration rate.
+            epsilon_steps: Environment steps over which epsilon decays linearly to epsilon_min.
+            reward_scale: Factor applied to the env's x10 rewards before learning.
+            seed: Seed for torch, exploration and replay sampling.
+        """
+        if seed is not None:
+            torch.manual_seed(seed)
+        self.actions = list(actions)
+        self.count_features = count_features
+        self.n_features = BASE_FEATURES + (COUNT_FEATURES if count_features else 0)
+        self.online = QNetwork(self.n_features, len(self.actions), hidden)
+        self.target = QNetwork(self.n_features, len(self.actions), hidden)
+        self.target.load_state_dict(self.online.state_dict())
+        self.optimizer = torch.optim.Adam(self.online.parameters(), lr=lr)
+        self.buffer = ReplayBuffer(buffer_size, self.n_features, seed=seed)
+        self.rng = np.random.default_rng(seed)
+        self.gamma = gamma
+        self.batch_size = batch_size
+        self.target_sync = target_sync
+        self.epsilon = epsilon
+        self.epsilon_start = epsilon
+        self.epsilon_min = epsilon_min
+        self.epsilon_steps = epsilon_steps
+        self.reward_scale = reward_scale
+        self.steps = 0
+        self.updates = 0
+
+    def q_values(self, features):
+        """Online-network Q-values of a float32 feature array, as a NumPy array."""
+        with torch.no_grad():
+            return self.online(torch.from_numpy(features)).numpy()
+
+    def act(self, features, explore=True):
+        """Epsilon-greedy (or greedy) actions for a batch of feature rows."""
+        return epsilon_greedy(self.q_values(features), self.epsilon if explore else 0.0, self.rng)
+
+    def choose_actions(self, states, counts=None):
+        """
+        Greedy actions for a batch of hands, interchangeable with BasicStrategyAgent.choose_actions.
+        Args:
+            states: Integer array of shape (n, 4) from BatchedBlackjackEnv.strategy_states().
+            counts: Count features from BatchedBlackjackEnv.count_observation(), needed with count_features.
+        Returns:
+            np.ndarray: Actions of shape (n,).
+        """
+        return self.act(encode_states(states, counts if self.count_features else None), explore=False)
+
+    def choose_action(self, state):
+        """
+        Determine the greedy action for one hand (counts are not available here and are fed as zero).
+        Args:
+            state: Tuple (player_total, dealer_card, usable_ace, player_cards).
+        Returns:
+            int: Action (0 = Stick, 1 = Hit, 2 = Double Down, 3 = Split).
+        """
+        player_total, dealer_card, usable_ace, player_cards = state
+        category, value = hand_category(player_total, usable_ace, player_cards)
+        row = np.array([[category, value, dealer_card, len(player_cards) == 2]])
+        counts = (np.zeros(1), np.zeros(1), np.zeros(1)) if self.count_features else None
+        return int(self.act(encode_states(row, counts), explore=False)[0])
+
+    def observe(self, features, actions, rewards, next_features, dones):
+        """Store a batch of transitions and advance the exploration schedule by one env step."""
+        self.buffer.add_batch(features, actions, rewards * self.reward_scale, next_features, dones)
+        self.steps += 1
+        fraction = min(1.0, self.steps / self.epsilon_steps)
+        self.epsilon = self.epsilon_start + fraction * (self.epsilon_min - self.epsilon_start)
+
+    def learn(self):
+        """
+        One gradient step on a replay minibatch with double-DQN targets and a Huber loss.
+        Returns:
+            float: The minibatch loss.
+        """
+        batch = self.buffer.sample(self.batch_size)
+        features = torch.from_numpy(batch["features"])
+        next_features = torch.from_numpy(batch["next_features"])
+        actions = torch.from_numpy(batch["action"].astype(np.int64))
+        rewards = torch.from_numpy(batch["reward"])
+        not_done = torch.from_numpy(~batch["done"]).float()
+
+        with torch.no_grad():
+            # The online network picks the next action, the target network values it
+            next_actions = self.online(next_features).argmax(dim=1, keepdim=True)
+            next_values = self.target(next_features).gather(1, next_actions).squeeze(1)
+            targets = rewards + self.gamma * not_done * next_values
+        predicted = self.online(features).gather(1, actions.unsqueeze(1)).squeeze(1)
+        loss = nn.functional.smooth_l1_loss(predicted, targets)
+
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+        self.updates += 1
+        if self.updates % self.target_sync == 0:
+            self.target.load_state_dict(self.online.state_dict())
+        return loss.item()
@@ -0,0 +1,101 @@
+from blackjack.rng import RandomStream
+from .q_table import QTable
+
+class QLambdaAgent:
+    def __init__(self, actions, gamma=1.0, lam=0.0, epsilon=1.0, epsilon_decay=0.99995, epsilon_min=0.05,
+                 alpha_power=0.85, min_alpha=0.0, bootstrap="max", state_index="cards", seed=None):
+        """
+        Tabular learner that updates once per episode from lambda-returns.
+
+        Transitions are buffered until the episode ends, then every visited
+        (state, action) moves towards its lambda-return with its own learning
+        rate 1 / visits ** alpha_power. This is the offline forward view of
+        accumulating eligibility traces: lam=1 gives every-visit Monte Carlo
+        (with alpha_power=1 each Q-value is the plain average of its returns),
+        lam=0 one-step bootstrapping. Epsilon decays once per episode.
+
+        The defaults came out of a grid over lam, alpha_power, the bootstrap
+        target and the epsilon schedule in training.convergence: they reach
+        the weighted basic-strategy agreement that main.py's Q-learning setup
+        has after 1M episodes in about 100k. Returns with lam near 1 stay
+        anchored to the exploratory play of early episodes, and expected-SARSA
+        targets trailed max targets at every budget tried.
+
+        Args:
+            actions: List of possible actions.
+            gamma: Discount factor.
+            lam: Trace decay between one-step (0) and Monte Carlo (1) targets.
+            epsilon: Initial exploration rate.
+            epsilon_decay: Multiplier applied to epsilon after every episode.
+            epsilon_min: Exploration floor.
+            alpha_power: Exponent of the visit-count learning rate; values in (0.5, 1] converge.
+            min_alpha: Learning-rate floor, for tracking a changing policy with lam < 1.
+            bootstrap: "max" for Q(lambda) targets, "expected" for expected-SARSA targets
+                under the current epsilon-greedy policy.
+            state_index: "cards" for a row per card composition, "canonical" for a row per hand class
+                (see CanonicalIndex), or a StateIndex instance.
+            seed: Seed of the exploration stream (int, SeedSequence or None for fresh entropy).
+        """
+        if bootstrap not in ("max", "expected"):
+            raise ValueError(f"Unknown bootstrap target: {bootstrap}")
+        self.q_table = QTable(len(actions), state_index)
+        self.rng = RandomStream(seed)
+        self.actions = actions
+        self.gamma = gamma
+        self.lam = lam
+        self.epsilon = epsilon
+        self.epsilon_decay = epsilon_decay
+        self.epsilon_min = epsilon_min
+        self.alpha_power = alpha_power
+        self.min_alpha = min_alpha
+        self.bootstrap = bootstrap
+        self._episode = []
+
+    def state_representation(self, player_total, dealer_card, usable_ace, player_cards):
+        """Convert the game state into its Q-table row (the total and ace follow from the cards)."""
+        return self.q_table.index.index(dealer_card, player_cards)
+
+    def seed(self, seed=None):
+        """Restart the exploration stream from ``seed``."""
+        self.rng = RandomStream(seed)
+
+    def choose_action(self, state):
+        """Choose action based on epsilon-greedy policy."""
+        if self.rng.random() < self.epsilon:
+            return self.rng.choice(self.actions)  # Explore
+        else:
+            return self.q_table.greedy_action(state)  # Exploit
+
+    def update(self, state, action, reward, next_state, done):
+        """Buffer a transition; the whole episode is learned from when it ends."""
+        self._episode.append((state, action, reward, next_state))
+        if done:
+            self._learn_episode()
+            self._episode = []
+            if self.epsilon > self.epsilon_min:
+                self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+
+    def _state_value(self, state):
+        row = self.q_table.values[state].tolist()
+        best = max(row)
+        if self.bootstrap == "max":
+            return best
+        # Expected value under epsilon-greedy: explore uniformly, otherwise take the greedy action
+        return self.epsilon * sum(row) / len(row) + (1 - self.epsilon) * best
+
+    def _learn_episode(self):
+        """Compute every lambda-return from the pre-episode values, then apply them."""
+        targets = []
+        ret = 0.0
+        for step, (state, action, reward, next_state) in enumerate(reversed(self._episode)):
+            if step == 0:
+                ret = reward  # The episode ended after this transition
+            else:
+                ret = reward + self.gamma * ((1 - self.lam) * self._state_value(next_state) + self.lam * ret)
+            targets.append((state, action, ret))
+
+        values, visits = self.q_table.values, self.q_table.visits
+        for state, action, ret in targets:
+            visits[state, action] += 1
+            alpha = max(self.min_alpha, float(visits[state, action]) ** -self.alpha_power)
+            values[state, action] += alpha * (ret - values[state, action])
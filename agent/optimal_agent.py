@@ -0,0 +1,26 @@
+from blackjack.solver import BlackjackSolver
+
+class OptimalStrategyAgent:
+    def __init__(self, solver=None):
+        """
+        Agent that plays the optimal policy computed by a BlackjackSolver
+        (exact for an infinite deck, approximate for a finite shoe; see BlackjackSolver).
+        Args:
+            solver: Solver providing the action values (infinite deck by default).
+        """
+        self.solver = solver or BlackjackSolver()
+        self.policy = self.solver.policy_table()  # Every two-card start is solved up front
+
+    def choose_action(self, state):
+        """
+        Determine the action with the highest expected value.
+        Args:
+            state: Tuple (player_total, dealer_card, usable_ace, player_cards).
+        Returns:
+            int: Action (0 = Stick, 1 = Hit, 2 = Double Down, 3 = Split).
+        """
+        _, dealer_card, _, player_cards = state
+        cards = tuple(sorted(player_cards))
+        if len(cards) == 2:
+            return self.policy[cards, dealer_card][0]
+        return self.solver.best_action(cards, dealer_card)
@@ -1 +1,74 @@
 #!/usr/bin/env python3
+import numpy as np
+import torch
+from torch import nn
+
+from blackjack.strategy import HARD, SOFT, PAIR
+
+BASE_FEATURES = 15  # Total, soft, can double, pair, pair rank, dealer card one-hot (10)
+COUNT_FEATURES = 2  # True count, penetration
+
+
+def encode_states(states, counts=None):
+    """
+    Turn StrategyTable-style states into network inputs.
+    Args:
+        states: Integer array of shape (n, 4) with columns (category, total or pair rank, dealer card,
+            can double), e.g. from BatchedBlackjackEnv.strategy_states().
+        counts: Optional (running count, true count, penetration) arrays, e.g. from
+            BatchedBlackjackEnv.count_observation(); appended as two extra features.
+    Returns:
+        np.ndarray: float32 array of shape (n, BASE_FEATURES [+ COUNT_FEATURES]).
+    """
+    states = np.asarray(states)
+    category, value, dealer_card = states[:, 0], states[:, 1], states[:, 2]
+    pair = category == PAIR
+    aces = pair & (value == 1)
+    total = np.where(pair, np.where(aces, 12, 2 * value), value)
+
+    width = BASE_FEATURES + (COUNT_FEATURES if counts is not None else 0)
+    features = np.zeros((len(states), width), dtype=np.float32)
+    features[:, 0] = total / 21
+    features[:, 1] = (category == SOFT) | aces
+    features[:, 2] = states[:, 3]
+    features[:, 3] = pair
+    features[:, 4] = np.where(pair, value, 0) / 10
+    features[np.arange(len(states)), 4 + dealer_card] = 1
+    if counts is not None:
+        _, true_count, penetration = counts
+        features[:, BASE_FEATURES] = np.asarray(true_count) / 10
+        features[:, BASE_FEATURES + 1] = penetration
+    return features
+
+
+class QNetwork(nn.Module):
+    """Multi-layer perceptron mapping state features to one Q-value per action."""
+
+    def __init__(self, n_features, n_actions, hidden=(128, 128)):
+        super().__init__()
+        layers = []
+        width = n_features
+        for size in hidden:
+            layers += [nn.Linear(width, size), nn.ReLU()]
+            width = size
+        layers.append(nn.Linear(width, n_actions))
+        self.layers = nn.Sequential(*layers)
+
+    def forward(self, features):
+        return self.layers(features)
+
+
+def epsilon_greedy(q_values, epsilon, rng):
+    """
+    Pick one action per row: the argmax, or a uniform random action with probability ``epsilon``.
+    Args:
+        q_values: Array of shape (n, n_actions).
+        epsilon: Exploration rate.
+        rng: np.random.Generator.
+    Returns:
+        np.ndarray: Actions of shape (n,).
+    """
+    actions = q_values.argmax(axis=1)
+    explore = rng.random(len(actions)) < epsilon
+    actions[explore] = rng.integers(0, q_values.shape[1], size=int(explore.sum()))
+    return actions
@@ -1,9 +1,10 @@
 import numpy as np
-import random
-from collections import defaultdict
+from blackjack.rng import RandomStream
+from .q_table import QTable
 
 class QLearningAgent:
-    def __init__(self, actions, alpha=0.05, gamma=0.99, epsilon=1.0, epsilon_decay=0.9995, epsilon_min=0.1):
+    def __init__(self, actions, alpha=0.05, gamma=0.99, epsilon=1.0, epsilon_decay=0.9995, epsilon_min=0.1,
+                 alpha_decay=0.99, alpha_min=0.001, state_index="cards", seed=None):
         """
         Q-Learning Agent
         Args:
@@ -11,34 +12,78 @@ class QLearningAgent:
             alpha: Learning rate.
             gamma: Discount factor.
             epsilon: Exploration rate.
+            epsilon_decay: Factor applied to epsilon after every update.
+            epsilon_min: Floor of epsilon.
+            alpha_decay: Factor applied to the learning rate after every update.
+            alpha_min: Floor of the learning rate.
+            state_index: "cards" for a row per card composition, "canonical" for a row per hand class
+                (see CanonicalIndex), or a StateIndex instance.
+            seed: Seed of the exploration stream (int, SeedSequence or None for fresh entropy).
         """
-        self.q_table = defaultdict(lambda: np.zeros(len(actions)))
+        self.q_table = QTable(len(actions), state_index)
+        self.rng = RandomStream(seed)
         self.actions = actions
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon
         self.epsilon_decay = epsilon_decay
         self.epsilon_min = epsilon_min
+        self.alpha_decay = alpha_decay
+        self.alpha_min = alpha_min
 
     def state_representation(self, player_total, dealer_card, usable_ace, player_cards):
-        """Convert the game state into a unique representation."""
-        return (player_total, dealer_card, usable_ace, tuple(sorted(player_cards)))
+        """Convert the game state into its Q-table row (the total and ace follow from the cards)."""
+        return self.q_table.index.index(dealer_card, player_cards)
+
+    def seed(self, seed=None):
+        """Restart the exploration stream from ``seed``."""
+        self.rng = RandomStream(seed)
 
     def choose_action(self, state):
         """Choose action based on epsilon-greedy policy."""
-        if random.random() < self.epsilon:
-            return random.choice(self.actions)  # Explore
+        if self.rng.random() < self.epsilon:
+            return self.rng.choice(self.actions)  # Explore
         else:
-            return np.argmax(self.q_table[state])  # Exploit
+            return self.q_table.greedy_action(state)  # Exploit
 
     def update(self, state, action, reward, next_state, done):
         """Update Q-value using the Q-Learning update rule."""
-        q_predict = self.q_table[state][action]
+        values = self.q_table.values
+        q_predict = values[state, action]
         if done:
             q_target = reward  # No next state if terminal
         else:
-            q_target = reward + self.gamma * np.max(self.q_table[next_state])
-        self.q_table[state][action] += self.alpha * (q_target - q_predict)
+            q_target = reward + self.gamma * self.q_table.max_value(next_state)
+        values[state, action] += self.alpha * (q_target - q_predict)
+        self.q_table.visits[state, action] += 1
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
-        self.alpha = max(0.001, self.alpha * 0.99)
+        self.alpha = max(self.alpha_min, self.alpha * self.alpha_decay)
+
+    def update_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Apply a batch of transitions at once, each against the Q-values at the start of the batch.
+        A (state, action) pair that occurs k times moves towards the mean of its targets by
+        1 - (1 - alpha) ** k, as far as k update() calls towards a fixed target would take it,
+        so frequent states learn as fast as in serial training. Epsilon and alpha decay as
+        after one update() per transition.
+        Args:
+            states, actions, rewards, next_states, dones: Equal-length arrays, one entry per transition.
+        """
+        values = self.q_table.values
+        n_actions = values.shape[1]
+        targets = rewards + self.gamma * values[next_states].max(axis=1) * (1 - dones)
+        flat_values = values.reshape(-1)
+        cells = states * n_actions + actions
+        errors = targets - flat_values[cells]
+        cells, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+        step = 1 - (1 - self.alpha) ** counts
+        flat_values[cells] += step * np.bincount(inverse, weights=errors) / counts
+        self.q_table.visits.reshape(-1)[cells] += counts
+        self.advance_schedule(len(states))
+
+    def advance_schedule(self, updates):
+        """Apply the per-update epsilon and alpha decay of ``updates`` calls to update() at once."""
+        if self.epsilon > self.epsilon_min:
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay ** updates)
+        self.alpha = max(self.alpha_min, self.alpha * self.alpha_decay ** updates)
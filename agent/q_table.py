@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+import numpy as np
+from blackjack.hand import Hand, RANK_BITS
+
+MAX_HARD_TOTAL = 31  # 21 plus the largest card: the highest hard total a hand can reach
+DEALER_CARDS = 10
+
+
+def cards_key(cards):
+    """
+    Pack a hand into an int that identifies its multiset of cards.
+    Args:
+        cards: Iterable of card values (1-10), in any order.
+    Returns:
+        int: Sum of 1 << (5 * (card - 1)), i.e. the per-rank counts side by side.
+    """
+    key = 0
+    for card in cards:
+        key += 1 << (RANK_BITS * (card - 1))
+    return key
+
+
+def key_cards(key):
+    """Unpack a hand key back into its sorted card tuple."""
+    cards = []
+    for rank in range(1, 11):
+        count = (key >> (RANK_BITS * (rank - 1))) & ((1 << RANK_BITS) - 1)
+        cards.extend([rank] * count)
+    return tuple(cards)
+
+
+class StateIndex:
+    """
+    Perfect index of (player cards, dealer card) states.
+
+    Every multiset of cards with a hard total up to 31 is enumerated once, so the
+    row of a state is fixed and identical in every process, independent of the
+    order states are visited in. Anything larger can only be a busted hand and
+    shares one overflow row per dealer card.
+    """
+
+    name = "cards"
+
+    def __init__(self, max_total=MAX_HARD_TOTAL):
+        keys = []
+
+        def visit(rank, remaining, key):
+            if rank > 10:
+                keys.append(key)
+                return
+            for count in range(remaining // rank + 1):
+                visit(rank + 1, remaining - count * rank, key + (count << (RANK_BITS * (rank - 1))))
+
+        visit(1, max_total, 0)
+        self.keys = keys
+        self.hand_rows = {key: row for row, key in enumerate(keys)}
+        self.overflow_row = len(keys)
+        self.size = (len(keys) + 1) * DEALER_CARDS
+
+    def index(self, dealer_card, player_cards):
+        """Return the row of a state; the player total and ace follow from the cards."""
+        key = player_cards.key if isinstance(player_cards, Hand) else cards_key(player_cards)
+        hand = self.hand_rows.get(key, self.overflow_row)
+        return hand * DEALER_CARDS + dealer_card - 1
+
+    def describe(self, index):
+        """
+        Decode a row back into the state it represents.
+        Returns:
+            tuple: (player_total, dealer_card, usable_ace, player_cards).
+        """
+        hand, dealer = divmod(index, DEALER_CARDS)
+        if hand == self.overflow_row:
+            return MAX_HARD_TOTAL + 1, dealer + 1, False, ()
+        cards = key_cards(self.keys[hand])
+        total = sum(cards)
+        usable_ace = 1 in cards and total + 10 <= 21
+        return total + 10 * usable_ace, dealer + 1, usable_ace, cards
+
+
+def hand_class(cards):
+    """
+    Decision-relevant class of a hand.
+    Returns:
+        tuple: ("pair", rank, 2) for a two-card pair, otherwise ("hard" or "soft", best total,
+        number of cards capped at 3); None for a busted hand.
+    """
+    total = sum(cards)
+    soft = 1 in cards and total <= 11
+    if soft:
+        total += 10
+    if total > 21:
+        return None
+    if len(cards) == 2 and cards[0] == cards[1]:
+        return "pair", cards[0], 2
+    return ("soft" if soft else "hard"), total, min(len(cards), 3)
+
+
+class CanonicalIndex(StateIndex):
+    """
+    Index of (hand class, dealer card) states, with the interface of StateIndex.
+
+    Hands that no decision can tell apart share a row: a hand is reduced to its
+    hard or soft total, a pair to its rank, and both keep whether the hand has
+    one, two or more cards (doubling and splitting are only offered on two).
+    (2, 3, 5) and (4, 6) therefore stay apart while (2, 3, 5) and (3, 3, 4)
+    share a row. Every card multiset of StateIndex maps to its class up front,
+    so lookups cost the same dict probe; busted hands share the overflow row.
+    The table shrinks from 247,880 rows to 700.
+    """
+
+    name = "canonical"
+
+    def __init__(self, max_total=MAX_HARD_TOTAL):
+        super().__init__(max_total)
+        classes, representatives = {}, []
+        hand_rows = {}
+        for key in sorted(self.keys, key=lambda key: len(key_cards(key))):  # Fewest cards represent a class
+            cards = key_cards(key)
+            if not cards:
+                continue
+            hand = hand_class(cards)
+            if hand is None:
+                continue
+            if hand not in classes:
+                classes[hand] = len(representatives)
+                representatives.append(key)
+            hand_rows[key] = classes[hand]
+        self.classes = list(classes)
+        self.keys = representatives
+        self.hand_rows = hand_rows
+        self.overflow_row = len(representatives)
+        self.size = (len(representatives) + 1) * DEALER_CARDS
+
+
+STATE_INDEXES = {"cards": StateIndex, "canonical": CanonicalIndex}
+_default_indexes = {}
+
+
+def default_state_index(name="cards"):
+    """Return the shared index of a kind in STATE_INDEXES ("cards" or "canonical"), building it on first use."""
+    if name not in _default_indexes:
+        if name not in STATE_INDEXES:
+            raise ValueError(f"Unknown state index {name}; expected one of {sorted(STATE_INDEXES)}")
+        _default_indexes[name] = STATE_INDEXES[name]()
+    return _default_indexes[name]
+
+
+class QTable:
+    """Dense (state row, action) tables of Q-values and visit counts addressed through a StateIndex."""
+
+    def __init__(self, n_actions, index=None):
+        """
+        Args:
+            n_actions: Number of actions per state.
+            index: StateIndex or CanonicalIndex mapping states to rows, or the name of a shared one
+                ("cards" by default, see default_state_index).
+        """
+        self.index = index if isinstance(index, StateIndex) else default_state_index(index or "cards")
+        self.values = np.zeros((self.index.size, n_actions))
+        self.visits = np.zeros((self.index.size, n_actions), dtype=np.int64)
+
+    def __getitem__(self, state):
+        """Return the Q-values of a state row (or array of rows)."""
+        return self.values[state]
+
+    def greedy_action(self, state):
+        """Return the highest-valued action of a state row (first one on ties, like np.argmax)."""
+        # A handful of Python floats beats np.argmax's call overhead on a 4-element row
+        row = self.values[state].tolist()
+        return row.index(max(row))
+
+    def max_value(self, state):
+        """Return the highest Q-value of a state row."""
+        return max(self.values[state].tolist())
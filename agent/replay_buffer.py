@@ -1 +1,63 @@
 #!/usr/bin/env python3
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of transitions in one NumPy structured array.
+
+    Transitions are written and sampled in batches: no Python object is
+    created per transition, and a minibatch is a single fancy-indexing gather
+    per field.
+    """
+
+    def __init__(self, capacity, n_features, seed=None):
+        """
+        Args:
+            capacity: Maximum number of transitions kept; the oldest are overwritten first.
+            n_features: Length of the feature vector of a state.
+            seed: Seed for the sampling generator.
+        """
+        self.dtype = np.dtype([
+            ("features", np.float32, (n_features,)),
+            ("action", np.int8),
+            ("reward", np.float32),
+            ("next_features", np.float32, (n_features,)),
+            ("done", np.bool_),
+        ])
+        self.data = np.zeros(capacity, dtype=self.dtype)
+        self.capacity = capacity
+        self.position = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add_batch(self, features, actions, rewards, next_features, dones):
+        """Append a batch of transitions given as arrays with one row per transition."""
+        count = len(actions)
+        if count > self.capacity:  # Only the newest transitions would survive anyway
+            features, actions, rewards = features[-self.capacity:], actions[-self.capacity:], rewards[-self.capacity:]
+            next_features, dones = next_features[-self.capacity:], dones[-self.capacity:]
+            count = self.capacity
+        slots = (self.position + np.arange(count)) % self.capacity
+        self.data["features"][slots] = features
+        self.data["action"][slots] = actions
+        self.data["reward"][slots] = rewards
+        self.data["next_features"][slots] = next_features
+        self.data["done"][slots] = dones
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def sample(self, batch_size):
+        """
+        Draw a minibatch uniformly with replacement.
+        Returns:
+            dict: Contiguous arrays ``features``, ``action``, ``reward``, ``next_features`` and ``done``
+            with ``batch_size`` rows each.
+        """
+        if not self.size:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        rows = self.rng.integers(0, self.size, size=batch_size)
+        return {name: self.data[name][rows] for name in self.dtype.names}
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmarks for the hot paths of training.
+
+Run from the repository root:
+
+    python -m benchmarks.bench --baseline benchmarks/baseline.json
+    python -m benchmarks.bench --output benchmarks/baseline.json  # Refresh the baseline
+
+With ``--baseline`` the run exits non-zero when any benchmark lost more than
+``--tolerance`` of its baseline throughput.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from agent import BasicStrategyAgent, QLearningAgent
+from blackjack.custom_env import CustomBlackjackEnv
+from blackjack.utils import hand_score
+from training import train_agent, TrainingMetrics
+
+
+def measure(func, number, repeat=5):
+    """Best-of-``repeat`` calls per second of ``func`` over ``number`` calls."""
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return number / best
+
+
+def bench_env_reset():
+    env = CustomBlackjackEnv(seed=0)
+    return measure(env.reset, 20000)
+
+
+def bench_env_step():
+    # A reset followed by a stick, so every step plays out a full dealer hand
+    env = CustomBlackjackEnv(seed=0)
+
+    def reset_and_stick():
+        env.reset()
+        env.step(0)
+    return measure(reset_and_stick, 10000)
+
+
+def bench_hand_score():
+    hands = [[1, 6], [10, 7], [2, 3, 4, 1], [10, 10, 5], [1, 1, 9]]
+
+    def score_hands():
+        for hand in hands:
+            hand_score(hand)
+    return measure(score_hands, 20000) * len(hands)
+
+
+def _q_agent():
+    return QLearningAgent(actions=[0, 1, 2, 3], alpha=0.7, gamma=1.0, epsilon=0.1, seed=0)
+
+
+def bench_q_choose_action():
+    agent = _q_agent()
+    states = [agent.state_representation(0, dealer_card, False, cards)
+              for dealer_card in range(1, 11) for cards in ([10, 6], [1, 7], [8, 8], [2, 3, 5])]
+
+    def choose():
+        for state in states:
+            agent.choose_action(state)
+    return measure(choose, 2000) * len(states)
+
+
+def bench_q_update():
+    agent = _q_agent()
+    state = agent.state_representation(16, 10, False, [10, 6])
+    next_state = agent.state_representation(19, 10, False, [10, 6, 3])
+    return measure(lambda: agent.update(state, 1, 0, next_state, False), 50000)
+
+
+def bench_basic_choose_action():
+    agent = BasicStrategyAgent()
+    states = [(total, dealer_card, False, (10, total - 10)) for total in range(12, 21) for dealer_card in range(1, 11)]
+
+    def choose():
+        for state in states:
+            agent.choose_action(state)
+    return measure(choose, 1000) * len(states)
+
+
+def bench_train_agent(episodes=20000):
+    env = CustomBlackjackEnv(seed=0)
+    agent = _q_agent()
+    start = time.perf_counter()
+    train_agent(env, agent, episodes=episodes, metrics=TrainingMetrics(verbose=False))
+    return episodes / (time.perf_counter() - start)
+
+
+BENCHMARKS = {
+    "env_reset": (bench_env_reset, "resets/sec"),
+    "env_reset_and_stick": (bench_env_step, "rounds/sec"),
+    "hand_score": (bench_hand_score, "hands/sec"),
+    "q_choose_action": (bench_q_choose_action, "decisions/sec"),
+    "q_update": (bench_q_update, "updates/sec"),
+    "basic_choose_action": (bench_basic_choose_action, "decisions/sec"),
+    "train_agent": (bench_train_agent, "episodes/sec"),
+}
+
+
+def run_benchmarks(names=None):
+    """
+    Run the benchmarks.
+    Args:
+        names: Benchmarks to run (all of BENCHMARKS by default).
+    Returns:
+        dict: Environment description and ``results`` mapping each name to its throughput and unit.
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        func, unit = BENCHMARKS[name]
+        results[name] = {"ops_per_sec": func(), "unit": unit}
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def find_regressions(current, baseline, tolerance=0.2):
+    """
+    Compare two run_benchmarks reports.
+    Returns:
+        list: (name, baseline ops/sec, current ops/sec) for every benchmark slower than
+        ``1 - tolerance`` times its baseline.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference and result["ops_per_sec"] < (1 - tolerance) * reference["ops_per_sec"]:
+            regressions.append((name, reference["ops_per_sec"], result["ops_per_sec"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark env stepping, agent decisions and training.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed fractional slowdown (default 0.2).")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Run only these benchmarks.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.only)
+    for name, result in report["results"].items():
+        print(f"{name:>22}: {result['ops_per_sec']:>14,.0f} {result['unit']}")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = find_regressions(report, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:,.0f} -> {after:,.0f} ({after / before - 1:+.1%})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,11 @@
 #!/usr/bin/env python3
 from .custom_env import CustomBlackjackEnv
+from .batched_env import BatchedBlackjackEnv
+from .rules import Rules, DEFAULT_RULES
+from .shoe import Shoe
+from .rng import RandomStream, child_seed
+from .dealer import DealerOutcomeCache
+from .solver import BlackjackSolver
 from .utils import is_bust, hand_score, basic_strategy
 
-__all__ = ["CustomBlackjackEnv", "is_bust", "hand_score", "basic_strategy"]
\ No newline at end of file
+__all__ = ["CustomBlackjackEnv", "BatchedBlackjackEnv", "Rules", "DEFAULT_RULES", "Shoe", "RandomStream", "child_seed", "DealerOutcomeCache", "BlackjackSolver", "is_bust", "hand_score", "basic_strategy"]
\ No newline at end of file
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+import numpy as np
+from blackjack.rules import DEFAULT_RULES, MAX_TOTAL
+from blackjack.shoe import CARD_VALUES, HI_LO
+from blackjack.strategy import HARD, SOFT, PAIR
+
+MAX_CARDS = 22  # 21 aces plus one more card is the longest hand that can exist
+_HI_LO = np.array(HI_LO, dtype=np.int16)
+
+
+class BatchedBlackjackEnv:
+    """
+    Play ``num_envs`` independent blackjack tables in lock-step with NumPy arrays.
+
+    The rules come from a Rules object shared with CustomBlackjackEnv (by
+    default a 6-deck shoe reshuffled before a draw when fewer than 40 cards
+    remain, the dealer stands on all 17s, a natural pays 1.5, rewards are
+    scaled by 10, doubles pay twice and an illegal action costs 50 and ends the
+    round). The dealer shows a single card. Every card (player hits and dealer
+    draws included) comes from the table's own shoe, and each split hand is
+    played to completion before the round ends, in the same order and with the
+    same cards as in CustomBlackjackEnv.
+
+    Observations are tuples of arrays ``(player_total, dealer_card, usable_ace)``
+    of shape ``(num_envs,)`` describing each table's current hand.
+    """
+
+    def __init__(self, num_envs=1024, max_hands=None, seed=None, rules=None):
+        """
+        Args:
+            num_envs: Number of tables stepped together.
+            max_hands: Maximum number of hands a table may hold after splitting (rules.max_hands by default).
+            seed: Seed for the NumPy generator used to shuffle the shoes.
+            rules: Rules of the tables (blackjack.rules.DEFAULT_RULES by default).
+        """
+        self.num_envs = num_envs
+        self.rules = rules or DEFAULT_RULES
+        self.deck_count = self.rules.decks
+        max_hands = self.max_hands = max_hands or self.rules.max_hands
+        self.rng = np.random.default_rng(seed)
+        self._rows = np.arange(num_envs)
+
+        self._base_shoe = np.tile(CARD_VALUES, 4 * self.deck_count)
+        self.shoe_size = self._base_shoe.size
+        self.shoe = np.empty((num_envs, self.shoe_size), dtype=np.int8)
+        self.cursor = np.zeros(num_envs, dtype=np.intp)
+        self._running_counts = np.zeros((num_envs, self.shoe_size + 1), dtype=np.int16)  # Hi-Lo count before each card
+        self.reset_shoe()
+
+        self.cards = np.zeros((num_envs, max_hands, MAX_CARDS), dtype=np.int8)
+        self.n_cards = np.zeros((num_envs, max_hands), dtype=np.intp)
+        self.hard_total = np.zeros((num_envs, max_hands), dtype=np.int16)
+        self.has_ace = np.zeros((num_envs, max_hands), dtype=bool)
+        self.n_hands = np.ones(num_envs, dtype=np.intp)
+        self.hand_index = np.zeros(num_envs, dtype=np.intp)
+
+        self.dealer_cards = np.zeros((num_envs, MAX_CARDS), dtype=np.int8)
+        self.dealer_n = np.zeros(num_envs, dtype=np.intp)
+        self.dealer_hard = np.zeros(num_envs, dtype=np.int16)
+        self.dealer_ace = np.zeros(num_envs, dtype=bool)
+        self.dealer_done = np.zeros(num_envs, dtype=bool)
+
+        self.done = np.ones(num_envs, dtype=bool)
+
+    def reset_shoe(self, rows=None):
+        """Refill and shuffle the shoes of the given tables (all tables by default)."""
+        if rows is None:
+            rows = self._rows
+        shoes = np.broadcast_to(self._base_shoe, (len(rows), self.shoe_size))
+        self.shoe[rows] = self.rng.permuted(shoes, axis=1)
+        self.cursor[rows] = 0
+        self._running_counts[rows, 1:] = np.cumsum(_HI_LO[self.shoe[rows]], axis=1)
+
+    def reset(self, mask=None):
+        """
+        Start a new round on the selected tables, dealing player, dealer, player.
+        Args:
+            mask: Boolean array selecting the tables to reset; None resets all of them.
+        Returns:
+            tuple: Observation arrays for every table.
+        """
+        rows = self._rows if mask is None else self._rows[mask]
+        self._clear(rows)
+        zeros = np.zeros(len(rows), dtype=np.intp)
+        self._add_card(rows, zeros, self._draw(rows))
+        self._add_dealer_card(rows, self._draw(rows))
+        self._add_card(rows, zeros, self._draw(rows))
+        self.done[rows] = False
+        return self._get_obs()
+
+    def deal(self, index, player, dealer):
+        """Replace the hands on table ``index`` with explicit cards (for tests and scenario analysis)."""
+        self._clear(np.array([index]))
+        self.done[index] = False
+        row = np.array([index])
+        for card in player:
+            self._add_card(row, np.zeros(1, dtype=np.intp), np.array([card], dtype=np.int8))
+        for card in dealer:
+            self._add_dealer_card(row, np.array([card], dtype=np.int8))
+
+    def step(self, actions):
+        """
+        Apply one action per table.
+        Actions:
+        0 - Stick (Hold)
+        1 - Hit
+        2 - Double Down
+        3 - Split
+        4 - Surrender (only offered when the rules allow it)
+        Args:
+            actions: Integer array of shape (num_envs,); entries for finished tables are ignored.
+        Returns:
+            tuple: (obs, rewards, dones, info) where rewards and dones are arrays.
+        """
+        actions = np.asarray(actions)
+        rules = self.rules
+        rewards = np.zeros(self.num_envs, dtype=np.float64)
+        active = ~self.done
+        finished = np.zeros(self.num_envs, dtype=bool)
+
+        stick = self._rows[active & (actions == 0)]
+        hit = self._rows[active & (actions == 1)]
+        double = self._rows[active & (actions == 2)]
+        split = self._rows[active & (actions == 3)]
+        surrender = self._rows[active & (actions == 4)]
+
+        if stick.size:
+            self._play_dealer(stick)
+            rewards[stick] = self._settle(stick, allow_natural=True)
+            finished[stick] = True
+
+        if hit.size:
+            hands = self.hand_index[hit]
+            self._add_card(hit, hands, self._draw(hit))
+            total, _ = self._score(self.hard_total[hit, hands], self.has_ace[hit, hands])
+            bust = hit[total > 21]
+            rewards[bust] = rules.bust_reward
+            finished[bust] = True
+
+        if double.size and not rules.double_after_split:
+            illegal = double[self.n_hands[double] > 1]
+            rewards[illegal] = rules.illegal_action_penalty
+            self.done[illegal] = True
+            double = double[self.n_hands[double] == 1]
+
+        if double.size:
+            hands = self.hand_index[double]
+            self._add_card(double, hands, self._draw(double))
+            self._play_dealer(double)
+            rewards[double] = self._settle(double, allow_natural=False) * 2
+            finished[double] = True
+
+        if split.size:
+            hands = self.hand_index[split]
+            first = self.cards[split, hands, 0]
+            legal = (
+                (self.n_cards[split, hands] == 2)
+                & (first == self.cards[split, hands, 1])
+                & (self.n_hands[split] < self.max_hands)
+            )
+            illegal = split[~legal]
+            rewards[illegal] = rules.illegal_action_penalty
+            self.done[illegal] = True
+            self._split(split[legal], hands[legal])
+
+        if surrender.size:
+            legal = (self.n_hands[surrender] == 1) & (self.n_cards[surrender, 0] == 2) & rules.surrender
+            rewards[surrender] = np.where(legal, rules.surrender_reward, rules.illegal_action_penalty)
+            self.done[surrender] = True
+
+        advance = self._rows[finished]
+        self.hand_index[advance] += 1
+        self.done[advance[self.hand_index[advance] >= self.n_hands[advance]]] = True
+        np.minimum(self.hand_index, self.n_hands - 1, out=self.hand_index)
+        return self._get_obs(), rewards, self.done.copy(), {}
+
+    def current_cards(self):
+        """Return the card array and card count of each table's current hand."""
+        return self.cards[self._rows, self.hand_index], self.n_cards[self._rows, self.hand_index]
+
+    def strategy_states(self):
+        """
+        Locate every table's current hand in a StrategyTable.
+        Returns:
+            np.ndarray: Shape (num_envs, 4) with columns (category, total or pair rank, dealer card, can double).
+        """
+        hands = self.hand_index
+        total, usable_ace = self._score(self.hard_total[self._rows, hands], self.has_ace[self._rows, hands])
+        n_cards = self.n_cards[self._rows, hands]
+        first = self.cards[self._rows, hands, 0]
+        pair = (n_cards == 2) & (first == self.cards[self._rows, hands, 1])
+        category = np.where(pair, PAIR, np.where(usable_ace, SOFT, HARD))
+        return np.stack([category, np.where(pair, first, total), self.dealer_cards[:, 0], n_cards == 2], axis=1)
+
+    def count_observation(self):
+        """
+        Card-counting features of every table's shoe, like Shoe.observation.
+        Returns:
+            tuple: Arrays (Hi-Lo running count, true count, penetration) of shape (num_envs,).
+        """
+        running = self._running_counts[self._rows, self.cursor]
+        remaining = self.shoe_size - self.cursor
+        return running, running * 52 / remaining, self.cursor / self.shoe_size
+
+    def _clear(self, rows):
+        self.cards[rows] = 0
+        self.n_cards[rows] = 0
+        self.hard_total[rows] = 0
+        self.has_ace[rows] = False
+        self.n_hands[rows] = 1
+        self.hand_index[rows] = 0
+        self.dealer_cards[rows] = 0
+        self.dealer_n[rows] = 0
+        self.dealer_hard[rows] = 0
+        self.dealer_ace[rows] = False
+        self.dealer_done[rows] = False
+
+    def _get_obs(self):
+        hands = self.hand_index
+        total, usable_ace = self._score(self.hard_total[self._rows, hands], self.has_ace[self._rows, hands])
+        return total, self.dealer_cards[:, 0].copy(), usable_ace
+
+    @staticmethod
+    def _score(hard_total, has_ace):
+        """Vectorised hand_score: promote one ace to 11 wherever it does not bust."""
+        usable_ace = has_ace & (hard_total + 10 <= 21)
+        return hard_total + 10 * usable_ace, usable_ace
+
+    def _draw(self, rows):
+        """Draw one card for each table in ``rows``, reshuffling shoes that run low."""
+        low = rows[self.shoe_size - self.cursor[rows] < self.rules.reshuffle_reserve]
+        if low.size:
+            self.reset_shoe(low)
+        cards = self.shoe[rows, self.cursor[rows]]
+        self.cursor[rows] += 1
+        return cards
+
+    def _add_card(self, rows, hands, cards):
+        self.cards[rows, hands, self.n_cards[rows, hands]] = cards
+        self.n_cards[rows, hands] += 1
+        self.hard_total[rows, hands] += cards
+        self.has_ace[rows, hands] |= cards == 1
+
+    def _add_dealer_card(self, rows, cards):
+        self.dealer_cards[rows, self.dealer_n[rows]] = cards
+        self.dealer_n[rows] += 1
+        self.dealer_hard[rows] += cards
+        self.dealer_ace[rows] |= cards == 1
+
+    def _play_dealer(self, rows):
+        """Draw dealer cards until every selected table stands under the rules."""
+        stands = self.rules.dealer_stands_table
+        rows = rows[~self.dealer_done[rows]]
+        self.dealer_done[rows] = True
+        while rows.size:
+            rows = rows[~stands[np.minimum(self.dealer_hard[rows], MAX_TOTAL), self.dealer_ace[rows].astype(np.intp)]]
+            if rows.size:
+                self._add_dealer_card(rows, self._draw(rows))
+
+    def _settle(self, rows, allow_natural):
+        """Scaled reward of the current hand against the dealer's final hand."""
+        hands = self.hand_index[rows]
+        player, _ = self._score(self.hard_total[rows, hands], self.has_ace[rows, hands])
+        dealer, _ = self._score(self.dealer_hard[rows], self.dealer_ace[rows])
+        reward = self.rules.outcome_table[np.minimum(player, MAX_TOTAL), np.minimum(dealer, MAX_TOTAL)]
+        if allow_natural:
+            natural = (self.n_cards[rows, hands] == 2) & (player == 21) & (reward > 0)
+            reward[natural] = self.rules.natural_reward
+        return reward
+
+    def _split(self, rows, hands):
+        """Split the pair in the current hand; the current hand is played first and the new one right after it."""
+        if not rows.size:
+            return
+        pair = self.cards[rows, hands, 0]
+        for slot in range(self.max_hands - 1, 0, -1):  # Shift the later hands up to make room
+            moved = rows[slot >= hands + 2]
+            for array in (self.cards, self.n_cards, self.hard_total, self.has_ace):
+                array[moved, slot] = array[moved, slot - 1]
+        new = hands + 1
+        self.n_hands[rows] += 1
+        for target in (hands, new):
+            self.cards[rows, target] = 0
+            self.n_cards[rows, target] = 0
+            self.hard_total[rows, target] = 0
+            self.has_ace[rows, target] = False
+            self._add_card(rows, target, pair)
+        self._add_card(rows, hands, self._draw(rows))
+        self._add_card(rows, new, self._draw(rows))
@@ -1,40 +1,100 @@
 from blackjack.utils import is_bust, hand_score, basic_strategy
-import gym
-from gym.envs.toy_text.blackjack import BlackjackEnv  # Import the base BlackjackEnv
-# from blackjack.utils import is_bust, score_hand  # Import utility functions
+from blackjack.shoe import Shoe
+from blackjack.hand import Hand
+from blackjack.rules import DEFAULT_RULES, MAX_TOTAL
 import numpy as np
 
-class CustomBlackjackEnv(BlackjackEnv):
-    def __init__(self):
-        super().__init__(natural=True)
-        self.deck_count = 6
-        self.deck = []  # Initialize the deck attribute
-        self.reset_shoe() 
+class CustomBlackjackEnv:
+    """
+    Blackjack table with a multi-deck shoe, doubling, splitting and configurable rules.
+
+    The env is self-contained: every card, player hits and dealer draws
+    included, comes from ``self.shoe``. It keeps the gym 0.22 API (reset()
+    returns an observation, step() returns (obs, reward, done, info)) without
+    importing gym; blackjack.gym_adapter wraps it for gym or gymnasium.
+
+    get_state() and set_state() snapshot and restore a round in play, shoe
+    included, so step_all() and rollout() can try every action from one
+    state against the same future cards.
+    """
+
+    def __init__(self, count_in_obs=False, rules=None, seed=None):
+        """
+        Args:
+            count_in_obs: Append the shoe's (running count, true count, penetration) to every observation.
+            rules: Rules of the table (blackjack.rules.DEFAULT_RULES by default).
+            seed: Seed of the shoe's shuffles (int, SeedSequence or None for fresh entropy), see seed().
+        """
+        self.rules = rules or DEFAULT_RULES
+        self.deck_count = self.rules.decks
+        self.count_in_obs = count_in_obs
+        self.seed(seed)
         self.dealer = []
         self.done = False
         # self.reset() # Reset the shoe when the environment is created
 
     def reset(self):
         """Reset the environment, shuffle the shoe if needed, and deal cards in the correct order."""
-        # Reset the player and dealer hands
-        self.player = [self.draw_card()]  # Player gets the first card
-        self.dealer = [self.draw_card()]  # Dealer gets their first card
-        self.player.append(self.draw_card())  # Player gets their second card
+        draw = self.draw_card
+        first, upcard, second = draw(), draw(), draw()  # Player, dealer, player
+        self._player, self._dealer = Hand.dealt(first, second), Hand.dealt(upcard)
+        self.player_hands = []  # Split hands of the previous round must not carry over
+        self.current_hand_index = 0
         self.done = False
-        return self._get_obs()
+        # _get_obs for a two-card hand, whose ace (if any) always counts as 11
+        soft = first == 1 or second == 1
+        obs = (first + second + 10 * soft, upcard, soft)
+        if self.count_in_obs:
+            return obs + (self.shoe.observation(),)
+        return obs
+
+    # Hands are always Hand objects so their totals are maintained incrementally
+    @property
+    def player(self):
+        return self._player
+
+    @player.setter
+    def player(self, cards):
+        self._player = cards if isinstance(cards, Hand) else Hand(cards)
+
+    @property
+    def dealer(self):
+        return self._dealer
+
+    @dealer.setter
+    def dealer(self, cards):
+        self._dealer = cards if isinstance(cards, Hand) else Hand(cards)
+
+    @property
+    def deck(self):
+        """Undealt cards, in dealing order."""
+        return self.shoe.remaining_cards()
+
+    def seed(self, seed=None):
+        """Start a fresh shoe shuffled by a generator seeded with ``seed``, so every card dealt follows it."""
+        self.shoe = Shoe(self.deck_count, rng=np.random.default_rng(seed))
+        self.reset_shoe()
+        return [seed]
 
     def reset_shoe(self):
         """Reset the shoe with a shuffled 6-deck set."""
-        self.deck = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10] * 4 * self.deck_count
-        np.random.shuffle(self.deck)
+        self.shoe.shuffle()
         self.player_hands = []
         self.current_hand_index = 0
 
     def draw_card(self):
         """Draw a card from the shoe."""
-        if len(self.deck) < 40 : 
+        shoe = self.shoe
+        if shoe.size - shoe.cursor < self.rules.reshuffle_reserve:  # shoe.remaining, without the property call
             self.reset_shoe()
-        return self.deck.pop()
+            shoe = self.shoe
+        return shoe.draw()
+
+    def _get_obs(self):
+        obs = (self._player.total, self._dealer[0], self._player.soft)
+        if self.count_in_obs:
+            return obs + (self.shoe.observation(),)
+        return obs
 
     def step(self, action):
         """
@@ -44,62 +104,156 @@ class CustomBlackjackEnv(BlackjackEnv):
         1 - Hit
         2 - Double Down
         3 - Split
+        4 - Surrender (only offered when the rules allow it)
         """
         if hasattr(self, 'done') and self.done:
             return self._get_obs(), 0, True, {}
+        rules = self.rules
+        player = self._player
         if action == 2:  # Double Down
-            self.player.append(self.draw_card())
+            if self.player_hands and not rules.double_after_split:
+                return self._illegal_action()
+            player.append(self.draw_card())
             done = True
             self.play_dealer_hand()
             reward = self._calculate_reward() * 2
-            return self._get_obs(), reward, done, {}
         elif action == 3:  # Split
-            if len(self.player) == 2 and self.player[0] == self.player[1]:
+            if len(self.player) == 2 and self.player[0] == self.player[1] \
+                    and len(self.player_hands or [None]) < rules.max_hands:
                 self.split_hand()
             else:
-                reward = -50  # Arbitrary penalty
-                done = True
-                return self._get_obs(), reward, done, {}
+                return self._illegal_action()
             # Return the observation for the first split hand
             return self._get_obs(), 0, False, {}
-        
-        # elif action == 1:  # Hit
-        #     self.player.append(self.draw_card())
-        #     if is_bust(self.player):  # Player busts
-        #         reward = self._calculate_reward()
-        #         done = True
-        #         return self._get_obs(), reward, done, {}
-        #     else:  # Player can continue
-        #         return self._get_obs(), 0, False, {}
-        # For Hit (1) and Stick (0), continue standard gameplay
-        obs, reward, done, info = super().step(action)
-        reward *= 10
-        if done and action != 1:  # Current hand is finished
-            if self.current_hand_index < len(self.player_hands) - 1:
-                self._advance_to_next_hand()
-                done = False  # Continue the game with the next hand
-                
-                # Game continues with the next round
-        if done :
-            if len(self.deck) < 15 : 
-                    self.reset_shoe()
-        self.done = done
-        return obs, reward, done, info
+        elif action == 4:  # Surrender
+            if not (rules.surrender and len(self.player) == 2 and not self.player_hands):
+                return self._illegal_action()
+            done = True
+            reward = rules.surrender_reward
+        elif action == 1:  # Hit
+            player.append(self.draw_card())
+            done = player.is_bust
+            reward = rules.bust_reward if done else 0
+        else:  # Stick
+            done = True
+            self.play_dealer_hand()
+            reward = rules.settle(player.total, self._dealer.total)
+            if reward > 0 and player.is_natural:
+                reward = rules.natural_reward
+        # A finished split hand (stood, doubled or bust) hands play to the next one; the round ends after the last
+        if done and self.current_hand_index < len(self.player_hands) - 1:
+            self._advance_to_next_hand()
+            done = False
+        obs = self._get_obs()
+        if done:
+            self._end_round()
+        return obs, reward, done, {}
+
+    def legal_actions(self):
+        """Actions step() accepts without the illegal-action penalty in the current state."""
+        if self.done:
+            return []
+        rules, player = self.rules, self._player
+        actions = [0, 1]
+        if not self.player_hands or rules.double_after_split:
+            actions.append(2)
+        if player.is_pair and len(self.player_hands or [None]) < rules.max_hands:
+            actions.append(3)
+        if rules.surrender and len(player) == 2 and not self.player_hands:
+            actions.append(4)
+        return actions
+
+    def get_state(self):
+        """Snapshot of the round in play and the shoe (hands, split position, cards to come) for set_state."""
+        hands = [hand.copy() for hand in self.player_hands]
+        position = next((i for i, hand in enumerate(self.player_hands) if hand is self._player), None)
+        player = None if position is not None else self._player.copy()
+        return (self.shoe.checkpoint(), player, self._dealer.copy(), hands, position,
+                self.current_hand_index, self.done)
+
+    def set_state(self, state):
+        """Restore a get_state snapshot; a snapshot can be restored any number of times."""
+        shoe, player, dealer, hands, position, self.current_hand_index, self.done = state
+        self.shoe.restore(shoe)
+        self.player_hands = [hand.copy() for hand in hands]
+        self._player = self.player_hands[position] if position is not None else player.copy()
+        self._dealer = dealer.copy()
+
+    def step_all(self, actions=None, follow=None):
+        """
+        Take every action from the current state, each drawing the same future cards.
+        Args:
+            actions: Actions to try (legal_actions() by default); illegal ones return their penalty.
+            follow: Action whose outcome the env is left in; None restores the current state.
+        Returns:
+            dict: action -> (obs, reward, done, hand), the step() result of that action and
+            the hand the next decision is taken on.
+        """
+        actions = self.legal_actions() if actions is None else list(actions)
+        if follow in actions:  # Played last, so the env is simply left in its outcome
+            actions.remove(follow)
+            actions.append(follow)
+        start = self.get_state()
+        outcomes = {}
+        for number, action in enumerate(actions):
+            if number:
+                self.set_state(start)  # set_state hands the env fresh copies, so earlier outcome hands stay intact
+            obs, reward, done, _ = self.step(action)
+            outcomes[action] = (obs, reward, done, self._player)
+        if follow not in outcomes:
+            self.set_state(start)
+        return outcomes
+
+    def rollout(self, policy, actions=None):
+        """
+        Counterfactual value of every action: take it, then play the round out with ``policy``,
+        drawing the same future cards on every branch. The env is left in the current state.
+        Args:
+            policy: Callable ``(player_total, dealer_card, usable_ace, player_cards) -> action``
+                (see training.crn.greedy_policy).
+            actions: Actions to roll out (legal_actions() by default).
+        Returns:
+            dict: action -> total reward from this state to the end of the round.
+        """
+        start = self.get_state()
+        returns = {}
+        for action in self.legal_actions() if actions is None else actions:
+            self.set_state(start)
+            obs, total, done, _ = self.step(action)
+            while not done:
+                obs, reward, done, _ = self.step(policy((obs[0], obs[1], obs[2], self._player)))
+                total += reward
+            returns[action] = total
+        self.set_state(start)
+        return returns
+
+    def _illegal_action(self):
+        """End the round with the rules' penalty for an action the table does not allow."""
+        obs = self._get_obs()
+        self._end_round()
+        return obs, self.rules.illegal_action_penalty, True, {}
+
+    def _end_round(self):
+        """Mark the round finished and reshuffle if the shoe is too low for another one."""
+        self.done = True
+        if self.shoe.remaining < self.rules.round_end_reserve:
+            self.reset_shoe()
 
     def play_dealer_hand(self):
         """Play the dealer's hand according to blackjack rules."""
-        while True:
-            dealer_score, _ = hand_score(self.dealer)  # Calculate dealer's score
-            if dealer_score >= 17:  # Dealer stands on 17 or higher
-                break
-            self.dealer.append(self.draw_card())  # Dealer hits
+        dealer = self._dealer
+        stands = self.rules.dealer_stands
+        while not stands[min(dealer.hard_total, MAX_TOTAL)][dealer.aces > 0]:
+            dealer.append(self.draw_card())  # Dealer hits
 
     def split_hand(self):
-        """Split the player's current hand into two."""
+        """Split the player's current hand into two; the new hand is played first."""
         card = self.player.pop()
-        self.player_hands.append([card, self.draw_card()])  # Add new hand
+        new_hand = Hand((card, self.draw_card()))  # Add new hand
         self.player.append(self.draw_card())  # Replace card in the original hand
-        self.player_hands.append(self.player)
+        if not self.player_hands:
+            self.player_hands.append(self.player)
+        self.player_hands.insert(self.current_hand_index, new_hand)  # A re-split hand goes before its sibling
         self.player = self.player_hands[self.current_hand_index] # Update the current hand
 
     def _advance_to_next_hand(self):
@@ -118,22 +272,8 @@ class CustomBlackjackEnv(BlackjackEnv):
 
     def _calculate_reward(self):
         """Calculate the reward based on the current game state."""
-        if is_bust(self.player):
-            return -10  # Double down penalty if bust
-
-        if is_bust(self.dealer):
-            return 10  # Double down reward if dealer busts
-
-        player_total,_ = hand_score(self.player)
-        dealer_total,_ = hand_score(self.dealer)
-
-        if player_total > dealer_total:
-            return  10  # Player wins
-        elif player_total < dealer_total:
-            return -10  # Dealer wins
-        else:
-            return 0  # Push
-        
+        return self.rules.settle(self._player.total, self._dealer.total)
+
     def _start_next_round(self):
         """Prepare for the next round by dealing new cards."""
         self.player = [self.draw_card(), self.draw_card()]  # New cards for the player
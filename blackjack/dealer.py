@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+from functools import lru_cache
+
+from blackjack.rules import DEFAULT_RULES, MAX_TOTAL
+
+INFINITE_DECK_PROBABILITIES = tuple(4 / 13 if rank == 10 else 1 / 13 for rank in range(1, 11))
+DEALER_OUTCOMES = (17, 18, 19, 20, 21, "bust")
+BUST = 5  # Index of a dealer bust in a distribution
+RANK_GROUPS = ((1,), (2, 3, 4, 5, 6), (7, 8, 9), (10,))  # Aces, low, middle and ten-valued cards
+
+
+class DealerOutcomeCache:
+    """
+    Memoised distribution of the dealer's final total given the upcard and the rest of the shoe.
+
+    Without a ``resolution`` the key is the exact count of every rank and the
+    dealer's draws deplete that composition, as the solver needs. With one, the
+    shoe is coarsened to the share of aces, low (2-6), middle (7-9) and
+    ten-valued cards, each rounded to 1/resolution, so the many shoes seen
+    while evaluating collapse onto a few thousand entries; the dealer then
+    draws at those fixed proportions. Entries live in a bounded LRU cache keyed
+    on (upcard, composition key, rules).
+    """
+
+    def __init__(self, rules=None, resolution=None, cache_size=65536):
+        """
+        Args:
+            rules: Default Rules of the distributions (blackjack.rules.DEFAULT_RULES by default).
+            resolution: Steps per unit that group shares are rounded to, or None for exact compositions.
+            cache_size: Maximum number of distributions kept; None never evicts.
+        """
+        self.rules = rules or DEFAULT_RULES
+        self.resolution = resolution
+        self._cached = lru_cache(maxsize=cache_size)(self._compute)
+        self._stand_rewards = {}
+
+    def composition_key(self, counts):
+        """Cache key of rank counts (ranks 1-10); None stands for an infinite deck."""
+        if counts is None:
+            return None
+        if self.resolution is None:
+            return tuple(counts)
+        remaining = sum(counts)
+        if not remaining:
+            return None
+        scale = self.resolution / remaining
+        return tuple(round(scale * sum(counts[group[0] - 1:group[-1]])) for group in RANK_GROUPS)
+
+    def distribution(self, upcard, counts=None, rules=None):
+        """
+        Probability of each final dealer outcome.
+        Args:
+            upcard: Dealer's visible card (1-10).
+            counts: Cards of each rank 1-10 left in the shoe the dealer draws from, or None for an infinite deck.
+            rules: Rules deciding when the dealer stands (the cache's rules by default).
+        Returns:
+            tuple: Probabilities of finishing on 17, 18, 19, 20, 21 and of busting.
+        """
+        return self._cached(upcard, self.composition_key(counts), rules or self.rules)
+
+    def distribution_for_shoe(self, upcard, shoe):
+        """Distribution for a dealer drawing from a Shoe whose upcard has already been dealt."""
+        return self._cached(upcard, self.composition_key(shoe.rank_counts[1:]), self.rules)
+
+    def stand_reward(self, player_total, distribution, natural=False, rules=None):
+        """
+        Expected scaled reward of a single bet standing on ``player_total``.
+        Args:
+            player_total: Best total of the player's hand (over 21 is a bust).
+            distribution: Dealer outcome distribution from distribution().
+            natural: Whether the hand is a two-card 21 that is paid the natural payout when it wins.
+            rules: Rules settling the bet (the cache's rules by default).
+        """
+        rules = rules or self.rules
+        if rules not in self._stand_rewards:
+            # Reward of each player total against each dealer outcome; a dealer bust scores 22
+            self._stand_rewards[rules] = [[rules.settle(total, dealer) for dealer in (17, 18, 19, 20, 21, 22)]
+                                          for total in range(MAX_TOTAL + 1)]
+        rewards = self._stand_rewards[rules][min(player_total, MAX_TOTAL)]
+        if natural:
+            return rules.natural_reward * (1.0 - distribution[4])  # Only a dealer 21 pushes a natural
+        return sum(probability * reward for probability, reward in zip(distribution, rewards))
+
+    def cache_info(self):
+        info = self._cached.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+    def _compute(self, upcard, key, rules):
+        stands = rules.dealer_stands
+        fixed_memo, memo = {}, {}
+        probabilities = INFINITE_DECK_PROBABILITIES
+        if key is not None and self.resolution is not None:
+            # Spread each group's share over its ranks in full-shoe proportions
+            shares = [0.0] * 10
+            for group, share in zip(RANK_GROUPS, key):
+                for rank in group:
+                    shares[rank - 1] = share / len(group)
+            probabilities = tuple(share / sum(shares) for share in shares)
+
+        def finish(hard_total, has_ace):
+            total = hard_total + 10 if has_ace and hard_total <= 11 else hard_total
+            outcome = [0.0] * len(DEALER_OUTCOMES)
+            outcome[BUST if total > 21 else total - 17] = 1.0
+            return outcome
+
+        def draw_fixed(hard_total, has_ace):
+            # Draws at fixed probabilities: the state is just the dealer's hand
+            state = (hard_total, has_ace)
+            if state not in fixed_memo:
+                if stands[min(hard_total, MAX_TOTAL)][has_ace]:
+                    fixed_memo[state] = finish(hard_total, has_ace)
+                else:
+                    outcome = [0.0] * len(DEALER_OUTCOMES)
+                    for rank, probability in enumerate(probabilities, 1):
+                        for index, value in enumerate(draw_fixed(hard_total + rank, has_ace or rank == 1)):
+                            outcome[index] += probability * value
+                    fixed_memo[state] = outcome
+            return fixed_memo[state]
+
+        def draw(hard_total, has_ace, drawn, remaining):
+            # ``drawn`` packs the multiset of cards taken so far (4 bits per rank), which fixes the whole state
+            if drawn in memo:
+                return memo[drawn]
+            if stands[min(hard_total, MAX_TOTAL)][has_ace]:
+                outcome = finish(hard_total, has_ace)
+            elif not remaining:  # An exhausted shoe would be reshuffled; finish as if from an infinite deck
+                outcome = draw_fixed(hard_total, has_ace)
+            else:
+                outcome = [0.0] * len(DEALER_OUTCOMES)
+                for rank in range(1, 11):
+                    count = counts[rank - 1]
+                    if count:
+                        counts[rank - 1] = count - 1
+                        probability = count / remaining
+                        next_outcome = draw(hard_total + rank, has_ace or rank == 1,
+                                            drawn + (1 << 4 * (rank - 1)), remaining - 1)
+                        for index, value in enumerate(next_outcome):
+                            outcome[index] += probability * value
+                        counts[rank - 1] = count
+            memo[drawn] = outcome
+            return outcome
+
+        if key is None or self.resolution is not None:
+            return tuple(draw_fixed(upcard, upcard == 1))
+        counts = list(key)
+        return tuple(draw(upcard, upcard == 1, 0, sum(counts)))
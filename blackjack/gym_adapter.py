@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+try:
+    import gymnasium as gym
+    GYMNASIUM = True
+except ImportError:
+    try:
+        import gym
+    except ImportError as error:
+        raise ImportError("The gym adapter needs gymnasium or gym installed.") from error
+    GYMNASIUM = False
+
+from blackjack.custom_env import CustomBlackjackEnv
+
+
+class GymBlackjackEnv(gym.Env):
+    """
+    Thin gym.Env (or gymnasium.Env) wrapper around CustomBlackjackEnv, for code that expects a registered-style env.
+
+    With gymnasium, reset() returns (obs, info) and step() returns
+    (obs, reward, terminated, truncated, info); with gym the 0.22 API of
+    CustomBlackjackEnv is passed through unchanged. Importing this module is
+    the only place gym is loaded.
+    """
+
+    metadata = {"render_modes": []}
+
+    def __init__(self, count_in_obs=False, rules=None):
+        """
+        Args:
+            count_in_obs: Append the shoe's count features to every observation (see CustomBlackjackEnv).
+            rules: Rules of the table (blackjack.rules.DEFAULT_RULES by default).
+        """
+        self.env = CustomBlackjackEnv(count_in_obs=count_in_obs, rules=rules)
+        self.action_space = gym.spaces.Discrete(5 if self.env.rules.surrender else 4)
+        observation = [gym.spaces.Discrete(32), gym.spaces.Discrete(11), gym.spaces.Discrete(2)]
+        if count_in_obs:
+            observation.append(gym.spaces.Box(-float("inf"), float("inf"), shape=(3,)))
+        self.observation_space = gym.spaces.Tuple(observation)
+
+    def seed(self, seed=None):
+        return self.env.seed(seed)
+
+    def reset(self, seed=None, options=None):
+        if seed is not None:
+            self.env.seed(seed)
+        obs = self.env.reset()
+        return (obs, {}) if GYMNASIUM else obs
+
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
+        return (obs, reward, done, False, info) if GYMNASIUM else (obs, reward, done, info)
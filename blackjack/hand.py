@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+RANK_BITS = 5  # Each rank's count lives in its own 5-bit field of a packed hand key
+_KEY_BITS = [0] + [1 << (RANK_BITS * (card - 1)) for card in range(1, 11)]
+
+
+class Hand(list):
+    """
+    List of card values that keeps its score up to date as cards are added.
+
+    The hard total, ace count and packed multiset key (the same key as
+    agent.q_table.cards_key) are updated by append, extend and pop, so scoring
+    a hand or looking up its Q-table row never rescans or sorts the cards.
+    Other in-place list mutations are not tracked.
+    """
+
+    __slots__ = ("hard_total", "aces", "key")
+
+    def __init__(self, cards=()):
+        # Built empty and grown with append: cheaper than list.__init__ plus a rescan
+        self.hard_total = 0
+        self.aces = 0
+        self.key = 0
+        if cards:
+            self.extend(cards)
+
+    @classmethod
+    def dealt(cls, first, second=0):
+        """Hand of one or two freshly dealt cards, set up directly rather than through append (for resets)."""
+        hand = cls.__new__(cls)
+        if second:
+            list.extend(hand, (first, second))
+        else:
+            list.append(hand, first)
+        hand.hard_total = first + second
+        hand.aces = (first == 1) + (second == 1)
+        hand.key = _KEY_BITS[first] + _KEY_BITS[second]
+        return hand
+
+    def __reduce__(self):
+        return Hand, (list(self),)
+
+    def append(self, card):
+        list.append(self, card)
+        self.hard_total += card
+        self.aces += card == 1
+        self.key += _KEY_BITS[card]
+
+    def extend(self, cards):
+        for card in cards:
+            self.append(card)
+
+    def pop(self, index=-1):
+        card = list.pop(self, index)
+        self.hard_total -= card
+        self.aces -= card == 1
+        self.key -= _KEY_BITS[card]
+        return card
+
+    def copy(self):
+        """Independent Hand with the same cards, copying the tracked totals instead of rescoring."""
+        hand = Hand.__new__(Hand)
+        list.extend(hand, self)
+        hand.hard_total, hand.aces, hand.key = self.hard_total, self.aces, self.key
+        return hand
+
+    def clear(self):
+        list.clear(self)
+        self.hard_total = self.aces = self.key = 0
+
+    @property
+    def soft(self):
+        """True if an ace can count as 11 without busting (a usable ace)."""
+        return self.aces > 0 and self.hard_total <= 11
+
+    @property
+    def total(self):
+        """Best total of the hand."""
+        if self.aces and self.hard_total <= 11:
+            return self.hard_total + 10
+        return self.hard_total
+
+    @property
+    def is_bust(self):
+        return self.hard_total > 21
+
+    @property
+    def is_pair(self):
+        return len(self) == 2 and self[0] == self[1]
+
+    @property
+    def is_natural(self):
+        return len(self) == 2 and self.aces == 1 and self.hard_total == 11
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+from itertools import chain
+from operator import length_hint
+
+import numpy as np
+
+BLOCK_SIZE = 4096
+STREAMS = {"env": 0, "agent": 1, "eval": 2}  # Last element of a stream's key below its owner's seed
+
+
+def seed_sequence(seed=None):
+    """SeedSequence of an int, of None (fresh OS entropy) or of a SeedSequence (returned as is)."""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def child_seed(seed, *key):
+    """
+    Independent SeedSequence at a fixed path below a root seed.
+
+    child_seed(0, worker, STREAMS["agent"]) is the exploration stream of one
+    worker of a run seeded with 0. Unlike SeedSequence.spawn the child neither
+    depends on nor changes how many children were spawned before, so any stream
+    of a run can be rebuilt from the root seed and its path alone.
+    """
+    root = seed_sequence(seed)
+    return np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + tuple(key), pool_size=root.pool_size)
+
+
+class RandomStream:
+    """
+    Python floats drawn from a NumPy Generator in blocks.
+
+    One Generator.random call fills a block of ``block_size`` uniforms that
+    random() hands out one at a time; random is the ``__next__`` of a chain of
+    such blocks, so a draw costs about as much as ``random.random()`` rather
+    than a NumPy call. The stream depends on its seed alone, never on
+    the global ``random`` or ``np.random`` state, and get_state() captures it
+    mid-block so a resumed run continues bit for bit.
+    """
+
+    def __init__(self, seed=None, block_size=BLOCK_SIZE):
+        """
+        Args:
+            seed: Int, SeedSequence (see child_seed) or None for fresh OS entropy.
+            block_size: Uniforms drawn per Generator call.
+        """
+        self.generator = np.random.default_rng(seed_sequence(seed))
+        self.block_size = block_size
+        self._start()
+
+    def _start(self, skip=0):
+        self.random = chain.from_iterable(self._blocks()).__next__  # Next float in [0, 1)
+        for _ in range(skip):
+            self.random()
+
+    def _blocks(self):
+        while True:
+            self._block_state = self.generator.bit_generator.state
+            self._block = iter(self.generator.random(self.block_size).tolist())
+            yield self._block
+
+    def choice(self, sequence):
+        """Uniformly chosen element of a non-empty sequence."""
+        return sequence[int(self.random() * len(sequence))]
+
+    def get_state(self):
+        """JSON-serialisable position of the stream: the generator state of the block and the draws taken from it."""
+        if not hasattr(self, "_block"):  # Nothing drawn yet
+            return {"block_state": self.generator.bit_generator.state, "position": 0}
+        return {"block_state": self._block_state, "position": self.block_size - length_hint(self._block)}
+
+    def set_state(self, state):
+        """Resume from get_state() by redrawing the block and skipping the draws already taken."""
+        self.generator.bit_generator.state = state["block_state"]
+        self.__dict__.pop("_block", None)
+        self._start(state["position"])
+
+    def __getstate__(self):
+        return {"generator": self.generator, "block_size": self.block_size, "state": self.get_state()}
+
+    def __setstate__(self, state):
+        self.generator, self.block_size = state["generator"], state["block_size"]
+        self.set_state(state["state"])
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+import numpy as np
+
+MAX_TOTAL = 31  # Highest best total a player hand can reach (hard 21 plus a ten)
+
+
+class Rules:
+    """
+    Table rules, compiled once into lookup tables shared by the scalar and batched envs.
+
+    The defaults reproduce the historical CustomBlackjackEnv: six decks, the
+    dealer stands on all 17s, a natural pays 3:2, doubling is allowed after a
+    split, no surrender, rewards are scaled by 10 and an illegal action costs 50.
+    Rule checks become table lookups, so the envs never branch on the config
+    while playing.
+    """
+
+    def __init__(self, decks=6, dealer_hits_soft_17=False, blackjack_payout=1.5, penetration=None,
+                 reshuffle_reserve=40, round_end_reserve=15, double_after_split=True, max_hands=4,
+                 surrender=False, reward_scale=10, illegal_action_penalty=-50):
+        """
+        Args:
+            decks: Number of 52-card decks in the shoe.
+            dealer_hits_soft_17: H17 when True, S17 when False.
+            blackjack_payout: Payout of a natural (1.5 for 3:2, 1.2 for 6:5).
+            penetration: Fraction of the shoe dealt before reshuffling; overrides reshuffle_reserve.
+            reshuffle_reserve: Reshuffle before a draw once fewer cards than this remain.
+            round_end_reserve: Scalar env only: reshuffle after a round once fewer cards than this remain.
+            double_after_split: Whether a split hand may double.
+            max_hands: Most hands a player may hold by splitting and re-splitting.
+            surrender: Whether late surrender (action 4) is offered on the first two cards.
+            reward_scale: Multiplier applied to every payout.
+            illegal_action_penalty: Reward of an illegal split, double or surrender; it ends the round.
+        """
+        self.decks = decks
+        self.dealer_hits_soft_17 = dealer_hits_soft_17
+        self.blackjack_payout = blackjack_payout
+        self.penetration = penetration
+        self.double_after_split = double_after_split
+        self.max_hands = max_hands
+        self.surrender = surrender
+        self.reward_scale = reward_scale
+        self.illegal_action_penalty = illegal_action_penalty
+
+        self.shoe_size = 52 * decks
+        if penetration is not None:
+            reshuffle_reserve = self.shoe_size - int(round(penetration * self.shoe_size))
+        self.reshuffle_reserve = reshuffle_reserve
+        self.round_end_reserve = round_end_reserve
+        self._hash = hash(tuple(sorted(self.settings().items())))  # Rules key caches, so hashing must be cheap
+        self._compile()
+
+    @classmethod
+    def preset(cls, name):
+        """Build the rules of a named preset from config.RULE_PRESETS."""
+        from config import RULE_PRESETS
+        return cls(**RULE_PRESETS[name])
+
+    def settings(self):
+        """Constructor arguments that rebuild these rules."""
+        return {
+            "decks": self.decks,
+            "dealer_hits_soft_17": self.dealer_hits_soft_17,
+            "blackjack_payout": self.blackjack_payout,
+            "penetration": self.penetration,
+            "reshuffle_reserve": self.reshuffle_reserve,
+            "round_end_reserve": self.round_end_reserve,
+            "double_after_split": self.double_after_split,
+            "max_hands": self.max_hands,
+            "surrender": self.surrender,
+            "reward_scale": self.reward_scale,
+            "illegal_action_penalty": self.illegal_action_penalty,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, Rules) and self.settings() == other.settings()
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"Rules({', '.join(f'{key}={value!r}' for key, value in self.settings().items())})"
+
+    def _compile(self):
+        # dealer_stands[hard total][has ace]: whether the dealer stops drawing
+        stands = np.zeros((MAX_TOTAL + 1, 2), dtype=bool)
+        for hard_total in range(MAX_TOTAL + 1):
+            for has_ace in (False, True):
+                soft = has_ace and hard_total <= 11
+                total = hard_total + 10 * soft
+                stands[hard_total, int(has_ace)] = total >= 17 and not (soft and total == 17 and self.dealer_hits_soft_17)
+        self.dealer_stands_table = stands
+        self.dealer_stands = stands.tolist()
+
+        # outcome[player total][dealer total]: scaled reward of a single bet; a busted player always loses
+        outcome = np.zeros((MAX_TOTAL + 1, MAX_TOTAL + 1))
+        for player in range(MAX_TOTAL + 1):
+            for dealer in range(MAX_TOTAL + 1):
+                if player > 21:
+                    outcome[player, dealer] = -1
+                elif dealer > 21:
+                    outcome[player, dealer] = 1
+                else:
+                    outcome[player, dealer] = np.sign(player - dealer)
+        self.outcome_table = outcome * self.reward_scale
+        self.outcome = self.outcome_table.tolist()
+        self.natural_reward = self.blackjack_payout * self.reward_scale
+        self.bust_reward = -self.reward_scale
+        self.surrender_reward = -0.5 * self.reward_scale
+
+    def dealer_should_stand(self, hard_total, has_ace):
+        return self.dealer_stands[min(hard_total, MAX_TOTAL)][has_ace]
+
+    def settle(self, player_total, dealer_total):
+        """Scaled reward of a single bet given both best totals."""
+        return self.outcome[min(player_total, MAX_TOTAL)][min(dealer_total, MAX_TOTAL)]
+
+
+DEFAULT_RULES = Rules()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+import numpy as np
+
+CARD_VALUES = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10], dtype=np.int8)
+HI_LO = (0, -1, 1, 1, 1, 1, 1, 0, 0, 0, -1)  # Count tag of each card value (index 0 unused)
+
+
+class Shoe:
+    """
+    Multi-deck shoe stored as a preallocated array read through a cursor.
+
+    Rank counts, the Hi-Lo running count and the penetration are updated on
+    every draw, so count-aware code reads them in O(1). Shuffling and stack()
+    replace the card array and list rather than mutate them, so checkpoint()
+    can share them instead of copying.
+    """
+
+    def __init__(self, deck_count=6, rng=None):
+        """
+        Args:
+            deck_count: Number of 52-card decks.
+            rng: np.random.Generator shuffling the shoe (one seeded from fresh entropy by default).
+        """
+        self.deck_count = deck_count
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.cards = np.tile(CARD_VALUES, 4 * deck_count)
+        self.size = self.cards.size
+        self._full_counts = [0] + [4 * deck_count] * 9 + [16 * deck_count]
+        self.shuffle()
+
+    def shuffle(self):
+        """Return every card to the shoe and shuffle it."""
+        self.cards = self.rng.permutation(self.cards)  # Same draws and result as shuffle, on a new array
+        self._order = self.cards.tolist()  # Python ints draw faster than NumPy scalars
+        self.cursor = 0
+        self.rank_counts = list(self._full_counts)
+        self.running_count = 0
+
+    def draw(self):
+        """Deal the next card."""
+        card = self._order[self.cursor]
+        self.cursor += 1
+        self.rank_counts[card] -= 1
+        self.running_count += HI_LO[card]
+        return card
+
+    def stack(self, cards):
+        """
+        Move ``cards`` to the top of the shoe so they are dealt next (for tests and scenario analysis).
+        The shoe keeps its composition, so the counts stay exact.
+        """
+        order = self._order = list(self._order)  # Checkpoints share the old list
+        for position, card in enumerate(cards, self.cursor):
+            try:
+                source = order.index(card, position)
+            except ValueError:
+                raise ValueError(f"No {card} left in the shoe to stack") from None
+            order[position], order[source] = order[source], order[position]
+
+    def get_state(self):
+        """Snapshot of the shoe, including its RNG, that set_state can restore."""
+        if hasattr(self.rng, "bit_generator"):
+            rng_state = self.rng.bit_generator.state
+        else:
+            rng_state = self.rng.get_state()
+        return self.cards.copy(), list(self._order), self.cursor, list(self.rank_counts), self.running_count, rng_state
+
+    def set_state(self, state):
+        """Restore a snapshot taken by get_state."""
+        cards, order, self.cursor, rank_counts, self.running_count, rng_state = state
+        self.cards = cards.copy()
+        self._order = list(order)
+        self.rank_counts = list(rank_counts)
+        if hasattr(self.rng, "bit_generator"):
+            self.rng.bit_generator.state = rng_state
+        else:
+            self.rng.set_state(rng_state)
+
+    def checkpoint(self):
+        """Cheap snapshot for rewinding to the same point many times (see restore); shares the card lists."""
+        if hasattr(self.rng, "bit_generator"):
+            rng_state = self.rng.bit_generator.state
+        else:
+            rng_state = self.rng.get_state()
+        return self.cards, self._order, self.cursor, tuple(self.rank_counts), self.running_count, rng_state
+
+    def restore(self, checkpoint):
+        """Rewind to a checkpoint, so the same cards are dealt again, across reshuffles too."""
+        cards, self._order, self.cursor, rank_counts, self.running_count, rng_state = checkpoint
+        self.rank_counts = list(rank_counts)
+        if cards is self.cards:
+            return  # Not reshuffled since, so the generator has not moved either
+        self.cards = cards
+        if hasattr(self.rng, "bit_generator"):
+            self.rng.bit_generator.state = rng_state
+        else:
+            self.rng.set_state(rng_state)
+
+    @property
+    def remaining(self):
+        return self.size - self.cursor
+
+    @property
+    def penetration(self):
+        """Fraction of the shoe dealt since the last shuffle."""
+        return self.cursor / self.size
+
+    @property
+    def true_count(self):
+        """Running count per deck still in the shoe."""
+        return self.running_count * 52 / max(self.remaining, 1)
+
+    def peek(self, count):
+        """The next ``count`` cards (fewer near the end of the shoe) without dealing them."""
+        return self._order[self.cursor:self.cursor + count]
+
+    def remaining_cards(self):
+        """List of the undealt cards in dealing order."""
+        return self._order[self.cursor:]
+
+    def observation(self):
+        """Count features for count-aware agents: (running count, true count, penetration)."""
+        return self.running_count, self.true_count, self.penetration
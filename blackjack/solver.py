@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+import math
+
+from blackjack.dealer import DealerOutcomeCache, INFINITE_DECK_PROBABILITIES, DEALER_OUTCOMES
+from blackjack.rules import DEFAULT_RULES
+
+ACTIONS = (0, 1, 2, 3)  # Stick, Hit, Double Down, Split
+
+
+def _score(hard_total, has_ace):
+    return hard_total + 10 if has_ace and hard_total + 10 <= 21 else hard_total
+
+
+class BlackjackSolver:
+    """
+    Expected values of every action under the CustomBlackjackEnv rules.
+
+    The dealer shows one card and draws until the rules let it stand (all 17s
+    by default). A two-card 21 that wins pays ``natural_payout``, a double stakes twice the
+    bet on exactly one more card, and a pair may be split once into two hands
+    that each receive one card and may then hit, stand or double. Values are
+    in units of one bet (the env scales rewards by 10).
+
+    With ``deck_count=None`` cards are drawn from an infinite deck and the values
+    are exact. Otherwise the cards on the table at the decision (player hand and
+    dealer upcard) are removed from a ``deck_count``-deck shoe: the dealer's draws
+    deplete that composition exactly, while the player's own later draws use it
+    unchanged. Finite-deck values are therefore an approximation, close for
+    multi-deck shoes but not the exact composition-dependent optimum.
+    """
+
+    def __init__(self, deck_count=None, natural_payout=None, rules=None):
+        """
+        Args:
+            deck_count: Number of decks in the shoe, or None for an infinite deck.
+            natural_payout: Payout of a winning two-card 21 (rules.blackjack_payout by default).
+            rules: Rules deciding when the dealer stands (blackjack.rules.DEFAULT_RULES by default).
+        """
+        self.rules = rules or DEFAULT_RULES
+        self.deck_count = deck_count
+        self.natural_payout = self.rules.blackjack_payout if natural_payout is None else natural_payout
+        self._hand_values = {}
+        self.dealer = DealerOutcomeCache(self.rules, cache_size=None)  # Exact compositions, never evicted
+
+    def _removed_key(self, cards):
+        """Cards that change the shoe composition, as a hashable key (nothing for an infinite deck)."""
+        return () if self.deck_count is None else tuple(sorted(cards))
+
+    def _composition(self, removed):
+        if self.deck_count is None:
+            return None
+        counts = [4 * self.deck_count] * 9 + [16 * self.deck_count]
+        for card in removed:
+            counts[card - 1] -= 1
+        return tuple(counts)
+
+    @staticmethod
+    def _probabilities(counts):
+        if counts is None:
+            return INFINITE_DECK_PROBABILITIES
+        remaining = sum(counts)
+        return tuple(count / remaining for count in counts)
+
+    def dealer_distribution(self, upcard, removed=()):
+        """
+        Probability of each final dealer outcome.
+        Args:
+            upcard: Dealer's visible card (1-10).
+            removed: Cards already out of the shoe besides the upcard (ignored for an infinite deck).
+        Returns:
+            tuple: Probabilities of finishing on 17, 18, 19, 20, 21 and of busting.
+        """
+        return self.dealer.distribution(upcard, self._composition(self._removed_key(removed) + (upcard,)))
+
+    def _stand_value(self, total, natural, dealer):
+        """Expected value of standing on ``total`` against a dealer outcome distribution."""
+        if total > 21:
+            return -1.0
+        if natural:
+            return self.natural_payout * (1.0 - dealer[4])
+        win = dealer[5] + sum(dealer[:max(0, total - 17)])
+        lose = sum(dealer[max(0, total - 16):5])
+        return win - lose
+
+    def _values(self, player_cards, upcard):
+        """Return (probabilities, dealer distribution, memo) shared by every decision from this table state."""
+        removed = self._removed_key(player_cards)
+        key = (removed, upcard)
+        if key not in self._hand_values:
+            counts = self._composition(removed + (upcard,))
+            self._hand_values[key] = (self._probabilities(counts), self.dealer_distribution(upcard, removed), {})
+        return self._hand_values[key]
+
+    def _continue_value(self, hard_total, has_ace, probabilities, dealer, memo):
+        """Value of a hand that may still stand or hit (no double, no split)."""
+        total = _score(hard_total, has_ace)
+        if total > 21:
+            return -1.0
+        key = (hard_total, has_ace)
+        if key not in memo:
+            memo[key] = max(self._stand_value(total, False, dealer),
+                            self._hit_value(hard_total, has_ace, probabilities, dealer, memo))
+        return memo[key]
+
+    def _hit_value(self, hard_total, has_ace, probabilities, dealer, memo):
+        return sum(probability * self._continue_value(hard_total + rank, has_ace or rank == 1, probabilities, dealer, memo)
+                   for rank, probability in enumerate(probabilities, 1))
+
+    def _double_value(self, hard_total, has_ace, probabilities, dealer):
+        return 2 * sum(probability * self._stand_value(_score(hard_total + rank, has_ace or rank == 1), False, dealer)
+                       for rank, probability in enumerate(probabilities, 1))
+
+    def _two_card_values(self, first, second, probabilities, dealer, memo):
+        """Stick, hit and double values of a two-card hand."""
+        hard_total, has_ace = first + second, 1 in (first, second)
+        total = _score(hard_total, has_ace)
+        return (self._stand_value(total, total == 21, dealer),
+                self._hit_value(hard_total, has_ace, probabilities, dealer, memo),
+                self._double_value(hard_total, has_ace, probabilities, dealer))
+
+    def action_values(self, player_cards, upcard):
+        """
+        Expected value of each action from a table state.
+        Args:
+            player_cards: Cards in the player's current hand.
+            upcard: Dealer's visible card.
+        Returns:
+            tuple: Values of (Stick, Hit, Double Down, Split); NaN where the action is not offered
+            (double after the first two cards, split without a pair).
+        """
+        player_cards = tuple(player_cards)
+        probabilities, dealer, memo = self._values(player_cards, upcard)
+        hard_total, has_ace = sum(player_cards), 1 in player_cards
+        if len(player_cards) == 2:
+            stick, hit, double = self._two_card_values(*player_cards, probabilities, dealer, memo)
+        else:
+            total = _score(hard_total, has_ace)
+            stick = self._stand_value(total, False, dealer)
+            hit = self._hit_value(hard_total, has_ace, probabilities, dealer, memo) if total <= 21 else -1.0
+            double = math.nan
+        split = math.nan
+        if len(player_cards) == 2 and player_cards[0] == player_cards[1]:
+            pair = player_cards[0]
+            split = 2 * sum(probability * max(self._two_card_values(pair, rank, probabilities, dealer, memo))
+                            for rank, probability in enumerate(probabilities, 1))
+        return stick, hit, double, split
+
+    def best_action(self, player_cards, upcard):
+        """Return the action with the highest expected value."""
+        values = self.action_values(player_cards, upcard)
+        return max(ACTIONS, key=lambda action: -math.inf if math.isnan(values[action]) else values[action])
+
+    def policy_table(self):
+        """
+        Solve every two-card starting hand against every upcard.
+        Returns:
+            dict: {(sorted two-card hand, upcard): (best action, action values)}.
+        """
+        table = {}
+        for first in range(1, 11):
+            for second in range(first, 11):
+                for upcard in range(1, 11):
+                    values = self.action_values((first, second), upcard)
+                    table[(first, second), upcard] = (self.best_action((first, second), upcard), values)
+        return table
+
+    def expected_value(self):
+        """Expected value per round of optimal play, dealt player card, dealer upcard, player card."""
+        full = self._composition(())
+        total = 0.0
+        for first, p_first in enumerate(self._probabilities(full), 1):
+            after_first = self._composition((first,))
+            for upcard, p_up in enumerate(self._probabilities(after_first), 1):
+                after_up = self._composition((first, upcard))
+                for second, p_second in enumerate(self._probabilities(after_up), 1):
+                    values = self.action_values(tuple(sorted((first, second))), upcard)
+                    best = max(value for value in values if not math.isnan(value))
+                    total += p_first * p_up * p_second * best
+        return total
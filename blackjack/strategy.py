@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+import numpy as np
+
+from blackjack.rules import MAX_TOTAL
+
+HARD, SOFT, PAIR = 0, 1, 2
+STICK, HIT, DOUBLE, SPLIT, SURRENDER = 0, 1, 2, 3, 4
+
+
+def hand_category(player_total, usable_ace, player_cards):
+    """
+    Locate a hand in a StrategyTable.
+    Returns:
+        tuple: (category, index) where index is the pair rank for pairs and the hand total otherwise.
+    """
+    if len(player_cards) == 2 and player_cards[0] == player_cards[1]:
+        return PAIR, player_cards[0]
+    return (SOFT if usable_ace else HARD), player_total
+
+
+class StrategyTable:
+    """
+    Fixed policy compiled into an int8 array indexed by
+    [category (hard/soft/pair), total or pair rank, dealer card, can double].
+    """
+
+    def __init__(self, actions):
+        self.actions = actions
+        self._cells = actions.tolist()  # Nested lists index faster than an ndarray for one hand
+
+    @classmethod
+    def compile(cls, rule):
+        """
+        Evaluate ``rule(category, total, dealer_card, can_double)`` once for every cell.
+        For pairs ``total`` is the rank of the paired card.
+        """
+        actions = np.zeros((3, MAX_TOTAL + 1, 11, 2), dtype=np.int8)
+        for category in (HARD, SOFT, PAIR):
+            for total in range(MAX_TOTAL + 1):
+                for dealer_card in range(1, 11):
+                    for can_double in (False, True):
+                        actions[category, total, dealer_card, int(can_double)] = rule(category, total, dealer_card, can_double)
+        return cls(actions)
+
+    def choose_action(self, player_total, dealer_card, usable_ace, player_cards):
+        """Look up the action for one hand."""
+        two_cards = len(player_cards) == 2
+        if two_cards and player_cards[0] == player_cards[1]:
+            column = self._cells[PAIR][player_cards[0]]
+        else:
+            column = self._cells[SOFT if usable_ace else HARD][min(player_total, MAX_TOTAL)]
+        return column[dealer_card][two_cards]
+
+    def choose_actions(self, states):
+        """
+        Look up actions for many hands at once.
+        Args:
+            states: Integer array of shape (n, 4) with columns (category, total or pair rank, dealer card, can double).
+        Returns:
+            np.ndarray: Actions of shape (n,).
+        """
+        states = np.asarray(states)
+        return self.actions[states[:, 0], np.minimum(states[:, 1], MAX_TOTAL), states[:, 2], states[:, 3]]
+
+
+def _basic_strategy_rule(category, total, dealer_card, can_double):
+    """Basic strategy for a single table cell."""
+    if category == PAIR:
+        rank = total
+        if rank in (8, 1):  # Always split Aces and 8s
+            return SPLIT
+        elif rank == 9 and dealer_card not in (7, 10, 1):  # Split 9s unless dealer shows 7, 10, or Ace
+            return SPLIT
+        elif rank == 6 and dealer_card in (2, 3, 4, 5, 6):  # Split 6s if dealer shows 2-6
+            return SPLIT
+        # Never split 10s or 5s; every other pair is played as its hard total
+        category, total = HARD, 2 * rank
+
+    # Soft totals (usable Ace)
+    if category == SOFT:
+        if total <= 17:
+            return HIT
+        elif total == 18:
+            if dealer_card in (3, 4, 5, 6):
+                return DOUBLE if can_double else STICK
+            elif dealer_card in (2, 7, 8):
+                return STICK
+            else:
+                return HIT
+        else:
+            return STICK  # Stick on soft 19+
+
+    # Hard totals
+    if total >= 17:
+        return STICK
+    elif 13 <= total <= 16 and dealer_card in (2, 3, 4, 5, 6):
+        return STICK  # Stick if dealer has 2-6
+    elif total == 12 and dealer_card in (4, 5, 6):
+        return STICK  # Stick if dealer has 4-6
+    elif total == 11 or (total == 10 and dealer_card < 10):
+        return DOUBLE if can_double else HIT  # Double down only on first two cards
+    elif total == 9 and dealer_card in (3, 4, 5, 6):
+        return DOUBLE if can_double else HIT
+    else:
+        return HIT
+
+
+BASIC_STRATEGY = StrategyTable.compile(_basic_strategy_rule)
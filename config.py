@@ -1 +1,25 @@
 #!/usr/bin/env python3
+# Named rule variants for blackjack.Rules.preset (and Rules(**RULE_PRESETS[name])).
+# Any setting left out keeps the Rules default, which matches the original env.
+RULE_PRESETS = {
+    "default": {},
+    "h17": {"dealer_hits_soft_17": True},
+    "h17_no_das": {"dealer_hits_soft_17": True, "double_after_split": False},
+    "late_surrender": {"surrender": True},
+    "six_to_five": {"blackjack_payout": 1.2},
+    "single_deck": {"decks": 1, "penetration": 0.5, "double_after_split": False, "max_hands": 2},
+    "double_deck": {"decks": 2, "penetration": 0.65},
+    "deep_shoe": {"decks": 8, "penetration": 0.85, "surrender": True},
+}
+
+# Search space of training.sweep: lists are grid values, (low, high[, "log"]) tuples are ranges for
+# random search and plain values are fixed. Keys are QLearningAgent arguments.
+SWEEP_SPACE = {
+    "alpha": [0.7, 0.1, 0.01],
+    "gamma": 1.0,
+    "epsilon": 1.0,
+    "epsilon_decay": [0.9999, 0.99999],
+    "epsilon_min": [0.05, 0.1],
+    "alpha_decay": [0.99, 0.99999],
+    "alpha_min": [0.001, 0.01],
+}
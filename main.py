@@ -1,32 +1,112 @@
 #!/usr/bin/env python3
+import argparse
+
 from blackjack.custom_env import CustomBlackjackEnv
-from training import train_agent, evaluate_agents, evaluate_and_compare_agents
-from agent import BasicStrategyAgent, QLearningAgent
+from training import (train_agent_parallel, TrainingMetrics, open_writer, Checkpointer,
+                      evaluate_agents_crn, print_crn_report, compare_policies, format_chart_diff)
+from training.policy_diff import write_chart_csv, plot_chart_diff
+from agent import BasicStrategyAgent, QLearningAgent, OptimalStrategyAgent
+from blackjack import BlackjackSolver, DEFAULT_RULES
+from serving import FrozenPolicy, serve
+from training.sweep import add_sweep_arguments, run_sweep
+from training.profiling import profile_training
+
+def plot_or_skip(diff, path):
+    """Save the chart image when matplotlib is installed; the CSV next to it holds the same cells."""
+    try:
+        plot_chart_diff(diff, path)
+    except ImportError as error:
+        print(f"Skipping {path}: {error}")
+
 
-def main():
+def train():
     
 
     actions = [0, 1, 2, 3]  # Stick, Hit, Double Down, Split
 
-    env = CustomBlackjackEnv()
     q_agent = QLearningAgent(actions=actions, alpha=0.7, gamma=1.0, epsilon=1.0)
     basic_agent = BasicStrategyAgent()
 
     # Train Q-Learning Agent
     print("Training the Q-Learning Agent...")
     episodes = 50000000
-    train_agent(env, q_agent, episodes=episodes)
+    metrics = TrainingMetrics(log_every=1000000, writer=open_writer("logs/train_metrics.csv"))
+    checkpointer = Checkpointer("logs/q_agent_checkpoint", every=5000000)
+    stats = train_agent_parallel(q_agent, episodes=episodes, seed=0, metrics=metrics, checkpointer=checkpointer)
+    metrics.close()
+    print(f"Trained {stats['episodes']} episodes on {stats['workers']} workers "
+          f"at {stats['episodes_per_sec']:.0f} episodes/sec")
 
     # Evaluate Agents
     print("Evaluating Agents...")
     #q_avg_reward, basic_avg_reward =
     q_agent.epsilon = 0
-    evaluate_and_compare_agents(env, q_agent, basic_agent, 1000)
+    diff = compare_policies(q_agent, basic_agent)
+    print(format_chart_diff(diff))
+    write_chart_csv(diff, "logs/policy_diff_basic.csv")
+    plot_or_skip(diff, "logs/policy_diff_basic.png")
+
+    # The solver's policy for this shoe (approximate: the player's own draws do not deplete it) is the target
+    print("Comparing against the solver's near-optimal policy for this shoe...")
+    optimal_agent = OptimalStrategyAgent(BlackjackSolver(deck_count=DEFAULT_RULES.decks))
+    diff = compare_policies(q_agent, optimal_agent)
+    print(format_chart_diff(diff))
+    write_chart_csv(diff, "logs/policy_diff_optimal.csv")
+    plot_or_skip(diff, "logs/policy_diff_optimal.png")
+
+    # Both agents play the same shoes, so the difference is measured with far less noise
+    report = evaluate_agents_crn({"basic": basic_agent, "q_learning": q_agent}, episodes=1000000, seed=0)
+    print_crn_report(report)
 
     #print("\nComparison:")
     #print(f"Q-Learning Agent Average Reward: {q_avg_reward}")
     #print(f"Basic Strategy Agent Average Reward: {basic_avg_reward}")
 
 
+def serve_policy(args):
+    """Serve a frozen Q-table checkpoint, or basic strategy when no checkpoint is given."""
+    if args.checkpoint:
+        policy = FrozenPolicy.from_checkpoint(args.checkpoint, cache_size=args.cache_size)
+    else:
+        policy = FrozenPolicy.from_strategy(cache_size=args.cache_size)
+    serve(policy, args.host, args.port)
+
+
+def profile(args):
+    """Train the Q-learning agent briefly with the phase profiler (and optionally cProfile) attached."""
+    agent = QLearningAgent(actions=[0, 1, 2, 3], alpha=0.7, gamma=1.0, epsilon=1.0)
+    profiler, report = profile_training(CustomBlackjackEnv(), agent, args.episodes, args.cprofile, args.top)
+    print(profiler.format_summary())
+    if report:
+        print(f"\ncProfile statistics written to {args.cprofile}\n{report}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train, evaluate and serve blackjack agents.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("train", help="Train the Q-learning agent and evaluate it (the default).")
+    serve_parser = commands.add_parser("serve", help="Answer policy queries over HTTP.")
+    serve_parser.add_argument("--checkpoint", help="Checkpoint directory to serve (basic strategy if omitted).")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--cache-size", type=int, default=65536, help="LRU entries for canonical hands.")
+    sweep_parser = commands.add_parser("sweep", help="Successive-halving sweep of Q-learning hyperparameters.")
+    add_sweep_arguments(sweep_parser)
+    profile_parser = commands.add_parser("profile", help="Time the phases of the training loop.")
+    profile_parser.add_argument("--episodes", type=int, default=100000)
+    profile_parser.add_argument("--cprofile", help="Also run under cProfile and dump the statistics here.")
+    profile_parser.add_argument("--top", type=int, default=15, help="cProfile functions to print by internal time.")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve_policy(args)
+    elif args.command == "sweep":
+        run_sweep(args)
+    elif args.command == "profile":
+        profile(args)
+    else:
+        train()
+
+
 if __name__ == "__main__":
     main()
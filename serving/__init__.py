@@ -0,0 +1,5 @@
+#!/usr/bin/env python3
+from .frozen_policy import FrozenPolicy
+from .server import PolicyServer, PolicyClient, LatencyRecorder, serve
+
+__all__ = ["FrozenPolicy", "PolicyServer", "PolicyClient", "LatencyRecorder", "serve"]
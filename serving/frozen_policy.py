@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+from functools import lru_cache
+
+import numpy as np
+
+from agent.q_table import cards_key, key_cards
+from blackjack.strategy import BASIC_STRATEGY, HARD, SOFT, PAIR, MAX_TOTAL, STICK, HIT, DOUBLE, SPLIT
+
+ACTION_NAMES = {STICK: "stick", HIT: "hit", DOUBLE: "double", SPLIT: "split"}
+
+
+def _is_card(card):
+    return type(card) is int and 1 <= card <= 10  # Not bool, float or other look-alikes of an int
+
+
+def _check_cards(cards, dealer_card):
+    # A busted hand has no decision left; capping the hard total at 21 also keeps every rank's
+    # count within its 5-bit field of cards_key (32 aces would carry into the 2s)
+    if not cards or not all(_is_card(card) for card in cards) or not _is_card(dealer_card):
+        raise ValueError(f"Invalid hand {list(cards)} against dealer card {dealer_card}")
+    if sum(cards) > 21:
+        raise ValueError(f"Hand {list(cards)} is bust")
+
+
+class FrozenPolicy:
+    """
+    Read-only policy answering (hand, dealer upcard, options) queries.
+
+    Hands are canonicalised to their packed multiset key, so every ordering of
+    the same cards shares one entry of a bounded LRU cache in front of the
+    precomputed lookup. Options say whether doubling and splitting are allowed;
+    a disallowed choice falls back to the policy's best allowed action.
+    """
+
+    def __init__(self, decide, cache_size=65536, source=""):
+        """
+        Args:
+            decide: Function (sorted cards, dealer card, can double, can split) -> action.
+            cache_size: Maximum number of canonical queries kept in the LRU cache.
+            source: Description of where the policy came from, reported by the server.
+        """
+        self.source = source
+        self._decide = decide
+        self._cached = lru_cache(maxsize=cache_size)(self._lookup)
+
+    @classmethod
+    def from_strategy(cls, table=BASIC_STRATEGY, cache_size=65536, source="basic strategy"):
+        """Serve a compiled StrategyTable."""
+        cells = table._cells
+
+        def decide(cards, dealer_card, can_double, can_split):
+            if can_split and len(cards) == 2 and cards[0] == cards[1]:
+                action = cells[PAIR][cards[0]][dealer_card][can_double]
+                if action == SPLIT:
+                    return action
+            hard_total = sum(cards)
+            soft = 1 in cards and hard_total <= 11
+            return cells[SOFT if soft else HARD][min(hard_total + 10 * soft, MAX_TOTAL)][dealer_card][can_double]
+        return cls(decide, cache_size, source)
+
+    @classmethod
+    def from_q_table(cls, q_table, cache_size=65536, source="q-table"):
+        """
+        Serve the greedy policy of a QTable.
+        Every row's actions are ranked once up front (ties broken like np.argmax), so a query is an
+        index lookup plus a scan for the first allowed action.
+        """
+        preferences = np.argsort(-np.asarray(q_table.values), axis=1, kind="stable").astype(np.int8)
+        index = q_table.index
+
+        def decide(cards, dealer_card, can_double, can_split):
+            pair = len(cards) == 2 and cards[0] == cards[1]
+            for action in preferences[index.index(dealer_card, cards)].tolist():
+                if action == DOUBLE and not can_double or action == SPLIT and not (can_split and pair):
+                    continue
+                return action
+            return STICK
+        return cls(decide, cache_size, source)
+
+    @classmethod
+    def from_checkpoint(cls, path, cache_size=65536):
+        """Serve the greedy policy of a checkpoint written by training.save_checkpoint (memory-mapped)."""
+        from training.checkpoint import load_checkpoint
+        agent, episodes = load_checkpoint(path, mmap=True, restore_rng=False)
+        return cls.from_q_table(agent.q_table, cache_size, source=f"{path} ({episodes} episodes)")
+
+    def _lookup(self, hand_key, dealer_card, can_double, can_split):
+        return self._decide(key_cards(hand_key), dealer_card, can_double, can_split)
+
+    def action(self, cards, dealer_card, can_double=None, can_split=True):
+        """
+        Look up the action for one hand.
+        Args:
+            cards: Card values (1-10) of the player's hand, in any order.
+            dealer_card: Dealer's upcard (1-10).
+            can_double: Whether doubling is allowed (defaults to the hand having two cards).
+            can_split: Whether a pair may be split.
+        Returns:
+            int: Action (0 = Stick, 1 = Hit, 2 = Double Down, 3 = Split).
+        """
+        _check_cards(cards, dealer_card)
+        if can_double is None:
+            can_double = len(cards) == 2
+        return self._cached(cards_key(cards), dealer_card, bool(can_double), bool(can_split))
+
+    def actions(self, queries):
+        """Look up a batch of queries, each a dict with ``cards``, ``dealer`` and optional ``can_double``/``can_split``."""
+        return [self.action(query["cards"], query["dealer"], query.get("can_double"), query.get("can_split", True))
+                for query in queries]
+
+    def cache_info(self):
+        info = self._cached.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+import http.client
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from .frozen_policy import ACTION_NAMES
+
+
+class LatencyRecorder:
+    """Keep the latest ``capacity`` request latencies and a query count for percentile and throughput reports."""
+
+    def __init__(self, capacity=100000):
+        self.latencies = np.zeros(capacity)
+        self.capacity = capacity
+        self.requests = 0
+        self.queries = 0
+        self.start_time = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, seconds, queries=1):
+        with self._lock:
+            self.latencies[self.requests % self.capacity] = seconds
+            self.requests += 1
+            self.queries += queries
+
+    def summary(self):
+        """p50/p99 request latency in microseconds and queries per second since the server started."""
+        with self._lock:
+            recent = self.latencies[:min(self.requests, self.capacity)].copy()
+            requests, queries = self.requests, self.queries
+        elapsed = time.perf_counter() - self.start_time
+        p50, p99 = np.percentile(recent, [50, 99]) * 1e6 if requests else (0.0, 0.0)
+        return {"requests": requests, "queries": queries, "p50_us": float(p50), "p99_us": float(p99),
+                "queries_per_sec": queries / max(elapsed, 1e-9)}
+
+
+class _PolicyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so a client reuses one connection
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+    def log_message(self, format, *args):
+        pass  # One line per query would dominate the latency
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            stats = self.server.recorder.summary()
+            stats["cache"] = self.server.policy.cache_info()
+            stats["source"] = self.server.policy.source
+            self._reply(200, stats)
+        elif self.path == "/health":
+            self._reply(200, {"status": "ok"})
+        else:
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if self.path == "/action":
+                action = self.server.policy.actions([request])[0]
+                body, queries = {"action": action, "name": ACTION_NAMES[action]}, 1
+            elif self.path == "/actions":
+                actions = self.server.policy.actions(request["queries"])
+                body, queries = {"actions": actions}, len(actions)
+            else:
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+                return
+        except (ValueError, KeyError, TypeError) as error:
+            self._reply(400, {"error": str(error)})
+            return
+        self._reply(200, body)
+        self.server.recorder.record(time.perf_counter() - start, queries)
+
+
+class PolicyServer(ThreadingHTTPServer):
+    """
+    HTTP front end of a FrozenPolicy.
+
+    POST /action takes one query ``{"cards": [10, 6], "dealer": 10, "can_double": true,
+    "can_split": true}``, POST /actions takes ``{"queries": [...]}``, and GET /stats
+    reports p50/p99 latency, throughput and cache statistics.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, policy, host="127.0.0.1", port=8765):
+        """
+        Args:
+            policy: FrozenPolicy to serve.
+            host: Interface to bind.
+            port: Port to bind; 0 picks a free one (see server_address).
+        """
+        super().__init__((host, port), _PolicyHandler)
+        self.policy = policy
+        self.recorder = LatencyRecorder()
+
+
+class PolicyClient:
+    """Client for a PolicyServer over one persistent connection."""
+
+    def __init__(self, host="127.0.0.1", port=8765, timeout=10):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method, path, body=None):
+        # Bytes let http.client send headers and body in one packet, avoiding delayed-ACK stalls
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        self.connection.request(method, path, body=payload, headers=headers)
+        response = self.connection.getresponse()
+        result = json.loads(response.read())
+        if response.status != 200:
+            raise ValueError(result.get("error", f"HTTP {response.status}"))
+        return result
+
+    def action(self, cards, dealer_card, can_double=None, can_split=True):
+        query = {"cards": list(cards), "dealer": dealer_card, "can_split": can_split}
+        if can_double is not None:
+            query["can_double"] = can_double
+        return self._request("POST", "/action", query)["action"]
+
+    def actions(self, queries):
+        return self._request("POST", "/actions", {"queries": queries})["actions"]
+
+    def stats(self):
+        return self._request("GET", "/stats")
+
+    def close(self):
+        self.connection.close()
+
+
+def serve(policy, host="127.0.0.1", port=8765):
+    """Serve a policy until interrupted."""
+    server = PolicyServer(policy, host, port)
+    print(f"Serving {policy.source} on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
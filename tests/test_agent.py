@@ -1 +1,210 @@
 #!/usr/bin/env python3
+import pytest
+import sys
+import os
+
+# Add the root of the project (21) to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from agent import QLearningAgent, QTable, StateIndex, CanonicalIndex
+from agent.q_table import cards_key, default_state_index
+
+@pytest.fixture
+def q_agent():
+    """Fixture with a greedy Q-Learning agent."""
+    return QLearningAgent(actions=[0, 1, 2, 3], alpha=0.5, gamma=1.0, epsilon=0.0)
+
+def test_cards_key_ignores_order():
+    assert cards_key([10, 1, 5]) == cards_key([5, 10, 1])
+    assert cards_key([2, 3]) != cards_key([5])
+
+def test_state_index_is_perfect():
+    index = default_state_index()
+    rows = {index.index(dealer, cards)
+            for cards in ([10, 6], [6, 10], [1, 7], [8, 8], [2, 3, 5], [4, 6], [10, 10, 10, 1])
+            for dealer in range(1, 11)}
+    assert len(rows) == 6 * 10, "Only reorderings of the same cards should share a row."
+    assert all(0 <= row < index.size for row in rows)
+
+def test_state_index_round_trip():
+    index = StateIndex()
+    row = index.index(7, [6, 1])
+    assert index.describe(row) == (17, 7, True, (1, 6))
+
+def test_oversized_hands_share_the_overflow_row():
+    index = StateIndex()
+    row = index.index(4, [10, 10, 10, 2])
+    assert row == index.index(4, [10, 10, 8, 6])
+    assert index.describe(row) == (32, 4, False, ())
+
+def test_state_representation_matches_index(q_agent):
+    state = q_agent.state_representation(17, 7, True, [6, 1])
+    assert state == q_agent.state_representation(17, 7, True, (1, 6))
+    assert q_agent.q_table.index.describe(state)[3] == (1, 6)
+
+def test_update_moves_only_the_chosen_action(q_agent):
+    state = q_agent.state_representation(16, 10, False, [10, 6])
+    q_agent.update(state, 1, -10, state, True)
+    assert q_agent.q_table[state].tolist() == [0, -5, 0, 0]
+
+def test_update_bootstraps_from_next_state(q_agent):
+    state = q_agent.state_representation(12, 5, False, [10, 2])
+    next_state = q_agent.state_representation(19, 5, False, [10, 2, 7])
+    q_agent.q_table.values[next_state] = [6, 2, 0, 0]
+    q_agent.update(state, 1, 0, next_state, False)
+    assert q_agent.q_table[state][1] == pytest.approx(3)
+
+def test_greedy_action_breaks_ties_like_argmax():
+    table = QTable(4)
+    table.values[3] = [1, 5, 5, 0]
+    assert table.greedy_action(3) == int(np.argmax(table.values[3])) == 1
+    assert table.max_value(3) == 5
+
+def test_choose_action_exploits_when_greedy(q_agent):
+    state = q_agent.state_representation(11, 6, False, [5, 6])
+    q_agent.q_table.values[state] = [0, 1, 3, -2]
+    assert q_agent.choose_action(state) == 2
+
+from agent import BasicStrategyAgent
+from blackjack import BatchedBlackjackEnv, basic_strategy, hand_score
+from blackjack.strategy import BASIC_STRATEGY, HARD, SOFT, PAIR
+
+def _all_two_and_three_card_hands():
+    for first in range(1, 11):
+        for second in range(1, 11):
+            yield [first, second]
+            for third in range(1, 11):
+                if first + second + third <= 21:
+                    yield [first, second, third]
+
+def test_basic_agent_and_basic_strategy_agree():
+    agent = BasicStrategyAgent()
+    for hand in _all_two_and_three_card_hands():
+        total, usable_ace = hand_score(hand)
+        for dealer_card in range(1, 11):
+            state = (total, dealer_card, usable_ace, tuple(sorted(hand)))
+            assert agent.choose_action(state) == basic_strategy(hand, dealer_card), (hand, dealer_card)
+
+def test_soft_18_against_ace_hits():
+    assert basic_strategy([1, 7], 1) == 1
+    assert BasicStrategyAgent().choose_action((18, 1, True, (1, 7))) == 1
+
+def test_double_cells_fall_back_after_two_cards():
+    assert basic_strategy([5, 6], 6) == 2
+    assert basic_strategy([2, 3, 6], 6) == 1, "Hard 11 hits once doubling is no longer offered."
+    assert basic_strategy([1, 2, 5], 4) == 0, "Soft 18 stands once doubling is no longer offered."
+    assert basic_strategy([5, 5], 6) == 2, "A pair of 5s plays as hard 10."
+
+def test_choose_actions_matches_scalar_lookup():
+    agent = BasicStrategyAgent()
+    states = np.array([[HARD, 16, 10, 1], [SOFT, 18, 4, 1], [SOFT, 18, 4, 0], [PAIR, 8, 10, 1], [PAIR, 10, 6, 1]])
+    assert agent.choose_actions(states).tolist() == [1, 2, 0, 3, 0]
+    assert BASIC_STRATEGY.choose_action(16, 10, False, [10, 6]) == 1
+
+def test_strategy_states_from_batched_env():
+    env = BatchedBlackjackEnv(num_envs=3, seed=0)
+    env.reset()
+    env.deal(0, [8, 8], [10])
+    env.deal(1, [1, 7], [4])
+    env.deal(2, [2, 3, 6], [6])
+    assert env.strategy_states().tolist() == [[PAIR, 8, 10, 1], [SOFT, 18, 4, 1], [HARD, 11, 6, 0]]
+    assert BasicStrategyAgent().choose_actions(env.strategy_states()).tolist() == [3, 2, 1]
+
+from agent import QLambdaAgent
+
+def test_canonical_index_merges_equivalent_hands():
+    index = default_state_index("canonical")
+    assert isinstance(index, CanonicalIndex) and index.size == 700, "69 hand classes plus overflow, times 10 dealer cards."
+    assert index.index(7, [2, 3, 5]) == index.index(7, [3, 3, 4]) == index.index(7, [5, 2, 3])
+    assert index.index(7, [2, 3, 5]) != index.index(7, [4, 6]), "Two-card hands can still double and stay apart."
+    assert index.index(7, [5, 5]) != index.index(7, [4, 6]), "Pairs keep their own rows."
+    assert index.index(7, [1, 6]) != index.index(7, [10, 7]), "Soft and hard 17 differ."
+    assert index.index(7, [10, 9, 5]) == index.index(7, [10, 10, 10, 1]) == index.overflow_row * 10 + 6
+    for row in range(0, index.size, 7):
+        total, dealer_card, usable_ace, cards = index.describe(row)
+        if cards:
+            assert index.index(dealer_card, cards) == row, "describe should return a member of the row's class."
+
+def test_agent_trains_with_canonical_index():
+    from blackjack.custom_env import CustomBlackjackEnv
+    from training import train_agent, TrainingMetrics
+    from training.checkpoint import save_checkpoint, load_checkpoint
+    import tempfile
+
+    agent = QLearningAgent(actions=[0, 1, 2, 3], state_index="canonical")
+    assert agent.q_table.values.shape == (700, 4)
+    env = CustomBlackjackEnv()
+    env.seed(0)
+    train_agent(env, agent, episodes=2000, metrics=TrainingMetrics(verbose=False))
+    assert agent.q_table.visits.sum() > 0
+    with tempfile.TemporaryDirectory() as directory:
+        save_checkpoint(agent, os.path.join(directory, "agent"))
+        loaded, _ = load_checkpoint(os.path.join(directory, "agent"), restore_rng=False)
+    assert loaded.q_table.index is agent.q_table.index and np.array_equal(loaded.q_table.values, agent.q_table.values)
+
+def test_monte_carlo_lambda_agent_averages_returns():
+    agent = QLambdaAgent(actions=[0, 1], lam=1.0, alpha_power=1.0, epsilon=0.0)
+    state = agent.state_representation(16, 10, False, [10, 6])
+    for reward in (10, -10, -10, 0):
+        agent.update(state, 0, reward, state, True)
+    assert agent.q_table.values[state, 0] == pytest.approx(-2.5), "lam=1 with 1/n rates is the sample mean."
+    assert agent.q_table.visits[state, 0] == 4
+
+def test_lambda_agent_learns_once_per_episode():
+    agent = QLambdaAgent(actions=[0, 1], lam=0.0, epsilon=1.0, epsilon_decay=0.5)
+    first = agent.state_representation(12, 10, False, [10, 2])
+    second = agent.state_representation(19, 10, False, [10, 2, 7])
+    agent.q_table.values[second] = [4.0, -8.0]
+    agent.update(first, 1, 0, second, False)
+    assert agent.q_table.values[first, 1] == 0 and agent.epsilon == 1.0, "Nothing is learned mid-episode."
+    agent.update(second, 0, 10, second, True)
+    assert agent.q_table.values[first, 1] == pytest.approx(4.0), "lam=0 bootstraps from the pre-episode max."
+    assert agent.q_table.values[second, 0] == pytest.approx(10.0)
+    assert agent.epsilon == 0.5, "Epsilon decays once per episode."
+
+def test_expected_sarsa_target_mixes_in_exploration():
+    agent = QLambdaAgent(actions=[0, 1], lam=0.0, epsilon=0.5, epsilon_decay=1.0, bootstrap="expected")
+    first = agent.state_representation(12, 10, False, [10, 2])
+    second = agent.state_representation(19, 10, False, [10, 2, 7])
+    agent.q_table.values[second] = [4.0, -8.0]
+    agent.update(first, 1, 0, second, False)
+    agent.update(second, 0, 0, second, True)
+    assert agent.q_table.values[first, 1] == pytest.approx(0.5 * -2.0 + 0.5 * 4.0)
+
+from agent import ReplayBuffer
+
+def test_replay_buffer_wraps_around():
+    buffer = ReplayBuffer(capacity=5, n_features=2, seed=0)
+    for start in (0, 3):
+        actions = np.arange(start, start + 3)
+        features = np.stack([actions, actions], axis=1).astype(np.float32)
+        buffer.add_batch(features, actions, actions * 1.0, features + 1, actions % 2 == 0)
+    assert len(buffer) == 5 and buffer.position == 1, "The sixth transition should overwrite the first."
+    assert sorted(buffer.data["action"].tolist()) == [1, 2, 3, 4, 5]
+    batch = buffer.sample(64)
+    assert batch["features"].shape == (64, 2) and batch["features"].flags.c_contiguous
+    assert np.array_equal(batch["features"][:, 0], batch["action"]), "Fields of a sampled row should stay together."
+    assert np.array_equal(batch["done"], batch["action"] % 2 == 0)
+
+def test_dqn_agent_learns_and_acts_consistently():
+    pytest.importorskip("torch")
+    from agent.dqn_agent import DQNAgent
+    from blackjack import BatchedBlackjackEnv
+    from training.dqn import train_dqn
+    from training import TrainingMetrics
+
+    agent = DQNAgent(count_features=True, batch_size=64, buffer_size=10000, epsilon_steps=10, seed=0)
+    env = BatchedBlackjackEnv(num_envs=32, seed=0)
+    metrics = train_dqn(agent, env, steps=40, warmup=200, metrics=TrainingMetrics(verbose=False))
+    assert metrics.episodes > 0 and agent.updates > 0
+    assert agent.epsilon == pytest.approx(agent.epsilon_min), "Epsilon should reach its floor after epsilon_steps."
+
+    env.reset()
+    states = env.strategy_states()
+    batch_actions = agent.choose_actions(states, (np.zeros(32), np.zeros(32), np.zeros(32)))
+    cards, counts = env.current_cards()
+    for table in range(4):
+        hand = cards[table, :counts[table]].tolist()
+        total, dealer_card, usable_ace = (obs[table] for obs in env._get_obs())
+        assert agent.choose_action((total, dealer_card, usable_ace, hand)) == batch_actions[table]
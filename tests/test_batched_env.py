@@ -0,0 +1,183 @@
+import pytest
+import sys
+import os
+
+# Add the root of the project (21) to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from blackjack import BatchedBlackjackEnv, CustomBlackjackEnv
+
+@pytest.fixture
+def benv():
+    """Fixture with a small batch of tables and a fixed seed."""
+    return BatchedBlackjackEnv(num_envs=8, seed=0)
+
+def _stack(benv, index, cards):
+    """Put ``cards`` on top of table ``index``'s shoe."""
+    benv.cursor[index] = 0
+    benv.shoe[index, :len(cards)] = cards
+
+def _stack_scalar(env, cards):
+    """Put ``cards`` on top of the scalar shoe."""
+    env.shoe.stack(cards)
+
+def test_shoe_composition_matches_scalar(benv):
+    scalar = CustomBlackjackEnv()
+    assert benv.shoe_size == len(scalar.deck) == 312
+    for row in benv.shoe:
+        assert sorted(row.tolist()) == sorted(scalar.deck), "Every table should hold a full 6-deck shoe."
+
+def test_reset_deals_like_scalar(benv):
+    _stack(benv, 0, [10, 6, 7])
+    total, dealer, usable_ace = benv.reset()
+    cards, n_cards = benv.current_cards()
+    assert n_cards.tolist() == [2] * 8
+    assert (total[0], dealer[0], usable_ace[0]) == (17, 6, False)
+    assert sorted(cards[0, :2].tolist()) == [7, 10]
+    assert benv.cursor.tolist() == [3] * 8
+    assert not benv.done.any()
+
+@pytest.mark.parametrize("player", [[10, 7], [10, 9], [10, 10], [1, 8], [9, 9, 3]])
+@pytest.mark.parametrize("dealer", [[10, 7], [10, 8], [10, 10], [9, 9, 5], [1, 6]])
+def test_stick_rewards_match_scalar(benv, player, dealer):
+    scalar = CustomBlackjackEnv()
+    scalar.reset()
+    scalar.player, scalar.dealer = list(player), list(dealer)
+    _, expected, done, _ = scalar.step(0)
+
+    benv.deal(0, player, dealer)
+    _, rewards, dones, _ = benv.step(np.zeros(8, dtype=int))
+    assert rewards[0] == expected
+    assert dones[0] and done
+
+def test_natural_pays_one_and_a_half(benv):
+    benv.deal(0, [1, 10], [10, 9])
+    _, rewards, _, _ = benv.step(np.zeros(8, dtype=int))
+    assert rewards[0] == 15
+
+@pytest.mark.parametrize("player,future", [
+    ([5, 6], [10, 10, 7]),   # 21 vs dealer 17
+    ([5, 6], [2, 10, 9]),    # 13 vs dealer 19
+    ([10, 2], [10, 6, 10, 10]),  # player busts, dealer still draws to 26
+    ([4, 5], [9, 5, 10, 10]),    # 18 vs dealer busting
+])
+def test_double_matches_scalar_with_stacked_shoe(benv, player, future):
+    scalar = CustomBlackjackEnv()
+    scalar.reset()
+    scalar.player, scalar.dealer = list(player), [future[1]]
+    _stack_scalar(scalar, future[:1] + future[2:])
+    _, expected, _, _ = scalar.step(2)
+
+    benv.deal(0, player, [future[1]])
+    _stack(benv, 0, future[:1] + future[2:])
+    _, rewards, dones, _ = benv.step(np.full(8, 2))
+    assert rewards[0] == expected
+    assert dones[0]
+
+def test_hit_on_hard_21_busts_like_scalar(benv):
+    scalar = CustomBlackjackEnv()
+    scalar.reset()
+    scalar.player, scalar.dealer = [10, 9, 2], [10]
+    _, expected, done, _ = scalar.step(1)
+
+    benv.deal(0, [10, 9, 2], [10])
+    _, rewards, dones, _ = benv.step(np.ones(8, dtype=int))
+    assert rewards[0] == expected == -10
+    assert dones[0] and done
+
+def test_illegal_split_is_penalised(benv):
+    benv.deal(0, [10, 9], [10])
+    _, rewards, dones, _ = benv.step(np.full(8, 3))
+    assert rewards[0] == -50
+    assert dones[0]
+
+def test_split_plays_every_hand(benv):
+    benv.deal(0, [8, 8], [10])
+    _stack(benv, 0, [3, 10, 9, 7])
+    total, _, _ = benv.step(np.full(8, 3))[0]
+    assert benv.n_hands[0] == 2, "Player should have two hands after split."
+    assert total[0] == 11 and not benv.done[0]
+
+    # Double 8+3 into 20; the dealer draws the 7 and stands on 17
+    (total, _, _), rewards, dones, _ = benv.step(np.full(8, 2))
+    assert rewards[0] == 20
+    assert not dones[0], "The second split hand should still be in play."
+    assert total[0] == 18
+
+    _, rewards, dones, _ = benv.step(np.zeros(8, dtype=int))
+    assert rewards[0] == 10
+    assert dones[0]
+
+def _split_heavy_policy(total, cards, can_split):
+    """Split every pair, double 9-11 and hit below 17, so rounds often hold several split hands."""
+    if len(cards) == 2 and cards[0] == cards[1] and can_split:
+        return 3
+    if len(cards) == 2 and 9 <= total <= 11:
+        return 2
+    return 1 if total < 17 else 0
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_split_rounds_match_scalar_card_for_card(seed):
+    scalar = CustomBlackjackEnv(seed=seed)
+    benv = BatchedBlackjackEnv(num_envs=1, seed=seed)
+    benv.shoe[0] = scalar.deck  # Same cards in the same order
+    splits = 0
+    while scalar.shoe.remaining > 60:  # Stop before either shoe reshuffles
+        (total, _, _), done = scalar.reset(), False
+        benv_obs = benv.reset()
+        assert total == benv_obs[0][0]
+        while not done:
+            cards = list(scalar.player)
+            can_split = len(scalar.player_hands or [None]) < scalar.rules.max_hands
+            action = _split_heavy_policy(total, cards, can_split)
+            splits += action == 3
+            assert cards == benv.current_cards()[0][0, :benv.current_cards()[1][0]].tolist()
+            (total, dealer, soft), reward, done, _ = scalar.step(action)
+            (b_total, b_dealer, b_soft), b_rewards, b_dones, _ = benv.step(np.array([action]))
+            assert (total, dealer, soft, reward, done) == (b_total[0], b_dealer[0], b_soft[0], b_rewards[0], b_dones[0])
+        assert list(scalar.dealer) == benv.dealer_cards[0, :benv.dealer_n[0]].tolist()
+        assert scalar.shoe.cursor == benv.cursor[0]
+    assert splits >= 3, "The shoe should deal several pairs to split."
+
+def test_finished_tables_ignore_actions(benv):
+    benv.reset()
+    benv.done[:] = True
+    _, rewards, dones, _ = benv.step(np.ones(8, dtype=int))
+    assert not rewards.any()
+    assert dones.all()
+
+def test_mean_reward_matches_scalar():
+    """Both envs should agree on the value of a fixed policy within sampling error."""
+    rounds = 20000
+    scalar = CustomBlackjackEnv()
+    scalar_rewards = []
+    for _ in range(rounds):
+        (total, _, _), done, episode_reward = scalar.reset(), False, 0
+        while not done:
+            (total, _, _), reward, done, _ = scalar.step(1 if total < 17 else 0)
+            episode_reward += reward
+        scalar_rewards.append(episode_reward)
+
+    benv = BatchedBlackjackEnv(num_envs=rounds, seed=1)
+    total, _, _ = benv.reset()
+    batched_rewards = np.zeros(rounds)
+    while not benv.done.all():
+        (total, _, _), rewards, _, _ = benv.step(np.where(total < 17, 1, 0))
+        batched_rewards += rewards
+
+    standard_error = np.sqrt(np.var(scalar_rewards) / rounds + np.var(batched_rewards) / rounds)
+    assert abs(np.mean(scalar_rewards) - batched_rewards.mean()) < 4 * standard_error
+
+def test_count_observation_matches_dealt_cards():
+    benv = BatchedBlackjackEnv(num_envs=8, seed=4)
+    for _ in range(5):
+        benv.reset()
+        benv.step(np.ones(8, dtype=np.intp))
+    running, true_count, penetration = benv.count_observation()
+    tags = np.array([0, -1, 1, 1, 1, 1, 1, 0, 0, 0, -1])
+    for table in range(8):
+        dealt = benv.shoe[table, :benv.cursor[table]]
+        assert running[table] == tags[dealt].sum(), "Running count should sum the Hi-Lo tags of dealt cards."
+        assert penetration[table] == benv.cursor[table] / benv.shoe_size
+    assert np.allclose(true_count, running * 52 / (benv.shoe_size - benv.cursor))
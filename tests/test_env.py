@@ -5,12 +5,12 @@ import os
 # Add the root of the project (21) to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from blackjack import CustomBlackjackEnv, is_bust, hand_score, basic_strategy
+from blackjack import CustomBlackjackEnv, Shoe, is_bust, hand_score, basic_strategy
 
 @pytest.fixture
 def env():
     """Fixture to initialize the CustomBlackjackEnv environment."""
-    return CustomBlackjackEnv()
+    return CustomBlackjackEnv(seed=0)
 
 def test_environment_initialization(env):
     """Test the initialization of the environment."""
@@ -30,13 +30,15 @@ def test_deck_shuffling_and_drawing(env):
 
 def test_player_actions(env):
     """Test various player actions: hit, stick, double down, and split."""
+    scale = env.rules.reward_scale  # Rewards are in bets times the rules' scale
     env.reset()
     env.player = [10, 6]  # Player starts with a total of 16
     env.dealer = [10, 7]  # Dealer starts with a total of 17
 
     # Test hit action
-    obs, reward, done, _ = env.step(1)  # Player hits
-    assert not done or reward == -1, "Game should not be over after a hit if player hasn't busted."
+    env.shoe.stack([3])
+    obs, reward, done, _ = env.step(1)  # Player hits to 19
+    assert not done and reward == 0, "Game should not be over after a hit if player hasn't busted."
 
     # Test stick action
     env.player = [10, 7]  # Player has 17
@@ -49,7 +51,7 @@ def test_player_actions(env):
     env.player = [5, 6]  # Player has 11
     obs, reward, done, _ = env.step(2)  # Player doubles down
     assert done, "Game should be over after double down."
-    assert reward in [-2, 0, 2], "Reward should reflect double down outcome."
+    assert reward in [-2 * scale, 0, 2 * scale], "Reward should reflect double down outcome."
 
     # Test split action
     env.reset()
@@ -60,17 +62,18 @@ def test_player_actions(env):
 
 def test_reward_logic(env):
     """Test the reward calculation logic."""
+    scale = env.rules.reward_scale
     # Player wins
     env.player = [10, 10]  # 20
     env.dealer = [10, 7]   # 17
     reward = env._calculate_reward()
-    assert reward == 1, "Player should win with 20 against dealer's 17."
+    assert reward == scale, "Player should win with 20 against dealer's 17."
 
     # Player loses
     env.player = [10, 6]  # 16
     env.dealer = [10, 7]  # 17
     reward = env._calculate_reward()
-    assert reward == -1, "Player should lose with 16 against dealer's 17."
+    assert reward == -scale, "Player should lose with 16 against dealer's 17."
 
     # Push
     env.player = [10, 7]  # 17
@@ -82,13 +85,13 @@ def test_reward_logic(env):
     env.player = [10, 10, 2]  # 22
     env.dealer = [10, 7]      # 17
     reward = env._calculate_reward()
-    assert reward == -1, "Player should lose if busted."
+    assert reward == -scale, "Player should lose if busted."
 
     # Dealer busts
     env.player = [10, 7]      # 17
     env.dealer = [10, 10, 2]  # 22
     reward = env._calculate_reward()
-    assert reward == 1, "Player should win if dealer busts."
+    assert reward == scale, "Player should win if dealer busts."
 
 def test_basic_strategy_soft_totals():
     # Soft 17, dealer shows 10
@@ -104,30 +107,33 @@ def test_basic_strategy_soft_totals():
     assert basic_strategy([1, 8], 9) == 0, "Should stick on soft 19 vs dealer 9"
 
 def test_full_game():
-    env = CustomBlackjackEnv()
+    env = CustomBlackjackEnv(seed=0)
+    scale = env.rules.reward_scale
     env.reset()
     done = False
     while not done:
         action = basic_strategy(env.player, env.dealer[0])  # Use basic strategy
         obs, reward, done, _ = env.step(action)
-    assert reward in [-1, 0, 1], "Reward should be valid at the end of the game."
+    assert reward / scale in [-2, -1, 0, 1, 1.5, 2], "Reward should be valid at the end of the game."
 
 def test_player_busts_after_hit():
-    env = CustomBlackjackEnv()
+    env = CustomBlackjackEnv(seed=0)
     env.reset()
     env.player = [10, 10]  # 20
     env.dealer = [10]  # Dealer shows 10
-    
+    env.shoe.stack([5])
+
     obs, reward, done, _ = env.step(1)  # Player hits
     assert is_bust(env.player), "Player should bust if they exceed 21."
     assert done, "Game should end after player busts."
-    assert reward == -1, "Player should lose if they bust."
+    assert reward == env.rules.bust_reward == -env.rules.reward_scale, "Player should lose if they bust."
 
 
 def test_split_logic_with_multiple_hands():
-    env = CustomBlackjackEnv()
+    env = CustomBlackjackEnv(seed=0)
     env.player = [8, 8]  # Splittable hand
     env.dealer = [1]
+    env.shoe.stack([2, 3, 4])  # 8+2 and 8+3, then the hit
     env.split_hand()
     assert len(env.player_hands) == 2, "Player should have two hands after splitting."
     print(env.player)
@@ -183,3 +189,154 @@ def test_invalid_action_after_session_done():
     obs, reward, done, info = env.step(2)
     assert done, "Session should remain marked as done."
     assert reward == 0, "No reward should be applied for actions after session ends."
+
+def test_shoe_tracks_counts_while_drawing():
+    """The shoe keeps rank counts and the Hi-Lo running count in step with the cards dealt."""
+    shoe = Shoe(deck_count=1)
+    assert shoe.remaining == 52 and shoe.penetration == 0, "A fresh shoe should be full."
+    shoe.stack([5, 10, 1, 2])
+    dealt = [shoe.draw() for _ in range(4)]
+    assert dealt == [5, 10, 1, 2], "Stacked cards should be dealt first, in order."
+    assert shoe.running_count == 1 - 1 - 1 + 1, "Running count should follow the Hi-Lo tags."
+    assert shoe.rank_counts[10] == 15 and shoe.rank_counts[1] == 3, "Rank counts should drop as cards are dealt."
+    assert sum(shoe.rank_counts) == shoe.remaining == 48, "Rank counts should add up to the undealt cards."
+    assert shoe.penetration == pytest.approx(4 / 52), "Penetration should be the fraction dealt."
+
+def test_shoe_shuffle_restores_every_card():
+    """Shuffling puts every dealt card back and resets the count."""
+    shoe = Shoe(deck_count=2)
+    for _ in range(60):
+        shoe.draw()
+    shoe.shuffle()
+    assert shoe.remaining == 104 and shoe.running_count == 0, "Shuffle should refill the shoe and reset the count."
+    assert sorted(shoe.remaining_cards()) == sorted([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10] * 8), \
+        "Shuffled shoe should hold two full decks."
+
+def test_count_in_observation():
+    """With count_in_obs the observation carries the shoe's count features."""
+    counting_env = CustomBlackjackEnv(count_in_obs=True)
+    obs = counting_env.reset()
+    assert len(obs) == 4, "Observation should gain a count entry."
+    running_count, true_count, penetration = obs[3]
+    assert running_count == counting_env.shoe.running_count, "Observation should expose the running count."
+    assert 0 < penetration < 1, "Cards dealt for the round should show up in the penetration."
+
+def test_hand_tracks_score_incrementally():
+    """A Hand scores the same as hand_score on a plain list after every change."""
+    from blackjack.hand import Hand
+    from agent.q_table import cards_key
+    hand = Hand()
+    for card in [1, 6, 1, 10, 4]:
+        hand.append(card)
+        assert (hand.total, hand.soft) == hand_score(list(hand)), f"Score mismatch for {list(hand)}."
+        assert hand.key == cards_key(hand), "Packed key should match cards_key."
+    assert hand.is_bust and len(hand) == 5
+    hand.pop()
+    assert hand.total == 18 and not hand.is_bust
+    assert Hand([8, 8]).is_pair and Hand([10, 1]).is_natural and not Hand([5, 5, 1]).is_natural
+
+def test_env_hands_are_incremental(env):
+    """Plain lists assigned to the env are wrapped so the env can rely on incremental totals."""
+    from blackjack.hand import Hand
+    env.reset()
+    env.player = [10, 6]
+    assert isinstance(env.player, Hand) and env.player.total == 16
+    assert env._get_obs()[0] == 16
+
+def test_hits_and_stands_draw_from_the_shoe(env):
+    """Every card of a round, hits and dealer draws included, comes off the shoe in order."""
+    env.reset()
+    env.player, env.dealer = [10, 2], [6]
+    env.shoe.stack([5, 10, 3])
+    obs, reward, done, _ = env.step(1)
+    assert list(env.player) == [10, 2, 5] and not done
+    obs, reward, done, _ = env.step(0)
+    assert list(env.dealer) == [6, 10, 3] and done and reward == -10, "Dealer 19 should beat 17."
+
+def test_seed_makes_rounds_repeatable():
+    first, second = CustomBlackjackEnv(), CustomBlackjackEnv()
+    first.seed(11)
+    second.seed(11)
+    for _ in range(50):
+        assert first.reset() == second.reset()
+        assert first.step(0) == second.step(0)
+
+def test_env_does_not_import_gym():
+    import subprocess
+    code = "import sys, blackjack, training; print('gym' in sys.modules or 'gymnasium' in sys.modules)"
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False", "gym should only be loaded by blackjack.gym_adapter."
+
+def test_gym_adapter():
+    adapter = pytest.importorskip("blackjack.gym_adapter")
+    gym_env = adapter.GymBlackjackEnv()
+    gym_env.seed(4)
+    obs = gym_env.reset()
+    obs = obs[0] if adapter.GYMNASIUM else obs
+    assert gym_env.observation_space.contains(tuple(int(value) for value in obs))
+    result = gym_env.step(0)
+    assert len(result) == (5 if adapter.GYMNASIUM else 4) and result[2], "Standing should end the round."
+
+def test_snapshot_replays_the_same_cards_for_every_action():
+    env = CustomBlackjackEnv()
+    env.seed(2)
+    env.reset()
+    env.player, env.dealer = [8, 8], [6]
+    snapshot = env.get_state()
+    obs, reward, done, _ = env.step(1)
+    hit_card = env.player[-1]
+    env.set_state(snapshot)
+    assert list(env.player) == [8, 8] and env.step(1)[0] == obs and env.player[-1] == hit_card
+
+    env.set_state(snapshot)
+    outcomes = env.step_all(follow=3)
+    assert sorted(outcomes) == [0, 1, 2, 3], "A pair can stand, hit, double or split."
+    assert outcomes[1][3][-1] == outcomes[2][3][-1] == hit_card, "Hit and double should draw the same card."
+    assert len(env.player_hands) == 2 and env.current_hand_index == 0, "The env should follow the split branch."
+    assert outcomes[3][3] is env.player
+
+def test_rollout_leaves_the_state_untouched():
+    env = CustomBlackjackEnv()
+    env.seed(3)
+    env.reset()
+    env.player, env.dealer = [10, 6], [10]
+    env.shoe.stack([5, 10, 7])
+    returns = env.rollout(lambda state: 0, actions=[0, 1, 2, 4])
+    assert returns == {0: 10, 1: 10, 2: 20, 4: -50}, "Standing busts the dealer; hitting makes 21 against 20."
+    assert list(env.player) == [10, 6] and env.shoe.remaining_cards()[:3] == [5, 10, 7]
+
+def test_double_and_illegal_actions_finish_the_round():
+    env = CustomBlackjackEnv(seed=5)
+    env.reset()
+    env.player, env.dealer = [5, 6], [10]
+    env.shoe.stack([10, 7])
+    assert env.step(2)[1:3] == (20, True), "21 doubled against the dealer's 17."
+    assert env.done and env.legal_actions() == [] and env.rollout(lambda state: 0) == {}
+    assert env.step(1)[1:3] == (0, True) and list(env.player) == [5, 6, 10], "A finished round takes no more cards."
+
+    env.reset()
+    env.player = [10, 9]
+    assert env.step(3)[1:3] == (-50, True) and env.done and env.legal_actions() == []
+
+def test_rollout_plays_every_split_hand():
+    env = CustomBlackjackEnv(seed=3)
+    env.reset()
+    env.player, env.dealer = [8, 8], [10]
+    env.shoe.stack([10, 3, 9, 10, 7])  # Hands 8+10 and 8+3; 18 hits to 27, 11 hits to 21, dealer draws to 17
+    returns = env.rollout(lambda state: 1 if state[0] < 19 else 0, actions=[3])
+    assert returns == {3: -10 + 10}, "The second hand should still be played after the first one busts."
+
+    env.step(3)
+    env.step(1)
+    assert not env.done and list(env.player) == [8, 3] and env.legal_actions() == [0, 1, 2]
+
+def test_snapshot_survives_a_reshuffle():
+    env = CustomBlackjackEnv()
+    env.seed(4)
+    env.reset()
+    env.shoe.cursor = env.shoe.size - env.rules.reshuffle_reserve  # The next draw reshuffles
+    snapshot = env.get_state()
+    first = [env.draw_card() for _ in range(5)]
+    env.set_state(snapshot)
+    assert [env.draw_card() for _ in range(5)] == first
@@ -0,0 +1,60 @@
+import pytest
+import sys
+import os
+
+# Add the root of the project (21) to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pickle
+import random
+import numpy as np
+from agent import QLearningAgent
+from blackjack import CustomBlackjackEnv
+from blackjack.rng import RandomStream, STREAMS, child_seed
+from training import train_agent, TrainingMetrics, save_checkpoint, load_checkpoint
+
+def _train(seed, episodes=300, agent=None, env=None):
+    env = env or CustomBlackjackEnv(seed=child_seed(seed, STREAMS["env"]))
+    agent = agent or QLearningAgent(actions=[0, 1, 2, 3], seed=child_seed(seed, STREAMS["agent"]))
+    train_agent(env, agent, episodes=episodes, metrics=TrainingMetrics(verbose=False))
+    return env, agent
+
+def test_stream_resumes_mid_block():
+    stream = RandomStream(5, block_size=7)
+    first = [stream.random() for _ in range(10)]
+    state = stream.get_state()
+    rest = [stream.random() for _ in range(10)]
+
+    resumed = RandomStream(1, block_size=7)
+    resumed.set_state(state)
+    assert [resumed.random() for _ in range(10)] == rest
+    copy = pickle.loads(pickle.dumps(RandomStream(5, block_size=7)))
+    assert [copy.random() for _ in range(20)] == first + rest, "A pickled stream should replay from its position."
+    assert all(0 <= value < 1 for value in first) and RandomStream(5).choice("ab") in "ab"
+
+def test_child_seeds_are_stable_paths():
+    assert child_seed(3, 1, 2).generate_state(2).tolist() == child_seed(3, 1, 2).generate_state(2).tolist()
+    assert child_seed(3, 1, 2).generate_state(2).tolist() != child_seed(3, 2, 1).generate_state(2).tolist()
+    root = np.random.SeedSequence(3)
+    root.spawn(5)
+    assert child_seed(root, 0).generate_state(1) == child_seed(3, 0).generate_state(1), "Spawning should not shift paths."
+
+def test_training_replays_from_one_seed_whatever_the_global_rngs():
+    random.seed(1)
+    np.random.seed(1)
+    _, first = _train(9)
+    random.seed(2)
+    np.random.seed(2)
+    _, second = _train(9)
+    assert np.array_equal(first.q_table.values, second.q_table.values)
+    assert first.epsilon == second.epsilon
+
+def test_checkpoint_resumes_exploration_bit_for_bit(tmp_path):
+    env, agent = _train(4)
+    save_checkpoint(agent, tmp_path / "ckpt", episodes=300, env=env)
+    _train(4, agent=agent, env=env)
+
+    fresh_env = CustomBlackjackEnv(seed=0)
+    restored, _ = load_checkpoint(tmp_path / "ckpt", env=fresh_env)
+    _train(4, agent=restored, env=fresh_env)
+    assert np.array_equal(restored.q_table.values, agent.q_table.values), "The saved shoe should deal the same cards."
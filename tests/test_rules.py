@@ -0,0 +1,121 @@
+import pytest
+import sys
+import os
+
+# Add the root of the project (21) to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from blackjack import BatchedBlackjackEnv, CustomBlackjackEnv, Rules, DEFAULT_RULES
+from config import RULE_PRESETS
+
+def _scalar(rules, player, dealer):
+    env = CustomBlackjackEnv(rules=rules)
+    env.reset()
+    env.player, env.dealer = list(player), list(dealer)
+    return env
+
+def _batched(rules, player, dealer, future=()):
+    benv = BatchedBlackjackEnv(num_envs=2, seed=0, rules=rules)
+    benv.deal(0, player, dealer)
+    benv.cursor[0] = 0
+    benv.shoe[0, :len(future)] = future
+    return benv
+
+def test_default_rules_match_original_table():
+    """The defaults keep the historical S17, 3:2, x10 rewards and 40-card reserve."""
+    assert Rules() == DEFAULT_RULES and Rules.preset("default") == DEFAULT_RULES
+    assert not DEFAULT_RULES.dealer_should_stand(16, False) and DEFAULT_RULES.dealer_should_stand(7, True)
+    assert DEFAULT_RULES.settle(20, 19) == 10 and DEFAULT_RULES.settle(22, 25) == -10 and DEFAULT_RULES.settle(18, 24) == 10
+    assert DEFAULT_RULES.natural_reward == 15 and DEFAULT_RULES.reshuffle_reserve == 40
+    assert CustomBlackjackEnv().deck_count == 6
+
+@pytest.mark.parametrize("name", sorted(RULE_PRESETS))
+def test_presets_build_and_round_trip(name):
+    rules = Rules.preset(name)
+    assert Rules(**rules.settings()) == rules, "settings() should rebuild the same rules."
+    assert 0 < rules.reshuffle_reserve < rules.shoe_size
+    assert BatchedBlackjackEnv(num_envs=1, seed=0, rules=rules).shoe_size == 52 * rules.decks
+
+def test_dealer_hits_soft_17():
+    rules = Rules(dealer_hits_soft_17=True)
+    assert not rules.dealer_should_stand(7, True) and rules.dealer_should_stand(8, True)
+    assert rules.dealer_should_stand(17, True), "A hard 17 containing an ace still stands."
+
+    benv = _batched(rules, [10, 8], [1, 6], [10])
+    _, rewards, _, _ = benv.step(np.zeros(2, dtype=int))
+    assert benv.dealer_n[0] == 3 and rewards[0] == 10, "The dealer should hit soft 17 into 17 and lose to 18."
+
+    scalar = _scalar(rules, [10, 8], [1, 6])
+    scalar.step(0)
+    assert len(scalar.dealer) > 2, "The scalar dealer should hit soft 17 too."
+
+def test_six_to_five_payout():
+    rules = Rules.preset("six_to_five")
+    _, reward, _, _ = _scalar(rules, [1, 10], [10, 9]).step(0)
+    _, rewards, _, _ = _batched(rules, [1, 10], [10, 9]).step(np.zeros(2, dtype=int))
+    assert reward == rewards[0] == 12
+
+def test_surrender_only_when_offered():
+    rules = Rules(surrender=True)
+    _, reward, done, _ = _scalar(rules, [10, 6], [10]).step(4)
+    _, rewards, dones, _ = _batched(rules, [10, 6], [10]).step(np.full(2, 4))
+    assert reward == rewards[0] == -5 and done and dones[0]
+
+    _, reward, _, _ = _scalar(rules, [10, 3, 3], [10]).step(4)
+    _, rewards, _, _ = _batched(rules, [10, 3, 3], [10]).step(np.full(2, 4))
+    assert reward == rewards[0] == -50, "Surrender after hitting should be illegal."
+
+    _, reward, _, _ = _scalar(DEFAULT_RULES, [10, 6], [10]).step(4)
+    assert reward == -50, "Surrender should be illegal unless the rules offer it."
+
+def test_double_after_split_disallowed():
+    rules = Rules(double_after_split=False)
+    benv = _batched(rules, [8, 8], [10], [3, 10])
+    benv.step(np.full(2, 3))
+    _, rewards, dones, _ = benv.step(np.full(2, 2))
+    assert rewards[0] == -50 and dones[0]
+
+    scalar = _scalar(rules, [8, 8], [10])
+    scalar.shoe.stack([3, 10])
+    scalar.step(3)
+    _, reward, done, _ = scalar.step(2)
+    assert reward == -50 and done
+
+def test_resplit_limit_counts_hands():
+    """With max_hands=2 a second split is illegal; with the default limit it adds a third hand."""
+    for max_hands, expected in ((2, -50), (4, 0)):
+        rules = Rules(max_hands=max_hands)
+        scalar = _scalar(rules, [8, 8], [10])
+        scalar.shoe.stack([8, 10])
+        scalar.step(3)
+        assert list(scalar.player) == [8, 8]
+        _, reward, _, _ = scalar.step(3)
+        assert reward == expected
+        if expected == 0:
+            assert len(scalar.player_hands) == 3, "Re-splitting should add exactly one hand."
+
+        benv = _batched(rules, [8, 8], [10], [8, 10])
+        benv.step(np.full(2, 3))
+        _, rewards, _, _ = benv.step(np.full(2, 3))
+        assert rewards[0] == expected and benv.n_hands[0] == (2 if expected else 3)
+
+def test_mean_reward_matches_scalar_under_h17():
+    """Both envs agree on a fixed policy's value under non-default rules."""
+    rules = Rules(dealer_hits_soft_17=True, blackjack_payout=1.2, decks=2)
+    benv = BatchedBlackjackEnv(num_envs=20000, seed=5, rules=rules)
+    total, _, _ = benv.reset()
+    totals = np.zeros(benv.num_envs)
+    while not benv.done.all():
+        (total, _, _), rewards, _, _ = benv.step((total < 17).astype(int))
+        totals += rewards
+
+    scalar = CustomBlackjackEnv(rules=rules)
+    scalar.seed(5)
+    scalar_total = 0.0
+    for _ in range(20000):
+        obs, done = scalar.reset(), False
+        while not done:
+            obs, reward, done, _ = scalar.step(int(obs[0] < 17))
+            scalar_total += reward
+    assert abs(totals.mean() - scalar_total / 20000) < 0.5, "Mean rewards (x10) should agree within sampling error."
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+import pytest
+import sys
+import os
+import threading
+
+# Add the root of the project (21) to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from agent import QLearningAgent
+from blackjack.strategy import BASIC_STRATEGY, STICK, HIT, DOUBLE, SPLIT
+from serving import FrozenPolicy, PolicyServer, PolicyClient
+from training import save_checkpoint
+
+@pytest.fixture
+def client():
+    server = PolicyServer(FrozenPolicy.from_strategy(), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = PolicyClient(*server.server_address)
+    yield client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+def test_strategy_policy_matches_table():
+    policy = FrozenPolicy.from_strategy()
+    for cards in ([10, 6], [1, 7], [8, 8], [5, 6], [2, 3, 5]):
+        for dealer_card in range(1, 11):
+            total = sum(cards) + 10 * (1 in cards and sum(cards) <= 11)
+            expected = BASIC_STRATEGY.choose_action(total, dealer_card, 1 in cards and sum(cards) <= 11, cards)
+            assert policy.action(cards, dealer_card) == expected, f"{cards} vs {dealer_card}"
+
+def test_options_restrict_the_action():
+    policy = FrozenPolicy.from_strategy()
+    assert policy.action([5, 6], 6) == DOUBLE
+    assert policy.action([5, 6], 6, can_double=False) == HIT
+    assert policy.action([8, 8], 10) == SPLIT
+    assert policy.action([8, 8], 10, can_split=False) == HIT, "An unsplittable 8-8 is a hard 16."
+
+def test_reordered_hands_share_a_cache_entry():
+    policy = FrozenPolicy.from_strategy()
+    policy.action([10, 2, 4], 5)
+    policy.action([4, 10, 2], 5)
+    info = policy.cache_info()
+    assert info["misses"] == 1 and info["hits"] == 1
+    with pytest.raises(ValueError):
+        policy.action([11, 2], 5)
+    with pytest.raises(ValueError):
+        policy.action([1] * 32, 10)  # Would alias [2] in the packed key
+    for cards, dealer_card in [([10, 10, 5], 10), ([True, 5], 4), ([5.0, 6], 4), ([10, 6], 4.0), ([10, 6], True)]:
+        with pytest.raises(ValueError):
+            policy.action(cards, dealer_card)  # Busted, or not integer cards
+    assert policy.action([10, 10, 1], 10) == STICK, "A hard 21 is the largest hand with a decision left."
+
+def test_q_table_policy_falls_back_to_allowed_actions(tmp_path):
+    agent = QLearningAgent(actions=[0, 1, 2, 3])
+    row = agent.state_representation(16, 10, False, [10, 6])
+    agent.q_table.values[row] = [-5.0, -4.0, 1.0, 3.0]
+    save_checkpoint(agent, tmp_path / "checkpoint")
+    policy = FrozenPolicy.from_checkpoint(str(tmp_path / "checkpoint"))
+    assert policy.action([6, 10], 10) == DOUBLE, "Split is illegal on a non-pair, so the next best action wins."
+    assert policy.action([6, 10], 10, can_double=False) == HIT
+    assert policy.action([2, 3], 10) == STICK, "Unvisited states follow argmax ties."
+
+def test_server_answers_single_and_batched_queries(client):
+    assert client.action([10, 6], 10) == HIT
+    queries = [{"cards": [10, 6], "dealer": 4}, {"cards": [1, 1], "dealer": 6}, {"cards": [5, 6], "dealer": 6, "can_double": False}]
+    assert client.actions(queries) == [STICK, SPLIT, HIT]
+    stats = client.stats()
+    assert stats["requests"] == 2 and stats["queries"] == 4
+    assert 0 < stats["p50_us"] <= stats["p99_us"]
+    with pytest.raises(ValueError):
+        client.action([10, 6], 12)
+    with pytest.raises(ValueError, match="bust"):
+        client.action([10, 10, 5], 4)  # Rejected with a 400
@@ -0,0 +1,93 @@
+import pytest
+import sys
+import os
+import math
+
+# Add the root of the project (21) to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blackjack import BlackjackSolver
+from agent import OptimalStrategyAgent
+
+@pytest.fixture(scope="module")
+def solver():
+    """Infinite-deck solver shared by the tests in this module."""
+    return BlackjackSolver()
+
+@pytest.mark.parametrize("upcard,bust", [(2, 0.3536), (6, 0.4232), (10, 0.2121), (1, 0.1153)])
+def test_dealer_bust_probabilities(solver, upcard, bust):
+    distribution = solver.dealer_distribution(upcard)
+    assert sum(distribution) == pytest.approx(1.0)
+    assert distribution[5] == pytest.approx(bust, abs=1e-4)
+
+def test_dealer_distribution_is_memoized(solver):
+    assert solver.dealer_distribution(7) is solver.dealer_distribution(7, removed=(10, 6))
+
+@pytest.mark.parametrize("cards,upcard,action", [
+    ((6, 10), 6, 0),    # Stand on hard 16 vs 6
+    ((6, 10), 10, 1),   # Hit hard 16 vs 10
+    ((2, 10), 2, 1),    # Hit hard 12 vs 2
+    ((5, 6), 6, 2),     # Double 11 vs 6
+    ((1, 7), 9, 1),     # Hit soft 18 vs 9
+    ((1, 6), 3, 2),     # Double soft 17 vs 3
+    ((1, 1), 6, 3),     # Split aces
+    ((8, 8), 6, 3),     # Split 8s vs 6
+    ((10, 10), 6, 0),   # Never split tens
+])
+def test_textbook_decisions(solver, cards, upcard, action):
+    assert solver.best_action(cards, upcard) == action
+
+def test_illegal_actions_are_nan(solver):
+    stick, hit, double, split = solver.action_values((10, 6), 10)
+    assert math.isnan(split)
+    assert math.isnan(solver.action_values((2, 3, 5), 10)[2]), "Double is only offered on two cards."
+
+def test_natural_value(solver):
+    assert solver.action_values((1, 10), 6)[0] == pytest.approx(1.5 * (1 - solver.dealer_distribution(6)[4]))
+
+def test_finite_shoe_is_close_to_infinite_deck(solver):
+    shoe = BlackjackSolver(deck_count=6)
+    assert shoe.dealer_distribution(6, removed=(10, 6)) != solver.dealer_distribution(6)
+    for cards, upcard in [((10, 6), 10), ((5, 6), 6), ((1, 7), 2)]:
+        finite = shoe.action_values(cards, upcard)
+        infinite = solver.action_values(cards, upcard)
+        assert finite[:3] == pytest.approx(infinite[:3], abs=0.02)
+    assert abs(shoe.expected_value() - solver.expected_value()) < 0.005
+
+def test_optimal_agent_follows_solver(solver):
+    agent = OptimalStrategyAgent(solver)
+    assert len(agent.policy) == 55 * 10
+    assert agent.choose_action((16, 10, False, (10, 6))) == 1
+    assert agent.choose_action((16, 10, False, (6, 10))) == 1
+    assert agent.choose_action((17, 10, False, (2, 5, 10))) == 0
+
+from blackjack import DealerOutcomeCache, Rules
+
+def test_dealer_cache_matches_solver_and_rules(solver):
+    cache = DealerOutcomeCache()
+    assert cache.distribution(6) == pytest.approx(solver.dealer_distribution(6))
+    h17 = cache.distribution(6, rules=Rules(dealer_hits_soft_17=True))
+    assert sum(h17) == pytest.approx(1.0)
+    assert h17[5] > cache.distribution(6)[5], "Hitting soft 17 should make a dealer 6 bust more often."
+    assert cache.distribution(10, [24] * 9 + [95]) == pytest.approx(
+        BlackjackSolver(deck_count=6).dealer_distribution(10))
+
+def test_coarse_compositions_share_entries():
+    cache = DealerOutcomeCache(resolution=50, cache_size=2)
+    full = [24] * 9 + [96]
+    first = cache.distribution(7, full)
+    assert cache.distribution(7, [24, 23] + full[2:]) is first, "Shoes a card apart should share an entry."
+    assert cache.cache_info()["hits"] == 1
+    cache.distribution(8, full)
+    cache.distribution(9, full)
+    assert cache.cache_info()["size"] == 2, "The LRU cache should stay bounded."
+    rich = cache.distribution(7, [24] * 9 + [60])
+    assert rich[0] < first[0], "A shoe short of tens should leave a dealer 7 on 17 less often."
+
+def test_stand_reward():
+    cache = DealerOutcomeCache()
+    distribution = cache.distribution(10)
+    assert cache.stand_reward(22, distribution) == -10
+    assert cache.stand_reward(21, distribution, natural=True) == pytest.approx(15 * (1 - distribution[4]))
+    assert cache.stand_reward(17, distribution) == pytest.approx(
+        10 * (distribution[5] - sum(distribution[1:5])))
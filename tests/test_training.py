@@ -1 +1,423 @@
 #!/usr/bin/env python3
+import pytest
+import sys
+import os
+
+# Add the root of the project (21) to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import json
+import pstats
+import random
+
+import numpy as np
+
+import main
+from agent import BasicStrategyAgent, QLambdaAgent, QLearningAgent
+from benchmarks.bench import run_benchmarks, find_regressions
+from blackjack import BatchedBlackjackEnv, CustomBlackjackEnv
+from blackjack.rules import Rules
+from training import (train_agent, train_agent_parallel, train_actor_learner, TrainingMetrics, RunningStats,
+                      open_writer, Checkpointer, save_checkpoint, load_checkpoint, evaluate_agent_batched,
+                      evaluate_agent_expected, evaluate_and_compare_agents, evaluate_agents_crn, grid_configs,
+                      random_configs, successive_halving, compare_policies, format_chart_diff,
+                      HandHistoryRecorder, iter_rounds, rescore_history)
+from training.actor_learner import compare_with_serial
+from training.checkpoint import load_worker_states
+from training.convergence import convergence_report, policy_agreement, starting_states, episodes_to_match
+from training.history import PLAYER, DEALER
+from training.parallel import _split_rounds
+from training.policy_diff import write_chart_csv, plot_chart_diff
+from training.profiling import profile_training
+
+def _agent():
+    return QLearningAgent(actions=[0, 1, 2, 3], alpha=0.7, gamma=1.0, epsilon=1.0)
+
+def test_split_rounds_covers_every_episode():
+    plan = _split_rounds(episodes=25, workers=3, merge_every=4)
+    assert [sum(round_plan) for round_plan in plan] == [12, 12, 1]
+    assert plan[-1] == [1, 0, 0]
+
+def test_parallel_training_is_reproducible():
+    first, second = _agent(), _agent()
+    stats = train_agent_parallel(first, episodes=3000, workers=2, merge_every=500, seed=3)
+    train_agent_parallel(second, episodes=3000, workers=2, merge_every=500, seed=3)
+    assert np.array_equal(first.q_table.values, second.q_table.values), "Same seed should give the same table."
+    assert stats["episodes"] == 3000 and stats["workers"] == 2
+    assert stats["episodes_per_sec"] > 0
+
+def test_parallel_training_merges_visits_and_schedule():
+    agent = _agent()
+    train_agent_parallel(agent, episodes=2000, workers=2, merge_every=250, seed=1)
+    updates = agent.q_table.visits.sum()
+    assert updates >= 2000, "Every episode makes at least one update."
+    assert agent.epsilon == pytest.approx(max(agent.epsilon_min, 0.9995 ** updates))
+    visited = agent.q_table.visits > 0
+    assert np.any(agent.q_table.values[visited] != 0)
+    assert not np.any(agent.q_table.values[~visited])
+
+def test_batched_evaluation_of_basic_strategy():
+    env = BatchedBlackjackEnv(num_envs=5000, seed=4)
+    mean_reward = evaluate_agent_batched(env, BasicStrategyAgent(), episodes=12000)
+    assert -1.5 < mean_reward < 1.0, "Basic strategy should be close to break-even (rewards are x10)."
+
+def test_expected_evaluation_of_basic_strategy():
+    env = CustomBlackjackEnv()
+    env.seed(3)
+    mean_reward, stderr = evaluate_agent_expected(BasicStrategyAgent(), episodes=4000, env=env)
+    assert -1.5 < mean_reward < 1.0, "Basic strategy should be close to break-even (rewards are x10)."
+    assert stderr < 11 / np.sqrt(4000), "Expected dealer outcomes should beat the variance of sampled rounds."
+
+def test_running_stats_match_numpy():
+    samples = np.random.default_rng(0).normal(size=1000) * 10
+    stats, batched = RunningStats(), RunningStats()
+    for value in samples:
+        stats.update(value)
+    batched.update_batch(400, samples[:400].sum(), (samples[:400] ** 2).sum())
+    batched.update_batch(600, samples[400:].sum(), (samples[400:] ** 2).sum())
+    for running in (stats, batched):
+        assert running.count == 1000
+        assert running.mean == pytest.approx(samples.mean())
+        assert running.std == pytest.approx(samples.std(ddof=1))
+
+def test_metrics_window_resets_after_log():
+    metrics = TrainingMetrics(log_every=4, verbose=False)
+    for reward in (10, -10, 0, 15):
+        metrics.record(reward)
+    row = metrics.maybe_log()
+    assert row["episode"] == 4
+    assert (row["win_rate"], row["loss_rate"], row["push_rate"]) == (0.5, 0.25, 0.25)
+    metrics.record(-10)
+    assert metrics.maybe_log() is None
+    assert metrics.log()["loss_rate"] == 1.0
+
+@pytest.mark.parametrize("name", ["metrics.csv", "metrics.jsonl"])
+def test_train_agent_streams_rows_to_file(tmp_path, name):
+    path = tmp_path / "logs" / name
+    metrics = TrainingMetrics(log_every=100, writer=open_writer(str(path)), verbose=False)
+    agent = _agent()
+    returned = train_agent(CustomBlackjackEnv(), agent, episodes=300, metrics=metrics)
+    metrics.close()
+    assert returned is metrics and metrics.episodes == 300
+    if name.endswith(".csv"):
+        rows = list(csv.DictReader(open(path)))
+    else:
+        rows = [json.loads(line) for line in open(path)]
+    assert [int(row["episode"]) for row in rows] == [100, 200, 300]
+    assert float(rows[-1]["epsilon"]) == pytest.approx(agent.epsilon)
+
+@pytest.mark.parametrize("all_actions", [False, True])
+def test_train_agent_with_count_features(all_actions):
+    agent = _agent()
+    metrics = train_agent(CustomBlackjackEnv(count_in_obs=True, seed=2), agent, episodes=200,
+                          metrics=TrainingMetrics(verbose=False), all_actions=all_actions)
+    assert metrics.episodes == 200 and agent.q_table.visits.sum() >= 200, "Count features should not break training."
+
+def test_compare_agents_with_count_features(capsys):
+    evaluate_and_compare_agents(CustomBlackjackEnv(count_in_obs=True, seed=2), _agent(), BasicStrategyAgent(),
+                                num_tests=20)
+    assert "Total Tests: 20" in capsys.readouterr().out, "Count features should not break the comparison."
+
+def test_unknown_metrics_format():
+    with pytest.raises(ValueError):
+        open_writer("metrics.txt")
+
+def test_checkpoint_round_trip(tmp_path):
+    agent = _agent()
+    train_agent(CustomBlackjackEnv(), agent, episodes=200, metrics=TrainingMetrics(verbose=False))
+    save_checkpoint(agent, tmp_path / "ckpt", episodes=200)
+    random.seed(1)
+    np.random.seed(1)
+    global_state = random.getstate(), np.random.get_state()[1].copy()
+
+    restored, episodes = load_checkpoint(tmp_path / "ckpt")
+    assert episodes == 200
+    assert restored.rng.random() == agent.rng.random(), "The exploration stream should resume where it was saved."
+    assert random.getstate() == global_state[0] and np.array_equal(np.random.get_state()[1], global_state[1]), \
+        "Loading a checkpoint should leave the global RNGs alone."
+    assert np.array_equal(restored.q_table.values, agent.q_table.values)
+    assert np.array_equal(restored.q_table.visits, agent.q_table.visits)
+    assert (restored.epsilon, restored.alpha) == (agent.epsilon, agent.alpha)
+
+def test_memory_mapped_checkpoint_is_read_only(tmp_path):
+    agent = _agent()
+    agent.q_table.values[5] = [1, 2, 3, 4]
+    save_checkpoint(agent, tmp_path / "ckpt")
+    served, _ = load_checkpoint(tmp_path / "ckpt", mmap=True, restore_rng=False)
+    assert isinstance(served.q_table.values, np.memmap)
+    assert served.q_table.greedy_action(5) == 3
+    with pytest.raises(ValueError):
+        served.q_table.values[5, 0] = 9
+
+def test_checkpoint_survives_a_crash_mid_swap(tmp_path):
+    agent = _agent()
+    path = str(tmp_path / "ckpt")
+    save_checkpoint(agent, path, episodes=100)
+    os.replace(path, path + ".old")  # Crash after moving the previous checkpoint aside
+    _, episodes = load_checkpoint(path, restore_rng=False)
+    assert episodes == 100, "The previous checkpoint should still load."
+    save_checkpoint(agent, path, episodes=200)
+    assert not os.path.exists(path + ".old")
+    os.replace(path, path + ".tmp")  # Crash before swapping the staged checkpoint in
+    _, episodes = load_checkpoint(path, restore_rng=False)
+    assert episodes == 200, "A complete staged checkpoint is the newest one."
+
+def test_parallel_training_resumes_from_a_checkpoint(tmp_path):
+    uninterrupted = _agent()
+    train_agent_parallel(uninterrupted, episodes=2000, workers=2, merge_every=250, seed=6,
+                         metrics=TrainingMetrics(verbose=False))
+    path = str(tmp_path / "ckpt")
+    train_agent_parallel(_agent(), episodes=1000, workers=2, merge_every=250, seed=6,
+                         metrics=TrainingMetrics(verbose=False), checkpointer=Checkpointer(path, every=10 ** 9))
+    resumed, episodes = load_checkpoint(path, restore_rng=False)
+    train_agent_parallel(resumed, episodes=2000 - episodes, workers=2, merge_every=250, seed=6,
+                         metrics=TrainingMetrics(verbose=False), worker_states=load_worker_states(path))
+    assert np.array_equal(resumed.q_table.values, uninterrupted.q_table.values), "Workers should resume their streams."
+    assert np.array_equal(resumed.q_table.visits, uninterrupted.q_table.visits)
+    assert resumed.epsilon == uninterrupted.epsilon
+
+class _UnsavableEnv(CustomBlackjackEnv):
+    """Env whose shoe cannot be checkpointed, so a worker dies after the round's barriers."""
+
+    def seed(self, seed=None):
+        result = super().seed(seed)
+        self.shoe.get_state = None
+        return result
+
+def test_parallel_training_fails_when_a_worker_dies_while_checkpointing(tmp_path):
+    with pytest.raises(RuntimeError):
+        train_agent_parallel(_agent(), episodes=200, workers=2, merge_every=100, seed=6, env_factory=_UnsavableEnv,
+                             metrics=TrainingMetrics(verbose=False),
+                             checkpointer=Checkpointer(str(tmp_path / "ckpt"), every=10 ** 9), timeout=0.5)
+
+def test_checkpointer_saves_periodically_and_at_the_end(tmp_path):
+    path = tmp_path / "ckpt"
+    checkpointer = Checkpointer(path, every=100, start_episode=1000)
+    agent = _agent()
+    train_agent(CustomBlackjackEnv(), agent, episodes=150, metrics=TrainingMetrics(verbose=False),
+                checkpointer=checkpointer)
+    _, episodes = load_checkpoint(path, restore_rng=False)
+    assert episodes == 1150
+    assert not os.path.exists(str(path) + ".tmp") and not os.path.exists(str(path) + ".old")
+
+def test_crn_evaluation_pairs_identical_agents_exactly():
+    basic = BasicStrategyAgent()
+    report = evaluate_agents_crn({"basic": basic, "copy": BasicStrategyAgent()}, episodes=3000, workers=1, seed=5)
+    assert report["agents"]["basic"]["mean"] == report["agents"]["copy"]["mean"], "Same policy on the same shoes should score the same."
+    difference = report["differences"]["copy"]
+    assert difference["mean"] == 0 and difference["stderr"] == 0, "Paired difference of identical agents should vanish."
+    hands = sum(stats["hands"] for stats in report["buckets"]["basic"].values())
+    assert hands == 3000, "Every round should land in one starting-hand bucket."
+    low, high = report["agents"]["basic"]["ci95"]
+    assert low < report["agents"]["basic"]["mean"] < high
+
+def test_crn_evaluation_does_not_depend_on_workers():
+    agents = {"basic": BasicStrategyAgent(), "q": _agent()}
+    single = evaluate_agents_crn(agents, episodes=1200, workers=1, seed=9)
+    pooled = evaluate_agents_crn(agents, episodes=1200, workers=2, seed=9)
+    assert single["agents"] == pooled["agents"], "Results should depend only on the seed."
+    assert single["differences"]["q"]["stderr"] < single["agents"]["q"]["stderr"] * 2
+
+def test_benchmark_report_flags_regressions():
+    report = run_benchmarks(["hand_score", "q_update"])
+    assert set(report["results"]) == {"hand_score", "q_update"}
+    assert all(result["ops_per_sec"] > 0 for result in report["results"].values())
+    faster = {"results": {name: {"ops_per_sec": result["ops_per_sec"] * 2} for name, result in report["results"].items()}}
+    assert [name for name, _, _ in find_regressions(report, faster)] == ["hand_score", "q_update"], \
+        "Halved throughput should be reported."
+    assert find_regressions(report, report) == [], "A run should not regress against itself."
+
+def test_starting_states_are_a_distribution():
+    states = starting_states()
+    assert len(states) == 55 * 10
+    assert sum(probability for _, _, probability in states) == pytest.approx(1.0)
+
+def test_convergence_report_rows():
+    rows = convergence_report({"q": _agent, "mc": lambda: QLambdaAgent(actions=[0, 1, 2, 3])}, [200, 500])
+    assert [(row["agent"], row["episode"]) for row in rows] == [("q", 200), ("q", 500), ("mc", 200), ("mc", 500)]
+    assert all(0 <= row["agreement"] <= 1 and 0 <= row["weighted_agreement"] <= 1 for row in rows)
+    untrained, _ = policy_agreement(_agent())
+    assert untrained < 0.5, "An untrained table always sticks, which basic strategy rarely does."
+    rows = [{"agent": "q", "episode": 100, "weighted_agreement": 0.5}, {"agent": "q", "episode": 200, "weighted_agreement": 0.7},
+            {"agent": "fast", "episode": 100, "weighted_agreement": 0.75}, {"agent": "slow", "episode": 200, "weighted_agreement": 0.6}]
+    assert episodes_to_match(rows, "q") == {"q": 200, "fast": 100, "slow": None}
+
+def test_sweep_configs():
+    space = {"alpha": [0.1, 0.5], "epsilon_decay": [0.999, 0.9999], "gamma": 1.0}
+    assert len(grid_configs(space)) == 4 and all(config["gamma"] == 1.0 for config in grid_configs(space))
+    sampled = random_configs({"alpha": (0.01, 1.0, "log"), "epsilon_min": (0.0, 0.2)}, 20, seed=1)
+    assert all(0.01 <= config["alpha"] <= 1.0 and 0 <= config["epsilon_min"] <= 0.2 for config in sampled)
+    with pytest.raises(ValueError):
+        grid_configs({"alpha": (0.01, 1.0)})
+
+def test_successive_halving_stops_losers(tmp_path):
+    configs = grid_configs({"alpha": [0.0, 0.5, 0.2], "gamma": 1.0, "epsilon_decay": 0.999})
+    writer = open_writer(str(tmp_path / "sweep.csv"))
+    rows, best = successive_halving(configs, min_episodes=300, eta=3, max_rungs=3, eval_episodes=300,
+                                    workers=1, seed=2, writer=writer)
+    writer.close()
+    assert [row["rung"] for row in rows] == [0, 0, 0, 1], "Only a third of the configurations should go on."
+    assert rows[-1]["episodes"] == 900 and best is rows[-1] and best["status"] == "best"
+    leader = max(rows[:3], key=lambda row: row["weighted_agreement"])
+    assert leader["status"] == "promoted" and best["config"] == leader["config"]
+    assert all(row["status"] == "stopped" for row in rows[:3] if row is not leader)
+    with open(tmp_path / "sweep.csv") as file:
+        assert len(list(csv.DictReader(file))) == len(rows)
+    pooled, _ = successive_halving(configs, min_episodes=300, eta=3, max_rungs=3, eval_episodes=300,
+                                   workers=2, seed=2)
+    strip = lambda table: [{key: value for key, value in row.items() if key != "seconds"} for row in table]
+    assert strip(pooled) == strip(rows), "Results should not depend on the worker count."
+
+def test_profiler_counts_phases_and_detaches(tmp_path):
+    env, agent = CustomBlackjackEnv(), _agent()
+    profiler, report = profile_training(env, agent, episodes=500, cprofile_path=str(tmp_path / "train.prof"), top=5)
+    phases = profiler.summary()["phases"]
+    assert phases["env_reset"]["calls"] == 500 and profiler.counters["episodes"] == 500
+    assert phases["env_step"]["calls"] == phases["update"]["calls"] == phases["choose_action"]["calls"]
+    assert phases["dealer_play"]["calls"] <= phases["env_step"]["calls"]
+    assert phases["dealer_play"]["seconds"] <= phases["env_step"]["seconds"], "Nested phases are inclusive."
+    assert "step" not in vars(env) and "update" not in vars(agent) and "greedy_action" not in vars(agent.q_table), \
+        "Detaching should leave no wrappers behind."
+    assert "function calls" in report
+    assert pstats.Stats(str(tmp_path / "train.prof")).total_calls > 0
+    assert "env_step" in profiler.format_summary()
+
+def test_all_actions_training_updates_every_action():
+    env = CustomBlackjackEnv()
+    env.seed(0)
+    agent = _agent()
+    metrics = train_agent(env, agent, episodes=500, metrics=TrainingMetrics(verbose=False), all_actions=True)
+    visits = agent.q_table.visits
+    visited = visits.sum(axis=1) > 0
+    assert metrics.episodes == 500 and np.all(visits[visited] > 0), "Every visited state should update all four actions."
+
+def test_policy_diff_covers_every_chart_cell(tmp_path):
+    diff = compare_policies(BasicStrategyAgent())
+    assert diff["agreement"] == diff["weighted_agreement"] == 1.0
+    assert len(diff["cells"]) == (15 + 9 + 10) * 10, "Hard 5-19, soft 13-21 and ten pairs against ten upcards."
+    assert sum(row["probability"] for row in diff["cells"]) == pytest.approx(1.0)
+
+    agent = _agent()
+    agent.q_table.values[:, 1] = 1.0  # Always hit
+    diff = compare_policies(agent)
+    assert (diff["agreement"], diff["weighted_agreement"]) == pytest.approx(policy_agreement(agent))
+    hard_16 = next(row for row in diff["cells"] if (row["category"], row["total"], row["dealer_card"]) == ("hard", 16, 6))
+    assert hard_16["action"] == 1 and hard_16["reference_action"] == 0 and hard_16["agreement"] == 0.0
+    assert "Hs" in format_chart_diff(diff)
+
+    write_chart_csv(diff, str(tmp_path / "diff.csv"))
+    assert len((tmp_path / "diff.csv").read_text().splitlines()) == len(diff["cells"]) + 1
+    pytest.importorskip("matplotlib")
+    plot_chart_diff(diff, str(tmp_path / "diff.png"))
+    assert (tmp_path / "diff.png").stat().st_size > 0
+
+def test_training_run_skips_the_chart_image_without_matplotlib(tmp_path, monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, "matplotlib", None)  # Importing it now raises ImportError
+    main.plot_or_skip(compare_policies(BasicStrategyAgent()), str(tmp_path / "diff.png"))
+    assert not (tmp_path / "diff.png").exists() and "needs matplotlib" in capsys.readouterr().out
+
+def test_hand_history_records_and_replays(tmp_path):
+    env = CustomBlackjackEnv(seed=6)
+    agent = QLearningAgent(actions=[0, 1, 2, 3], epsilon=0.3, seed=6)
+    with HandHistoryRecorder(str(tmp_path), chunk_size=128).attach(env) as recorder:
+        metrics = train_agent(env, agent, episodes=300, metrics=TrainingMetrics(verbose=False))
+    assert recorder.chunks == 3, "300 rounds in chunks of 128."
+    assert "step" not in env.__dict__, "detach should restore the env's own methods."
+
+    rounds = list(iter_rounds(str(tmp_path)))
+    assert [entry["round"] for entry in rounds] == list(range(300))
+    assert sum(entry["reward"] for entry in rounds) == pytest.approx(metrics.rewards.mean * 300)
+    first = rounds[0]
+    assert first["card_owner"][:3] == [PLAYER, DEALER, PLAYER] and len(first["lookahead"]) == 10
+    assert all(entry["shoe_position"] + len(entry["cards"]) == rounds[number + 1]["shoe_position"]
+               for number, entry in enumerate(rounds[:50]) if rounds[number + 1]["shoe_position"] > entry["shoe_position"])
+
+    agent.epsilon = 0.0
+    report = rescore_history(str(tmp_path), agent)
+    assert report["rounds"] == 300 and report["resolved"] >= 290
+    assert 0 < report["identical_rounds"] < report["resolved"], "Greedy play should differ from exploratory play."
+
+    with HandHistoryRecorder(str(tmp_path), chunk_size=128).attach(env):
+        train_agent(env, agent, episodes=10, metrics=TrainingMetrics(verbose=False))
+    assert [entry["round"] for entry in iter_rounds(str(tmp_path))][-1] == 309, "A reopened history appends."
+
+def test_hand_history_lookahead_comes_from_the_shoe_the_round_was_dealt_from(tmp_path):
+    env = CustomBlackjackEnv(rules=Rules(reshuffle_reserve=5, round_end_reserve=15), seed=9)
+    with HandHistoryRecorder(str(tmp_path), lookahead=5).attach(env):
+        env.shoe.cursor = env.shoe.size - 16
+        env.reset()
+        upcoming = env.shoe.remaining_cards()
+        assert env.step(0)[2] and env.shoe.cursor == 0, "The round should end with a reshuffle."
+    recorded = next(iter_rounds(str(tmp_path)))
+    drawn = len(recorded["cards"]) - 3
+    assert recorded["lookahead"] == upcoming[drawn:drawn + 5], "Lookahead should be taken before the reshuffle."
+
+    with pytest.raises(ValueError):
+        HandHistoryRecorder(str(tmp_path), lookahead=5).attach(CustomBlackjackEnv())
+    with pytest.raises(ValueError):
+        HandHistoryRecorder(str(tmp_path)).attach(env)
+
+def test_expected_evaluation_finishes_every_round(tmp_path):
+    env = CustomBlackjackEnv(seed=5)
+    with HandHistoryRecorder(str(tmp_path)).attach(env):
+        evaluate_agent_expected(BasicStrategyAgent(), episodes=300, env=env)
+    rounds = list(iter_rounds(str(tmp_path)))
+    assert len(rounds) == 300 and all(entry["done"] for entry in rounds), "Stands should end the round in the env."
+
+def test_replaying_the_recording_policy_reproduces_rewards(tmp_path):
+    env = CustomBlackjackEnv(seed=8)
+    basic = BasicStrategyAgent()
+    with HandHistoryRecorder(str(tmp_path)).attach(env):
+        for _ in range(500):
+            obs, done = env.reset(), False
+            while not done:
+                obs, _, done, _ = env.step(basic.choose_action((obs[0], obs[1], obs[2], env.player)))
+    report = rescore_history(str(tmp_path), basic)
+    assert report["identical_rounds"] == report["resolved"] == 500 and report["decision_agreement"] == 1.0
+    assert report["replayed_reward"] == pytest.approx(report["recorded_reward"])
+
+def test_batch_update_matches_sequential_updates_on_distinct_pairs():
+    sequential, batched = (QLearningAgent(actions=[0, 1, 2, 3], alpha=0.7, gamma=1.0, alpha_decay=1.0)
+                           for _ in range(2))
+    rng = np.random.default_rng(0)
+    sequential.q_table.values[:] = batched.q_table.values[:] = rng.normal(size=sequential.q_table.values.shape)
+    states, actions = np.array([3, 5, 9, 12]), np.array([0, 1, 1, 2])
+    rewards, next_states, dones = np.array([0.0, 1.0, -1.0, 0.0]), np.array([40, 41, 42, 43]), np.array([0, 1, 1, 0])
+    for transition in zip(states, actions, rewards, next_states, dones):
+        sequential.update(*transition)
+    batched.update_batch(states, actions, rewards, next_states, dones)
+    assert np.allclose(sequential.q_table.values, batched.q_table.values)
+    assert np.array_equal(sequential.q_table.visits, batched.q_table.visits)
+    assert batched.epsilon == pytest.approx(sequential.epsilon) and batched.alpha == pytest.approx(sequential.alpha)
+
+def test_batch_update_moves_repeated_pairs_as_far_as_sequential_updates():
+    sequential, batched = (QLearningAgent(actions=[0, 1, 2, 3], alpha=0.3, gamma=1.0, alpha_decay=1.0)
+                           for _ in range(2))
+    states, actions, rewards = np.full(5, 7), np.full(5, 1), np.full(5, 10.0)
+    next_states, dones = np.zeros(5, dtype=np.int64), np.ones(5)
+    for transition in zip(states, actions, rewards, next_states, dones):
+        sequential.update(*transition)
+    batched.update_batch(states, actions, rewards, next_states, dones)
+    assert batched.q_table.values[7, 1] == pytest.approx(sequential.q_table.values[7, 1]) == 10 * (1 - 0.7 ** 5)
+
+def test_actor_learner_pipeline_applies_every_transition():
+    agent = _agent()
+    stats = train_actor_learner(agent, episodes=2000, actors=2, batch_size=256, slots=2, seed=4,
+                                metrics=TrainingMetrics(verbose=False))
+    assert stats["episodes"] == 2000 and stats["actors"] == 2
+    assert stats["transitions"] == agent.q_table.visits.sum() >= 2000, "The learner applies every transition once."
+    assert agent.epsilon == pytest.approx(max(agent.epsilon_min, 0.9995 ** stats["transitions"]))
+    assert stats["policy_versions"] > 0 and stats["refreshes"] > 2, "Actors should pick up published snapshots."
+    assert 0 <= stats["mean_policy_lag"] <= stats["max_policy_lag"]
+    assert stats["transitions_per_sec"] > 0 and 0 <= stats["actor_stalled"] <= 1
+
+    stats = train_actor_learner(_agent(), episodes=2000, actors=1, batch_size=256, slots=2, seed=4,
+                                metrics=TrainingMetrics(verbose=False))
+    assert stats["max_policy_lag"] > 0, "A single actor still plays on snapshots the learner has moved past."
+
+def test_actor_learner_comparison_with_serial_training():
+    rows = compare_with_serial(_agent, episodes=500, actors=1, batch_size=256, seed=1)
+    assert [row["trainer"] for row in rows] == ["serial", "actor_learner/1"]
+    assert all(row["episodes"] == 500 and 0 <= row["weighted_agreement"] <= 1 and row["episodes_per_sec"] > 0
+               for row in rows)
@@ -1,3 +1,12 @@
 #!/usr/bin/env python3
-from .train import train_agent
-from .evaluate import evaluate_agents, evaluate_and_compare_agents
\ No newline at end of file
+from .train import train_agent, play_episode, play_episode_all_actions
+from .parallel import train_agent_parallel
+from .actor_learner import train_actor_learner
+from .metrics import TrainingMetrics, RunningStats, open_writer
+from .checkpoint import Checkpointer, save_checkpoint, load_checkpoint, load_worker_states
+from .evaluate import evaluate_agents, evaluate_and_compare_agents, evaluate_agent_batched, evaluate_agent_expected
+from .crn import evaluate_agents_crn, print_crn_report
+from .sweep import grid_configs, random_configs, successive_halving
+from .profiling import Profiler, profile_training
+from .policy_diff import compare_policies, format_chart_diff
+from .history import HandHistoryRecorder, iter_rounds, rescore_history
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from agent import QLearningAgent
+from blackjack.custom_env import CustomBlackjackEnv
+from blackjack.rng import STREAMS, child_seed, seed_sequence
+from .convergence import policy_agreement
+from .metrics import TrainingMetrics
+from .parallel import _attach
+from .train import train_agent
+
+# Columns of a transition in a slot; SNAPSHOT is the policy version (updates applied) it was generated with
+STATE, ACTION, REWARD, NEXT_STATE, DONE, SNAPSHOT = range(6)
+# Columns of a slot's header: transitions and the reward stats of the episodes finished in it
+COUNT, EPISODES, REWARD_SUM, REWARD_SQ, WINS, LOSSES, PUSHES = range(7)
+# Columns of an actor's counters
+ACTOR_EPISODES, ACTOR_TRANSITIONS, STALL_SECONDS, REFRESHES = range(4)
+
+
+def _actor(actor_id, seed, settings, blocks, episodes, batch_size, free, full, lock, env_factory):
+    """Play ``episodes`` episodes with the latest policy snapshot and ship their transitions slot by slot."""
+    handles, arrays = [], {}
+    try:
+        handles, arrays = _attach(blocks)
+        env = env_factory()
+        env.seed(child_seed(seed, actor_id, STREAMS["env"]))
+        agent = QLearningAgent(**settings, seed=child_seed(seed, actor_id, STREAMS["agent"]))
+        policy, header, counters = arrays["policy"], arrays["header"], arrays["actor_stats"][actor_id]
+        snapshot = -1
+
+        transitions, stats = [], [0, 0.0, 0.0, 0, 0, 0]
+        played = 0
+        while played < episodes or transitions:
+            if played < episodes:
+                # Refresh the local policy whenever the learner has published a newer one
+                if header[0] != snapshot:
+                    with lock:
+                        agent.q_table.values[:] = policy
+                        snapshot, agent.epsilon = header
+                    counters[REFRESHES] += 1
+                obs = env.reset()
+                state = agent.state_representation(obs[0], obs[1], obs[2], env.player)
+                done, total = False, 0
+                while not done:
+                    action = agent.choose_action(state)
+                    obs, reward, done, _ = env.step(action)
+                    next_state = agent.state_representation(obs[0], obs[1], obs[2], env.player)
+                    transitions.append((state, action, reward, next_state, done, snapshot))
+                    state = next_state
+                    total += reward
+                played += 1
+                stats[0] += 1
+                stats[1] += total
+                stats[2] += total * total
+                stats[3 if total > 0 else 4 if total < 0 else 5] += 1
+                if len(transitions) < batch_size and played < episodes:
+                    continue
+
+            # Backpressure: wait for the learner to hand back a slot
+            start = time.perf_counter()
+            slot = free.get()
+            counters[STALL_SECONDS] += time.perf_counter() - start
+            batch, transitions = transitions[:batch_size], transitions[batch_size:]
+            arrays["slots"][slot, :len(batch)] = batch
+            arrays["slot_header"][slot] = (len(batch), *stats)
+            counters[ACTOR_EPISODES] += stats[0]
+            counters[ACTOR_TRANSITIONS] += len(batch)
+            stats = [0, 0.0, 0.0, 0, 0, 0]
+            full.put(slot)
+        full.put(None)  # Finished
+    finally:
+        arrays.clear()
+        for shm in handles:
+            shm.close()
+
+
+def train_actor_learner(agent, episodes=100000, actors=None, batch_size=4096, slots=None, publish_every=None,
+                        seed=None, env_factory=CustomBlackjackEnv, metrics=None, timeout=60.0):
+    """
+    Train a QLearningAgent with actor processes simulating and this process learning, asynchronously.
+
+    Actors play epsilon-greedy episodes against their copy of the latest policy
+    snapshot and fill fixed-size transition slots in shared memory; only slot
+    numbers travel through the queues. The learner applies each slot with
+    QLearningAgent.update_batch as soon as it arrives, and publishes a new
+    snapshot (Q-values and epsilon) every ``publish_every`` updates, which
+    actors pick up before their next episode. There are only ``slots`` slots:
+    once the learner falls that far behind, actors block until it hands one
+    back, so memory stays bounded and simulation never runs away from
+    learning. Transitions from different actors arrive in whatever order the
+    processes run in, so unlike train_agent_parallel a run is not reproducible
+    bit for bit; each actor's shoe and exploration streams still derive from
+    ``seed``.
+
+    Args:
+        agent: QLearningAgent trained in place.
+        episodes: Total episodes across all actors.
+        actors: Number of actor processes (defaults to the CPU count minus one for the learner, at least one).
+        batch_size: Transitions per slot, i.e. per bulk update.
+        slots: Transition slots shared by all actors (defaults to four per actor).
+        publish_every: Updates between policy snapshots (defaults to ``batch_size`` times the actor count).
+        seed: Root seed of the actors' streams (see blackjack.rng.child_seed).
+        env_factory: Callable returning a fresh environment in each actor.
+        metrics: TrainingMetrics fed with the episodes of every slot (a printing one by default).
+        timeout: Seconds the learner waits for a slot before checking that the actors are still alive.
+    Returns:
+        dict: Episodes, transitions, actors, wall time, episodes/sec and transitions/sec, the learner's
+        busy share, the actors' share of time stalled by backpressure, policy refreshes and versions
+        published, the mean and maximum policy lag (updates between the snapshot each transition was
+        generated with and the moment it was learned) and the mean reward per episode.
+    """
+    if metrics is None:
+        metrics = TrainingMetrics()
+    actors = actors or max(1, (os.cpu_count() or 2) - 1)
+    slots = slots or 4 * actors
+    publish_every = publish_every or batch_size * actors
+    seed = seed_sequence(seed)
+    settings = dict(actions=agent.actions, alpha=agent.alpha, gamma=agent.gamma, epsilon=agent.epsilon,
+                    epsilon_decay=agent.epsilon_decay, epsilon_min=agent.epsilon_min,
+                    alpha_decay=agent.alpha_decay, alpha_min=agent.alpha_min,
+                    state_index=agent.q_table.index.name)
+    table = agent.q_table
+    shares = [episodes // actors + (actor < episodes % actors) for actor in range(actors)]
+
+    specs = {
+        "policy": (table.values.shape, np.float64),
+        "header": ((2,), np.float64),  # Updates applied when the snapshot was taken, its epsilon
+        "slots": ((slots, batch_size, 6), np.float64),
+        "slot_header": ((slots, 7), np.float64),
+        "actor_stats": ((actors, 4), np.float64),
+    }
+    handles, blocks, arrays = [], {}, {}
+    ctx = mp.get_context()
+    processes = []
+    updates = published = 0
+    lag_total = lag_max = 0.0
+    busy = 0.0
+    start = time.perf_counter()
+    try:
+        for key, (block_shape, dtype) in specs.items():
+            nbytes = int(np.prod(block_shape)) * np.dtype(dtype).itemsize
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            handles.append(shm)
+            blocks[key] = (shm.name, block_shape, np.dtype(dtype).str)
+            arrays[key] = np.ndarray(block_shape, dtype=dtype, buffer=shm.buf)
+        arrays["actor_stats"][:] = 0
+        lock = ctx.Lock()
+        arrays["policy"][:] = table.values
+        arrays["header"][:] = 0, agent.epsilon
+
+        free, full = ctx.Queue(), ctx.Queue()
+        for slot in range(slots):
+            free.put(slot)
+        processes = [
+            ctx.Process(target=_actor, args=(actor_id, seed, settings, blocks, shares[actor_id], batch_size,
+                                             free, full, lock, env_factory), daemon=True)
+            for actor_id in range(actors)
+        ]
+        for process in processes:
+            process.start()
+
+        finished = 0
+        since_publish = 0
+        while finished < actors:
+            try:
+                slot = full.get(timeout=timeout)
+            except queue.Empty:
+                if any(process.exitcode not in (None, 0) for process in processes):
+                    raise RuntimeError("An actor failed; see its traceback above.") from None
+                continue
+            if slot is None:
+                finished += 1
+                continue
+
+            busy_start = time.perf_counter()
+            header = arrays["slot_header"][slot]
+            count = int(header[COUNT])
+            batch = arrays["slots"][slot, :count]
+            # A slot can span several snapshots (actors refresh between episodes), so lag is per transition
+            lags = updates - batch[:, SNAPSHOT]
+            lag_total += lags.sum()
+            lag_max = max(lag_max, lags.max())
+            agent.update_batch(batch[:, STATE].astype(np.int64), batch[:, ACTION].astype(np.int64),
+                               batch[:, REWARD], batch[:, NEXT_STATE].astype(np.int64), batch[:, DONE])
+            played, total, total_sq, wins, losses, pushes = header[EPISODES:].tolist()
+            free.put(slot)
+            updates += count
+            since_publish += count
+            if since_publish >= publish_every:
+                with lock:
+                    arrays["policy"][:] = table.values
+                    arrays["header"][:] = updates, agent.epsilon
+                published += 1
+                since_publish = 0
+            busy += time.perf_counter() - busy_start
+
+            if played:
+                metrics.record_batch(int(played), total, total_sq, int(wins), int(losses), int(pushes))
+                metrics.maybe_log(agent)
+
+        for process in processes:
+            process.join()
+        actor_stats = arrays["actor_stats"].sum(axis=0)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        arrays.clear()
+        for shm in handles:
+            shm.close()
+            shm.unlink()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "episodes": int(actor_stats[ACTOR_EPISODES]),
+        "transitions": updates,
+        "actors": actors,
+        "seconds": elapsed,
+        "episodes_per_sec": actor_stats[ACTOR_EPISODES] / elapsed,
+        "transitions_per_sec": updates / elapsed,
+        "learner_busy": busy / elapsed,
+        "actor_stalled": actor_stats[STALL_SECONDS] / (elapsed * actors),
+        "refreshes": int(actor_stats[REFRESHES]),
+        "policy_versions": published,
+        "mean_policy_lag": lag_total / max(updates, 1),
+        "max_policy_lag": lag_max,
+        "mean_reward": metrics.rewards.mean,
+    }
+
+
+def compare_with_serial(agent_factory, episodes=200000, actors=None, batch_size=4096, seed=0,
+                        env_factory=CustomBlackjackEnv):
+    """
+    Train one agent with train_agent and another with train_actor_learner on the same budget.
+    Args:
+        agent_factory: Callable returning a fresh QLearningAgent; both runs start from one.
+        episodes: Episodes per run.
+        actors, batch_size: Passed to train_actor_learner.
+        seed: Root seed of both runs (the serial run uses the streams of actor 0).
+        env_factory: Callable returning a fresh environment.
+    Returns:
+        list: One dict per trainer with the episodes, seconds, episodes/sec, agreement and weighted
+        agreement with basic strategy (see training.convergence.policy_agreement) and mean reward.
+    """
+    rows = []
+    agent, env = agent_factory(), env_factory()
+    env.seed(child_seed(seed_sequence(seed), 0, STREAMS["env"]))
+    agent.seed(child_seed(seed_sequence(seed), 0, STREAMS["agent"]))
+    start = time.perf_counter()
+    metrics = train_agent(env, agent, episodes=episodes, metrics=TrainingMetrics(log_every=float("inf"), verbose=False))
+    rows.append(_comparison_row("serial", agent, episodes, time.perf_counter() - start, metrics.rewards.mean))
+
+    agent = agent_factory()
+    stats = train_actor_learner(agent, episodes=episodes, actors=actors, batch_size=batch_size, seed=seed,
+                                env_factory=env_factory,
+                                metrics=TrainingMetrics(log_every=float("inf"), verbose=False))
+    rows.append(_comparison_row(f"actor_learner/{stats['actors']}", agent, stats["episodes"], stats["seconds"],
+                                stats["mean_reward"]))
+    rows[-1]["mean_policy_lag"] = stats["mean_policy_lag"]
+    return rows
+
+
+def _comparison_row(name, agent, episodes, seconds, mean_reward):
+    agreement, weighted = policy_agreement(agent)
+    return {"trainer": name, "episodes": episodes, "seconds": seconds, "episodes_per_sec": episodes / seconds,
+            "agreement": agreement, "weighted_agreement": weighted, "mean_reward": mean_reward}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Actor/learner training against serial train_agent.")
+    parser.add_argument("--episodes", type=int, default=200000)
+    parser.add_argument("--actors", type=int)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    def agent_factory():
+        return QLearningAgent(actions=[0, 1, 2, 3], alpha=0.7, gamma=1.0, epsilon=1.0)  # main.py's setup
+
+    rows = compare_with_serial(agent_factory, args.episodes, args.actors, args.batch_size, args.seed)
+    for row in rows:
+        print(f"{row['trainer']:>16} {row['episodes']:>9} episodes in {row['seconds']:.1f}s "
+              f"({row['episodes_per_sec']:.0f}/s): agreement {row['agreement']:.3f} "
+              f"(weighted {row['weighted_agreement']:.3f}), mean reward {row['mean_reward']:.3f}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+import json
+import os
+import shutil
+
+import numpy as np
+
+from agent import QLearningAgent
+
+CHECKPOINT_FORMAT = 1
+
+
+def shoe_state(shoe):
+    """Shoe.get_state() as JSON-serialisable data."""
+    cards, order, cursor, rank_counts, running_count, rng_state = shoe.get_state()
+    return {"cards": cards.tolist(), "order": order, "cursor": cursor, "rank_counts": rank_counts,
+            "running_count": running_count, "rng": rng_state}
+
+
+def restore_shoe(shoe, state):
+    """Put a shoe back where shoe_state() found it, down to the generator of its next shuffle."""
+    shoe.set_state((np.array(state["cards"], dtype=shoe.cards.dtype), state["order"], state["cursor"],
+                    state["rank_counts"], state["running_count"], state["rng"]))
+
+
+def _complete(path):
+    return os.path.exists(os.path.join(path, "agent.json"))  # Written last, by rename
+
+
+def _resolve(path):
+    """The directory holding the latest complete checkpoint of ``path``."""
+    # A crash mid-swap leaves the new checkpoint staged in .tmp and the previous one in .old
+    for candidate in (path, path + ".tmp", path + ".old"):
+        if _complete(candidate):
+            return candidate
+    raise FileNotFoundError(f"No complete checkpoint at {path}")
+
+
+def save_checkpoint(agent, path, episodes=0, env=None, workers=None):
+    """
+    Write a QLearningAgent to a checkpoint directory.
+
+    The directory holds ``q_values.npy`` and ``visits.npy`` (plain .npy arrays
+    that can be memory-mapped) and ``agent.json`` with the hyperparameters,
+    the decayed epsilon/alpha, the episode count, the position of the agent's
+    exploration stream and, when given, the training env's shoe and the
+    parallel workers' streams. The global ``random`` and ``np.random`` states
+    are neither saved nor touched: agents and envs draw from their own streams.
+    The directory is staged as ``path.tmp`` (agent.json last) and swapped in
+    through ``path.old``; load_checkpoint falls back to whichever of them is
+    complete, so a crash at any point leaves a loadable checkpoint.
+
+    Args:
+        agent: The agent to save.
+        path: Checkpoint directory.
+        episodes: Number of episodes the agent has been trained for.
+        env: Training env whose shoe is saved, so a resumed run deals the same cards.
+        workers: Per-worker states of train_agent_parallel (see load_worker_states).
+    """
+    path = os.path.abspath(path)
+    staging, previous = path + ".tmp", path + ".old"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    np.save(os.path.join(staging, "q_values.npy"), agent.q_table.values)
+    np.save(os.path.join(staging, "visits.npy"), agent.q_table.visits)
+    state = {
+        "format": CHECKPOINT_FORMAT,
+        "episodes": episodes,
+        "actions": [int(action) for action in agent.actions],
+        "alpha": agent.alpha,
+        "gamma": agent.gamma,
+        "epsilon": agent.epsilon,
+        "epsilon_decay": agent.epsilon_decay,
+        "epsilon_min": agent.epsilon_min,
+        "alpha_decay": agent.alpha_decay,
+        "alpha_min": agent.alpha_min,
+        "state_index": agent.q_table.index.name,
+        "agent_rng": agent.rng.get_state(),
+    }
+    if env is not None:
+        state["shoe"] = shoe_state(env.shoe)
+    if workers is not None:
+        state["workers"] = workers
+    with open(os.path.join(staging, "agent.json.tmp"), "w") as file:
+        json.dump(state, file)
+    os.replace(os.path.join(staging, "agent.json.tmp"), os.path.join(staging, "agent.json"))
+
+    if os.path.exists(path):
+        shutil.rmtree(previous, ignore_errors=True)
+        os.replace(path, previous)
+    os.replace(staging, path)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def load_checkpoint(path, mmap=False, restore_rng=True, env=None):
+    """
+    Rebuild a QLearningAgent from a checkpoint directory.
+    Args:
+        path: Checkpoint directory written by save_checkpoint (or what a crash mid-save left of it).
+        mmap: Map the Q-values and visit counts read-only instead of loading them, so several
+            evaluation or serving processes share one copy through the page cache.
+        restore_rng: Resume the agent's exploration stream where it was saved.
+        env: Env whose shoe is put back where it was saved, if the checkpoint has one.
+    Returns:
+        tuple: (agent, episodes trained so far).
+    """
+    path = _resolve(os.path.abspath(path))
+    with open(os.path.join(path, "agent.json")) as file:
+        state = json.load(file)
+    if state["format"] != CHECKPOINT_FORMAT:
+        raise ValueError(f"Unsupported checkpoint format: {state['format']}")
+
+    agent = QLearningAgent(actions=state["actions"], alpha=state["alpha"], gamma=state["gamma"],
+                           epsilon=state["epsilon"], epsilon_decay=state["epsilon_decay"],
+                           epsilon_min=state["epsilon_min"], alpha_decay=state.get("alpha_decay", 0.99),
+                           alpha_min=state.get("alpha_min", 0.001),
+                           state_index=state.get("state_index", "cards"))
+    mmap_mode = "r" if mmap else None
+    values = np.load(os.path.join(path, "q_values.npy"), mmap_mode=mmap_mode)
+    visits = np.load(os.path.join(path, "visits.npy"), mmap_mode=mmap_mode)
+    if values.shape != agent.q_table.values.shape:
+        raise ValueError(f"Checkpoint table has shape {values.shape}, expected {agent.q_table.values.shape}")
+    agent.q_table.values = values
+    agent.q_table.visits = visits
+
+    if restore_rng and "agent_rng" in state:
+        agent.rng.set_state(state["agent_rng"])
+    if env is not None and "shoe" in state:
+        restore_shoe(env.shoe, state["shoe"])
+    return agent, state["episodes"]
+
+
+def load_worker_states(path):
+    """Per-worker streams and shoes saved by train_agent_parallel, for its ``worker_states`` (None if absent)."""
+    with open(os.path.join(_resolve(os.path.abspath(path)), "agent.json")) as file:
+        return json.load(file).get("workers")
+
+
+class Checkpointer:
+    """Save an agent every ``every`` episodes while it trains."""
+
+    def __init__(self, path, every=1000000, start_episode=0):
+        """
+        Args:
+            path: Checkpoint directory, overwritten by every save.
+            every: Episodes between two saves.
+            start_episode: Episodes already trained when resuming from a checkpoint.
+        """
+        self.path = path
+        self.every = every
+        self.start_episode = start_episode
+        self._last_saved = start_episode
+
+    def due(self, episodes):
+        """Whether ``every`` episodes have passed since the last save; ``episodes`` counts the episodes of this run."""
+        return self.start_episode + episodes - self._last_saved >= self.every
+
+    def maybe_save(self, agent, episodes, env=None):
+        """Save if due (see due)."""
+        if self.due(episodes):
+            self.save(agent, episodes, env)
+
+    def save(self, agent, episodes, env=None, workers=None):
+        self._last_saved = self.start_episode + episodes
+        save_checkpoint(agent, self.path, self._last_saved, env=env, workers=workers)
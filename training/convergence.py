@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import time
+
+from agent import QLearningAgent, QLambdaAgent
+from agent.q_table import STATE_INDEXES
+from blackjack.custom_env import CustomBlackjackEnv
+from blackjack.rng import STREAMS, child_seed
+from blackjack.strategy import BASIC_STRATEGY
+from .metrics import TrainingMetrics
+from .train import train_agent
+
+CARD_PROBABILITIES = {card: (4 if card == 10 else 1) / 13 for card in range(1, 11)}  # Infinite deck
+
+
+def starting_states():
+    """
+    Every two-card start against every dealer card.
+    Returns:
+        list: (player_cards, dealer_card, probability of being dealt it) tuples.
+    """
+    states = []
+    for first in range(1, 11):
+        for second in range(first, 11):
+            hand_probability = CARD_PROBABILITIES[first] * CARD_PROBABILITIES[second] * (1 if first == second else 2)
+            for dealer_card in range(1, 11):
+                states.append(((first, second), dealer_card, hand_probability * CARD_PROBABILITIES[dealer_card]))
+    return states
+
+
+def policy_agreement(agent, reference=BASIC_STRATEGY, states=None):
+    """
+    How often an agent's greedy first decision matches a reference strategy.
+    Args:
+        agent: Agent with a q_table and state_representation.
+        reference: StrategyTable to compare with (basic strategy by default).
+        states: Output of starting_states (computed when omitted).
+    Returns:
+        tuple: (fraction of starting states that agree, the same weighted by how often each is dealt).
+    """
+    states = states or starting_states()
+    matches = weighted = 0.0
+    for cards, dealer_card, probability in states:
+        total = sum(cards)
+        usable_ace = 1 in cards and total + 10 <= 21
+        total += 10 * usable_ace
+        greedy = agent.q_table.greedy_action(agent.state_representation(total, dealer_card, usable_ace, cards))
+        if greedy == reference.choose_action(total, dealer_card, usable_ace, cards):
+            matches += 1
+            weighted += probability
+    return matches / len(states), weighted
+
+
+def convergence_report(agent_factories, checkpoints, env_factory=CustomBlackjackEnv, writer=None, seed=None):
+    """
+    Train several agents side by side and record how fast each approaches basic strategy.
+    Args:
+        agent_factories: Dict of name -> callable returning a fresh agent.
+        checkpoints: Increasing cumulative episode counts at which agreement is measured.
+        env_factory: Callable returning a fresh environment per agent.
+        writer: Optional metrics writer (see open_writer) receiving every row.
+        seed: Root seed of every agent's shoe and exploration streams; None leaves them unseeded.
+    Returns:
+        list: One dict per (agent, checkpoint) with the episodes, Q-table rows, agreement,
+        weighted agreement, mean training reward and training seconds so far.
+    """
+    states = starting_states()
+    rows = []
+    for number, (name, factory) in enumerate(agent_factories.items()):
+        env, agent = env_factory(), factory()
+        if seed is not None:
+            env.seed(child_seed(seed, number, STREAMS["env"]))
+            agent.seed(child_seed(seed, number, STREAMS["agent"]))
+        metrics = TrainingMetrics(log_every=float("inf"), verbose=False)
+        trained = 0
+        for checkpoint in checkpoints:
+            train_agent(env, agent, episodes=checkpoint - trained, metrics=metrics)
+            trained = checkpoint
+            agreement, weighted = policy_agreement(agent, states=states)
+            row = {
+                "agent": name,
+                "episode": trained,
+                "table_rows": agent.q_table.values.shape[0],
+                "agreement": agreement,
+                "weighted_agreement": weighted,
+                "mean_reward": metrics.rewards.mean,
+                "seconds": time.perf_counter() - metrics.start_time,
+            }
+            rows.append(row)
+            if writer is not None:
+                writer.write(row)
+    return rows
+
+
+def episodes_to_match(rows, reference):
+    """
+    Sample efficiency of every agent of a convergence_report against a reference agent.
+    Args:
+        rows: Output of convergence_report.
+        reference: Name of the agent whose final weighted agreement is the target.
+    Returns:
+        dict: Agent name -> first checkpoint at which its weighted agreement reached the
+        target, or None if it never did.
+    """
+    target = [row for row in rows if row["agent"] == reference][-1]["weighted_agreement"]
+    matched = {}
+    for row in rows:
+        matched.setdefault(row["agent"], None)
+        if matched[row["agent"]] is None and row["weighted_agreement"] >= target:
+            matched[row["agent"]] = row["episode"]
+    return matched
+
+
+def default_agents(state_indexes=("cards",)):
+    """
+    The current Q-learning setup of main.py against episode-batched learners with visit-count rates.
+    Args:
+        state_indexes: State index names to build every agent with; with more than one, each
+            agent name gets a "/<index>" suffix so the table sizes can be compared.
+    """
+    actions = [0, 1, 2, 3]
+    agents = {}
+    for index in state_indexes:
+        suffix = f"/{index}" if len(state_indexes) > 1 else ""
+        agents.update({
+            "q_learning" + suffix: lambda index=index: QLearningAgent(actions=actions, alpha=0.7, gamma=1.0,
+                                                                      epsilon=1.0, state_index=index),
+            "q_lambda_0" + suffix: lambda index=index: QLambdaAgent(actions=actions, lam=0.0, state_index=index),
+            "q_lambda_0.5" + suffix: lambda index=index: QLambdaAgent(actions=actions, lam=0.5, state_index=index),
+            "monte_carlo" + suffix: lambda index=index: QLambdaAgent(actions=actions, lam=1.0, state_index=index),
+        })
+    return agents
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Policy agreement with basic strategy versus training episodes.")
+    parser.add_argument("--checkpoints", type=int, nargs="+", default=[10000, 30000, 100000, 300000, 1000000])
+    parser.add_argument("--output", help="Write the rows to this JSON file.")
+    parser.add_argument("--seed", type=int, help="Root seed, for a reproducible report.")
+    parser.add_argument("--state-index", nargs="+", choices=sorted(STATE_INDEXES), default=["cards"],
+                        help="Q-table indexes to train every agent with, e.g. cards canonical to compare them.")
+    args = parser.parse_args(argv)
+
+    rows = convergence_report(default_agents(args.state_index), sorted(args.checkpoints), seed=args.seed)
+    for row in rows:
+        print(f"{row['agent']:>24} {row['episode']:>9} episodes, {row['table_rows']:>6} rows: "
+              f"agreement {row['agreement']:.3f} "
+              f"(weighted {row['weighted_agreement']:.3f}), mean reward {row['mean_reward']:.3f}")
+    reference = next(iter(default_agents(args.state_index)))
+    target = [row for row in rows if row["agent"] == reference][-1]
+    print(f"\nEpisodes to reach {reference}'s weighted agreement of {target['weighted_agreement']:.3f} "
+          f"after {target['episode']} episodes:")
+    for name, episodes in episodes_to_match(rows, reference).items():
+        print(f"{name:>24} {episodes if episodes is not None else 'not reached':>11}")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(rows, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+import math
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+from blackjack.custom_env import CustomBlackjackEnv
+from blackjack.shoe import Shoe
+from blackjack.strategy import hand_category, MAX_TOTAL
+
+CATEGORY_NAMES = ("hard", "soft", "pair")
+CHUNK_EPISODES = 50000
+Z_95 = 1.959964
+
+# Per-bucket totals: bucket shape is (category, total or pair rank, dealer card)
+_BUCKETS = (3, MAX_TOTAL + 1, 11)
+COUNT, SUM, SUM_SQ, DIFF_SUM, DIFF_SUM_SQ = range(5)
+
+_worker_state = {}
+
+
+def greedy_policy(agent):
+    """
+    Deterministic policy function ``(player_total, dealer_card, usable_ace, player_cards) -> action``.
+    Agents with a Q-table play greedily; any other agent is asked for its choose_action.
+    """
+    if hasattr(agent, "q_table"):
+        return lambda state: agent.q_table.greedy_action(agent.state_representation(*state))
+    return agent.choose_action
+
+
+def _play(env, policy):
+    """Play one round greedily and return its total reward and starting-hand bucket."""
+    obs = env.reset()
+    category, index = hand_category(obs[0], obs[2], env.player)
+    bucket = (category, min(index, MAX_TOTAL), obs[1])
+    done = False
+    total_reward = 0
+    while not done:
+        # env.player is a Hand: policies read its incremental key and totals directly
+        obs, reward, done, _ = env.step(policy((obs[0], obs[1], obs[2], env.player)))
+        total_reward += reward
+    return total_reward, bucket
+
+
+def _init_worker(agents, env_factory):
+    _worker_state["policies"] = [greedy_policy(agent) for agent in agents]
+    _worker_state["env_factory"] = env_factory
+
+
+def _evaluate_chunk(task):
+    """Play ``episodes`` rounds per agent on shared shoes and return the per-bucket totals."""
+    seed, episodes = task
+    policies = _worker_state["policies"]
+    env = _worker_state["env_factory"]()
+    env.shoe = Shoe(env.deck_count, rng=np.random.default_rng(seed))
+
+    totals = np.zeros((5, len(policies)) + _BUCKETS)
+    rewards = [0] * len(policies)
+    for _ in range(episodes):
+        # Every agent starts the round from the same shoe, so they draw the same cards while their actions agree
+        snapshot = env.shoe.checkpoint()  # Shares the card lists instead of copying them every round
+        for agent_id, policy in enumerate(policies):
+            env.shoe.restore(snapshot)
+            env.player_hands = []
+            env.current_hand_index = 0
+            rewards[agent_id], start = _play(env, policy)
+
+        bucket = (slice(None),) + start
+        values = np.array(rewards, dtype=np.float64)
+        diffs = values - values[0]
+        totals[COUNT][bucket] += 1
+        totals[SUM][bucket] += values
+        totals[SUM_SQ][bucket] += values * values
+        totals[DIFF_SUM][bucket] += diffs
+        totals[DIFF_SUM_SQ][bucket] += diffs * diffs
+    return totals
+
+
+def _interval(count, total, total_sq):
+    """Mean, standard error and 95% confidence interval from a sample count, sum and sum of squares."""
+    count = float(count)
+    if count == 0:
+        return {"hands": 0, "mean": math.nan, "stderr": math.nan, "ci95": (math.nan, math.nan)}
+    mean = total / count
+    variance = max(0.0, total_sq - total * mean) / (count - 1) if count > 1 else 0.0
+    stderr = math.sqrt(variance / count)
+    return {"hands": int(count), "mean": mean, "stderr": stderr,
+            "ci95": (mean - Z_95 * stderr, mean + Z_95 * stderr)}
+
+
+def evaluate_agents_crn(agents, episodes=1000000, workers=None, seed=None, env_factory=CustomBlackjackEnv):
+    """
+    Compare agents on common random numbers.
+
+    Every round is played once per agent from the same checkpoint of the shoe
+    (its cards and the generator of its next shuffle), so all agents are dealt
+    the same starting hand and draw the same cards for as long as they take
+    the same actions. Paired
+    differences against the first agent cancel most of the card noise, so
+    their confidence intervals are far narrower than those of two independent
+    runs. Rounds are split into fixed-size chunks with seeds spawned from
+    ``seed`` and fanned out over a process pool; the result depends only on
+    ``seed`` and ``episodes``, not on the number of workers.
+
+    Args:
+        agents: Dict of name -> agent, played greedily (see greedy_policy). The first one is the baseline.
+        episodes: Rounds played by every agent.
+        workers: Number of worker processes (defaults to the CPU count; 1 plays in this process).
+        seed: Root seed of the chunk seeds.
+        env_factory: Callable returning a fresh CustomBlackjackEnv-like environment in each worker.
+    Returns:
+        dict: ``agents`` (name -> mean, stderr, ci95), ``differences`` (name -> the same for
+        the agent minus the baseline), ``buckets`` (name -> {(category, total or pair rank,
+        dealer card): stats}) and the run's episodes, seconds and episodes_per_sec.
+    """
+    names = list(agents)
+    workers = workers or os.cpu_count()
+    chunks = [CHUNK_EPISODES] * (episodes // CHUNK_EPISODES)
+    if episodes % CHUNK_EPISODES:
+        chunks.append(episodes % CHUNK_EPISODES)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    tasks = list(zip(seeds, chunks))
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker([agents[name] for name in names], env_factory)
+        parts = [_evaluate_chunk(task) for task in tasks]
+    else:
+        with mp.get_context().Pool(workers, initializer=_init_worker,
+                                   initargs=([agents[name] for name in names], env_factory)) as pool:
+            parts = pool.map(_evaluate_chunk, tasks)
+    totals = np.sum(parts, axis=0)
+    elapsed = time.perf_counter() - start
+
+    overall = totals.reshape(5, len(names), -1).sum(axis=2)
+    report = {
+        "episodes": episodes,
+        "seconds": elapsed,
+        "episodes_per_sec": episodes * len(names) / elapsed,
+        "agents": {},
+        "differences": {},
+        "buckets": {},
+    }
+    for agent_id, name in enumerate(names):
+        report["agents"][name] = _interval(overall[COUNT, agent_id], overall[SUM, agent_id], overall[SUM_SQ, agent_id])
+        if agent_id:
+            report["differences"][name] = _interval(overall[COUNT, agent_id], overall[DIFF_SUM, agent_id],
+                                                    overall[DIFF_SUM_SQ, agent_id])
+        report["buckets"][name] = {
+            (CATEGORY_NAMES[category], int(index), int(dealer_card)):
+                _interval(*totals[[COUNT, SUM, SUM_SQ], agent_id, category, index, dealer_card])
+            for category, index, dealer_card in zip(*np.nonzero(totals[COUNT, agent_id]))
+        }
+    return report
+
+
+def print_crn_report(report):
+    """Print the per-agent EVs and the paired differences (against the first agent) of an evaluate_agents_crn report."""
+    print(f"\nCommon-random-number evaluation: {report['episodes']} rounds per agent "
+          f"({report['episodes_per_sec']:.0f} rounds/sec)")
+    for name, stats in report["agents"].items():
+        low, high = stats["ci95"]
+        print(f"{name}: mean {stats['mean']:.4f} ± {stats['stderr']:.4f} (95% CI {low:.4f} to {high:.4f})")
+    baseline = next(iter(report["agents"]))
+    for name, stats in report["differences"].items():
+        low, high = stats["ci95"]
+        print(f"{name} - {baseline}: {stats['mean']:.4f} (95% CI {low:.4f} to {high:.4f})")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+import numpy as np
+
+from agent.policy import encode_states
+from blackjack.batched_env import BatchedBlackjackEnv
+from .metrics import TrainingMetrics
+
+
+def _features(env, agent):
+    counts = env.count_observation() if agent.count_features else None
+    return encode_states(env.strategy_states(), counts)
+
+
+def train_dqn(agent, env=None, steps=20000, warmup=10000, updates_per_step=1, metrics=None):
+    """
+    Train a DQNAgent on a BatchedBlackjackEnv.
+
+    Every env step acts on all tables at once and stores one transition per
+    table that was still playing; finished tables are reset immediately, so
+    the network always learns from full-size minibatches.
+
+    Args:
+        agent: DQNAgent to train in place.
+        env: BatchedBlackjackEnv (1024 tables by default).
+        steps: Number of batched env steps.
+        warmup: Transitions collected before the first gradient step.
+        updates_per_step: Gradient steps per env step.
+        metrics: TrainingMetrics receiving the reward of every finished round (a printing one by default).
+    Returns:
+        TrainingMetrics: Streaming statistics of the run.
+    """
+    if env is None:
+        env = BatchedBlackjackEnv()
+    if metrics is None:
+        metrics = TrainingMetrics()
+    env.reset()
+    features = _features(env, agent)
+    round_rewards = np.zeros(env.num_envs)
+
+    for _ in range(steps):
+        actions = agent.act(features)
+        _, rewards, dones, _ = env.step(actions)
+        next_features = _features(env, agent)
+        agent.observe(features, actions, rewards, next_features, dones)
+
+        round_rewards += rewards
+        if dones.any():
+            finished = round_rewards[dones]
+            metrics.record_batch(len(finished), finished.sum(), (finished * finished).sum(),
+                                 int((finished > 0).sum()), int((finished < 0).sum()), int((finished == 0).sum()))
+            metrics.maybe_log(agent)
+            round_rewards[dones] = 0
+            env.reset(dones)
+            next_features = _features(env, agent)
+        features = next_features
+
+        if len(agent.buffer) >= warmup:
+            for _ in range(updates_per_step):
+                agent.learn()
+    return metrics
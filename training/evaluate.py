@@ -8,16 +8,16 @@ def evaluate_agents(env, q_agent, basic_agent, episodes=1000):
         # Evaluate Q-Learning Agent
         env.reset()
         obs = env._get_obs()
-        player_total, dealer_card, usable_ace = obs
+        player_total, dealer_card, usable_ace = obs[:3]  # Count features, if any, follow
         player_cards = env.player
         q_state = q_agent.state_representation(player_total, dealer_card, usable_ace, player_cards)
         done = False
         q_total_reward = 0
 
         while not done:
-            action = np.argmax(q_agent.q_table[q_state])  # Q-Agent's action
+            action = q_agent.q_table.greedy_action(q_state)  # Q-Agent's action
             obs, reward, done, _ = env.step(action)
-            player_total, dealer_card, usable_ace = obs
+            player_total, dealer_card, usable_ace = obs[:3]
             player_cards = env.player
             q_state = q_agent.state_representation(player_total, dealer_card, usable_ace, player_cards)
             q_total_reward += reward
@@ -27,7 +27,7 @@ def evaluate_agents(env, q_agent, basic_agent, episodes=1000):
         # Evaluate Basic Strategy Agent
         env.reset()
         obs = env._get_obs()
-        player_total, dealer_card, usable_ace = obs
+        player_total, dealer_card, usable_ace = obs[:3]
         player_cards = env.player
         b_state = (player_total, dealer_card, usable_ace, tuple(sorted(player_cards)))
         done = False
@@ -36,7 +36,7 @@ def evaluate_agents(env, q_agent, basic_agent, episodes=1000):
         while not done:
             action = basic_agent.choose_action(b_state)  # Basic strategy action
             obs, reward, done, _ = env.step(action)
-            player_total, dealer_card, usable_ace = obs
+            player_total, dealer_card, usable_ace = obs[:3]
             player_cards = env.player
             b_state = (player_total, dealer_card, usable_ace, tuple(sorted(player_cards)))
             b_total_reward += reward
@@ -51,6 +51,72 @@ def evaluate_agents(env, q_agent, basic_agent, episodes=1000):
     print(f"Basic Strategy Agent Average Reward: {basic_avg_reward}")
     return q_avg_reward, basic_avg_reward
 
+def evaluate_agent_batched(env, agent, episodes=1000000):
+    """
+    Average reward per round of an agent with a choose_actions method on a BatchedBlackjackEnv.
+    Args:
+        env: BatchedBlackjackEnv; up to env.num_envs rounds are played at once.
+        agent: Agent whose choose_actions maps env.strategy_states() to actions.
+        episodes: Number of rounds to play.
+    Returns:
+        float: Mean reward per round.
+    """
+    total_reward = 0.0
+    played = 0
+    while played < episodes:
+        batch = min(env.num_envs, episodes - played)
+        env.reset(np.arange(env.num_envs) < batch)
+        while not env.done.all():
+            _, rewards, _, _ = env.step(agent.choose_actions(env.strategy_states()))
+            total_reward += rewards.sum()
+        played += batch
+    return total_reward / played
+
+def evaluate_agent_expected(agent, episodes=100000, env=None, dealer=None):
+    """
+    Average reward per round with every stand and double valued by its expected reward.
+    Rounds are played out in a CustomBlackjackEnv, but the dealer's realised hand is not
+    scored: a finished hand is scored against the dealer outcome distribution of its
+    upcard and the shoe composition at the time of the decision. Busts and illegal actions
+    keep their realised rewards.
+    Args:
+        agent: Agent with a choose_action(state) method, or a Q-learning agent (played greedily).
+        episodes: Number of rounds to play.
+        env: CustomBlackjackEnv to play in (a new default one when None).
+        dealer: DealerOutcomeCache shared across calls (a new one with the env's rules when None).
+    Returns:
+        tuple: (mean reward per round, standard error of the mean).
+    """
+    from blackjack.custom_env import CustomBlackjackEnv
+    from blackjack.dealer import DealerOutcomeCache
+    from training.crn import greedy_policy
+    env = env or CustomBlackjackEnv()
+    dealer = dealer or DealerOutcomeCache(env.rules, resolution=50)
+    policy = greedy_policy(agent)
+    rewards = np.zeros(episodes)
+    for episode in range(episodes):
+        obs, done = env.reset(), False
+        total_reward = 0.0
+        while not done:
+            hand = env.player
+            action = policy((obs[0], obs[1], obs[2], hand))
+            if action in (0, 2):
+                # The shoe the dealer draws from, with cards it drew for earlier split hands put back
+                counts = env.shoe.rank_counts[1:]
+                for card in env.dealer[1:]:
+                    counts[card - 1] += 1
+                cards_before = len(hand)
+            # Stands still go through step, so the round ends as in play (dealer draws, reshuffle check, done)
+            obs, reward, done, _ = env.step(action)
+            if action == 0:
+                reward = dealer.stand_reward(hand.total, dealer.distribution(env.dealer[0], counts), hand.is_natural)
+            elif action == 2 and len(hand) > cards_before:
+                counts[hand[-1] - 1] -= 1
+                reward = 2 * dealer.stand_reward(hand.total, dealer.distribution(env.dealer[0], counts))
+            total_reward += reward
+        rewards[episode] = total_reward
+    return rewards.mean(), rewards.std() / np.sqrt(episodes)
+
 import random
 
 def evaluate_and_compare_agents(env, q_agent, basic_agent, num_tests=1000):
@@ -59,7 +125,7 @@ def evaluate_and_compare_agents(env, q_agent, basic_agent, num_tests=1000):
     Args:
         env: The environment.
         q_agent: The trained Q-Learning agent.
-        basic_agent: The rule-based Basic Strategy agent.
+        basic_agent: The reference agent, e.g. BasicStrategyAgent or OptimalStrategyAgent.
         num_tests: Number of random states to evaluate.
 
     Returns:
@@ -73,12 +139,12 @@ def evaluate_and_compare_agents(env, q_agent, basic_agent, num_tests=1000):
     for _ in range(num_tests):
         # Generate a random test state
         env.reset()
-        player_total, dealer_card, usable_ace = env._get_obs()
+        player_total, dealer_card, usable_ace = env._get_obs()[:3]  # Count features, if any, follow
         player_cards = env.player
         state = (player_total, dealer_card, usable_ace, tuple(sorted(player_cards)))
 
         # Get actions from both agents
-        q_action = np.argmax(q_agent.q_table[q_agent.state_representation(*state)])
+        q_action = q_agent.q_table.greedy_action(q_agent.state_representation(*state))
         basic_action = basic_agent.choose_action(state)
 
         # Compare actions
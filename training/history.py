@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import json
+import os
+
+import numpy as np
+
+from blackjack.custom_env import CustomBlackjackEnv
+from blackjack.rules import Rules
+from .crn import greedy_policy
+
+PLAYER, DEALER = 0, 1  # Owner of a drawn card
+LOOKAHEAD = 10  # Cards after the round kept for replays that draw more than the recorded play did
+
+
+class HandHistoryRecorder:
+    """
+    Append-only log of every round an env plays, in compressed columnar chunks.
+
+    attach() shadows the env's reset, step, draw_card, play_dealer_hand and
+    reset_shoe with recording wrappers on that instance, like
+    training.profiling.Profiler, so training and evaluation loops record
+    without any change. Each round keeps its cards in draw order with their
+    owner (player or dealer), the actions taken, the total reward, the shoe
+    position it started at and the next ``lookahead`` cards of the shoe it
+    was dealt from (taken before a reshuffle at the end of the round, so
+    they are the cards the round would have drawn next). Rounds are
+    buffered in memory and written ``chunk_size`` at a time as
+    ``chunk-<n>.npz`` files next to a ``meta.json`` with the table rules; a
+    chunk is written to a temporary file first, so readers never see half
+    of one. Appending to a history recorded under other rules is refused.
+    """
+
+    def __init__(self, path, chunk_size=65536, lookahead=LOOKAHEAD):
+        """
+        Args:
+            path: Directory of the history; new chunks are appended after existing ones.
+            chunk_size: Rounds buffered before a chunk is written (bounds the memory used).
+            lookahead: Undealt cards kept per round (see rescore_history).
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.lookahead = lookahead
+        os.makedirs(path, exist_ok=True)
+        chunks = _chunk_names(path)
+        self.chunks = len(chunks)
+        self.rounds = 0
+        if chunks:
+            with np.load(chunks[-1]) as last:
+                self.rounds = int(last["round"][-1]) + 1
+        self.env = None
+        # Flat columns of the buffered rounds; a round's cards and actions run to the next round's start
+        self._columns = {"round": [], "shoe_position": [], "reward": [], "done": [], "lookahead": [],
+                         "cards": [], "card_owner": [], "card_starts": [], "actions": [], "action_starts": []}
+        self._open = False
+        self._reward = 0
+        self._reshuffled = None  # (cards recorded, lookahead) at the last reshuffle of the round in play
+
+    def attach(self, env):
+        """
+        Record every round ``env`` plays until detach().
+        Raises:
+            ValueError: If the history was recorded under different rules or lookahead.
+        """
+        meta_path = os.path.join(self.path, "meta.json")
+        meta = json.loads(json.dumps({"rules": env.rules.settings(), "lookahead": self.lookahead}))
+        if os.path.exists(meta_path):
+            with open(meta_path) as file:
+                recorded = json.load(file)
+            if recorded != meta:
+                raise ValueError(f"History at {self.path} was recorded with {recorded}, not {meta}")
+        else:
+            with open(meta_path, "w") as file:
+                json.dump(meta, file)
+        self.env = env
+        reset, step, draw_card, play_dealer_hand = env.reset, env.step, env.draw_card, env.play_dealer_hand
+        reset_shoe = env.reset_shoe
+        columns = self._columns
+        add_card, add_owner, add_action = columns["cards"].append, columns["card_owner"].append, columns["actions"].append
+        owner = [PLAYER]
+
+        def recorded_reset(*args, **kwargs):
+            self._finish()
+            self._open, self._reward = True, 0
+            columns["shoe_position"].append(env.shoe.cursor)
+            columns["card_starts"].append(len(columns["cards"]))
+            columns["action_starts"].append(len(columns["actions"]))
+            obs = reset(*args, **kwargs)
+            columns["card_owner"][columns["card_starts"][-1] + 1] = DEALER  # Dealt player, dealer, player
+            return obs
+
+        def recorded_step(action):
+            result = step(action)
+            if self._open:
+                add_action(action)
+                self._reward += result[1]
+                if result[2]:
+                    self._finish(done=True)
+            return result
+
+        def recorded_draw_card():
+            card = draw_card()
+            if self._open:
+                add_card(card)
+                add_owner(owner[0])
+            return card
+
+        def recorded_play_dealer_hand():
+            owner[0] = DEALER
+            try:
+                return play_dealer_hand()
+            finally:
+                owner[0] = PLAYER
+
+        def recorded_reset_shoe():
+            if self._open:
+                self._reshuffled = (len(columns["cards"]), env.shoe.peek(self.lookahead))
+            return reset_shoe()
+
+        env.reset, env.step, env.draw_card = recorded_reset, recorded_step, recorded_draw_card
+        env.play_dealer_hand, env.reset_shoe = recorded_play_dealer_hand, recorded_reset_shoe
+        return self
+
+    def detach(self):
+        """Record the round in play, write the buffered rounds and restore the env's own methods."""
+        self._finish()
+        self.flush()
+        if self.env is not None:
+            for method in ("reset", "step", "draw_card", "play_dealer_hand", "reset_shoe"):
+                delattr(self.env, method)
+            self.env = None
+
+    close = detach
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.detach()
+
+    def _finish(self, done=False):
+        """Move the round in play (if any) into the buffer."""
+        if not self._open:
+            return
+        self._open = False
+        columns = self._columns
+        columns["round"].append(self.rounds)
+        columns["reward"].append(self._reward)
+        columns["done"].append(done)
+        if self._reshuffled is not None and self._reshuffled[0] == len(columns["cards"]):
+            upcoming = self._reshuffled[1]  # Reshuffled as the round ended: keep the old shoe's next cards
+        else:
+            upcoming = self.env.shoe.peek(self.lookahead)
+        self._reshuffled = None
+        columns["lookahead"].append(upcoming + [0] * (self.lookahead - len(upcoming)))  # 0 marks the end of the shoe
+        self.rounds += 1
+        if len(columns["round"]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rounds as the next chunk (between rounds: detach() finishes the one in play)."""
+        columns = self._columns
+        if not columns["round"]:
+            return
+        arrays = {
+            "round": np.array(columns["round"], dtype=np.int64),
+            "shoe_position": np.array(columns["shoe_position"], dtype=np.int32),
+            "reward": np.array(columns["reward"], dtype=np.float32),
+            "done": np.array(columns["done"], dtype=bool),
+            "lookahead": np.array(columns["lookahead"], dtype=np.int8).reshape(-1, self.lookahead),
+            "cards": np.array(columns["cards"], dtype=np.int8),
+            "card_owner": np.array(columns["card_owner"], dtype=np.int8),
+            "card_offsets": np.array(columns["card_starts"] + [len(columns["cards"])], dtype=np.int64),
+            "actions": np.array(columns["actions"], dtype=np.int8),
+            "action_offsets": np.array(columns["action_starts"] + [len(columns["actions"])], dtype=np.int64),
+        }
+        name = os.path.join(self.path, f"chunk-{self.chunks:06d}.npz")
+        staging = name + ".tmp.npz"
+        np.savez_compressed(staging, **arrays)
+        os.replace(staging, name)
+        self.chunks += 1
+        for column in columns.values():
+            column.clear()  # In place: the env's wrappers hold the list methods
+
+
+def _chunk_names(path):
+    return sorted(name for name in glob.glob(os.path.join(path, "chunk-*.npz")) if not name.endswith(".tmp.npz"))
+
+
+def iter_chunks(path):
+    """Yield every chunk of a history as a dict of columns, oldest first."""
+    for name in _chunk_names(path):
+        with np.load(name) as chunk:
+            yield {key: chunk[key] for key in chunk.files}
+
+
+def iter_rounds(path):
+    """
+    Yield every recorded round of a history.
+    Returns:
+        Iterator of dicts with the round number, shoe_position, reward, done, cards (in draw order),
+        card_owner (PLAYER or DEALER per card), actions and lookahead (undealt cards, 0-padded).
+    """
+    for chunk in iter_chunks(path):
+        cards, owners, card_offsets = chunk["cards"].tolist(), chunk["card_owner"].tolist(), chunk["card_offsets"]
+        actions, action_offsets = chunk["actions"].tolist(), chunk["action_offsets"]
+        for index in range(len(chunk["round"])):
+            card_start, card_end = card_offsets[index], card_offsets[index + 1]
+            action_start, action_end = action_offsets[index], action_offsets[index + 1]
+            yield {
+                "round": int(chunk["round"][index]),
+                "shoe_position": int(chunk["shoe_position"][index]),
+                "reward": float(chunk["reward"][index]),
+                "done": bool(chunk["done"][index]),
+                "cards": cards[card_start:card_end],
+                "card_owner": owners[card_start:card_end],
+                "actions": actions[action_start:action_end],
+                "lookahead": [card for card in chunk["lookahead"][index].tolist() if card],
+            }
+
+
+def load_rules(path):
+    """Rules the history was recorded under."""
+    with open(os.path.join(path, "meta.json")) as file:
+        return Rules(**json.load(file)["rules"])
+
+
+class _ScriptedShoe:
+    """Shoe that deals a given list of cards and never reshuffles; running out raises _OutOfCards."""
+
+    remaining = size = float("inf")  # Never due for a reshuffle
+
+    def __init__(self):
+        self._cards, self.cursor = [], 0
+        self.rank_counts = [0] * 11
+        self.running_count = 0
+
+    def load(self, cards):
+        self._cards, self.cursor = cards, 0
+
+    def draw(self):
+        if self.cursor == len(self._cards):
+            raise _OutOfCards
+        card = self._cards[self.cursor]
+        self.cursor += 1
+        return card
+
+    def shuffle(self):
+        pass
+
+    def peek(self, count):
+        return self._cards[self.cursor:self.cursor + count]
+
+    def observation(self):
+        return 0, 0.0, 0.0
+
+
+class _OutOfCards(Exception):
+    pass
+
+
+def rescore_history(path, agent, rules=None):
+    """
+    Score a recorded history against another agent, offline.
+
+    Every round is replayed on its recorded cards, followed by the lookahead,
+    with the agent choosing the actions (greedily for Q-table agents); no new
+    cards are sampled. Where the agent plays as recorded it reproduces the
+    recorded reward exactly. A round whose replay needs more cards than were
+    kept is unresolved and left out of the rewards.
+
+    Args:
+        path: History directory written by HandHistoryRecorder.
+        agent: Agent to score (see training.crn.greedy_policy).
+        rules: Rules of the replay (the recorded ones by default).
+    Returns:
+        dict: Rounds, resolved rounds, the agent's decision agreement with the recorded
+        actions (up to the first difference in each round), rounds played identically,
+        and the mean recorded and replayed rewards over the resolved rounds.
+    """
+    policy = greedy_policy(agent)
+    env = CustomBlackjackEnv(rules=rules or load_rules(path), seed=0)
+    shoe = env.shoe = _ScriptedShoe()
+    rounds = resolved = identical = decisions = agreed = 0
+    recorded_total = replayed_total = 0.0
+    for recorded in iter_rounds(path):
+        rounds += 1
+        if not recorded["done"]:
+            continue
+        shoe.load(recorded["cards"] + recorded["lookahead"])
+        recorded_actions = recorded["actions"]
+        same_path, reward, step = True, 0, 0
+        try:
+            obs, done = env.reset(), False
+            while not done:
+                action = policy((obs[0], obs[1], obs[2], env.player))
+                if same_path:
+                    decisions += 1
+                    same_path = step < len(recorded_actions) and action == recorded_actions[step]
+                    agreed += same_path
+                obs, step_reward, done, _ = env.step(action)
+                reward += step_reward
+                step += 1
+        except _OutOfCards:
+            continue
+        resolved += 1
+        identical += same_path and step == len(recorded_actions)
+        recorded_total += recorded["reward"]
+        replayed_total += reward
+    return {
+        "rounds": rounds,
+        "resolved": resolved,
+        "decision_agreement": agreed / decisions if decisions else 0.0,
+        "identical_rounds": identical,
+        "recorded_reward": recorded_total / resolved if resolved else 0.0,
+        "replayed_reward": replayed_total / resolved if resolved else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise a hand history or re-score it against another agent.")
+    parser.add_argument("history", help="History directory written by HandHistoryRecorder.")
+    parser.add_argument("--checkpoint", help="Re-score against this Q-table checkpoint (basic strategy if omitted).")
+    args = parser.parse_args(argv)
+
+    if args.checkpoint:
+        from .checkpoint import load_checkpoint
+        agent, _ = load_checkpoint(args.checkpoint, mmap=True, restore_rng=False)
+    else:
+        from agent import BasicStrategyAgent
+        agent = BasicStrategyAgent()
+    report = rescore_history(args.history, agent)
+    print(f"{report['rounds']} rounds, {report['resolved']} replayed on their recorded cards")
+    print(f"Decision agreement {report['decision_agreement']:.1%}, {report['identical_rounds']} rounds played identically")
+    print(f"Mean reward recorded {report['recorded_reward']:.4f}, replayed {report['replayed_reward']:.4f}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,201 @@
 #!/usr/bin/env python3
+import csv
+import json
+import math
+import os
+import time
+
+
+class RunningStats:
+    """Streaming mean and variance (Welford), mergeable with batches of samples."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value):
+        """Add one sample."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def update_batch(self, count, total, total_sq):
+        """Add ``count`` samples given only their sum and sum of squares."""
+        if not count:
+            return
+        batch_mean = total / count
+        batch_m2 = max(0.0, total_sq - total * batch_mean)
+        merged = self.count + count
+        delta = batch_mean - self.mean
+        self.mean += delta * count / merged
+        self._m2 += batch_m2 + delta * delta * self.count * count / merged
+        self.count = merged
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class CsvWriter:
+    """Append metric rows to a CSV file; the header comes from the first row."""
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self._writer = None
+
+    def write(self, row):
+        if self._writer is None:
+            self._writer = csv.DictWriter(self.file, fieldnames=list(row))
+            self._writer.writeheader()
+        self._writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlWriter:
+    """Append metric rows to a JSON-lines file."""
+
+    def __init__(self, path):
+        self.file = open(path, "w")
+
+    def write(self, row):
+        self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class TensorBoardWriter:
+    """Write every numeric metric as a TensorBoard scalar keyed by episode."""
+
+    def __init__(self, log_dir):
+        try:
+            from torch.utils.tensorboard import SummaryWriter
+        except ImportError as error:
+            raise ImportError("TensorBoard logging needs torch and tensorboard installed.") from error
+        self._writer = SummaryWriter(log_dir)
+
+    def write(self, row):
+        for key, value in row.items():
+            if key != "episode" and value is not None:
+                self._writer.add_scalar(key, value, row["episode"])
+
+    def close(self):
+        self._writer.close()
+
+
+def open_writer(path, fmt=None):
+    """
+    Open a metrics writer.
+    Args:
+        path: File to write (or log directory for TensorBoard); parent directories are created.
+        fmt: "csv", "jsonl" or "tensorboard"; inferred from the file extension when omitted.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".") or "tensorboard"
+    if fmt == "tensorboard":
+        return TensorBoardWriter(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if fmt == "csv":
+        return CsvWriter(path)
+    if fmt == "jsonl":
+        return JsonlWriter(path)
+    raise ValueError(f"Unknown metrics format: {fmt}")
+
+
+class TrainingMetrics:
+    """
+    Constant-memory training statistics.
+
+    Keeps a running mean/std of episode rewards, win/loss/push rates over the
+    episodes since the last log, and reports them together with the agent's
+    epsilon/alpha and the throughput every ``log_every`` episodes.
+    """
+
+    def __init__(self, log_every=100000, writer=None, verbose=True):
+        """
+        Args:
+            log_every: Episodes between two logged rows.
+            writer: Optional CsvWriter/JsonlWriter/TensorBoardWriter receiving every row.
+            verbose: Print a one-line summary with every row.
+        """
+        self.log_every = log_every
+        self.writer = writer
+        self.verbose = verbose
+        self.rewards = RunningStats()
+        self.outcomes = [0, 0, 0]  # Wins, losses, pushes since the last log
+        self.start_time = time.perf_counter()
+        self._last_time = self.start_time
+        self._last_episode = 0
+
+    @property
+    def episodes(self):
+        return self.rewards.count
+
+    def record(self, reward):
+        """Record the total reward of one episode."""
+        self.rewards.update(reward)
+        self.outcomes[0 if reward > 0 else 1 if reward < 0 else 2] += 1
+
+    def record_batch(self, count, total, total_sq, wins, losses, pushes):
+        """Record ``count`` episodes summarised by their reward sum, sum of squares and outcomes."""
+        self.rewards.update_batch(count, total, total_sq)
+        self.outcomes[0] += wins
+        self.outcomes[1] += losses
+        self.outcomes[2] += pushes
+
+    def maybe_log(self, agent=None):
+        """Log a row if ``log_every`` episodes have passed since the last one."""
+        if self.episodes - self._last_episode >= self.log_every:
+            return self.log(agent)
+        return None
+
+    def log(self, agent=None):
+        """Emit a row for the episodes recorded so far and start a new outcome window."""
+        now = time.perf_counter()
+        window = max(1, sum(self.outcomes))
+        row = {
+            "episode": self.episodes,
+            "mean_reward": self.rewards.mean,
+            "std_reward": self.rewards.std,
+            "win_rate": self.outcomes[0] / window,
+            "loss_rate": self.outcomes[1] / window,
+            "push_rate": self.outcomes[2] / window,
+            "epsilon": getattr(agent, "epsilon", None),
+            "alpha": getattr(agent, "alpha", None),
+            "episodes_per_sec": (self.episodes - self._last_episode) / max(now - self._last_time, 1e-9),
+        }
+        self.outcomes = [0, 0, 0]
+        self._last_time = now
+        self._last_episode = self.episodes
+        if self.writer is not None:
+            self.writer.write(row)
+        if self.verbose:
+            print(f"Episode {row['episode']} - Mean Reward: {row['mean_reward']:.4f} - "
+                  f"W/L/P: {row['win_rate']:.3f}/{row['loss_rate']:.3f}/{row['push_rate']:.3f} - "
+                  f"{row['episodes_per_sec']:.0f} episodes/sec")
+        return row
+
+    def summary(self):
+        """Totals over the whole run."""
+        elapsed = time.perf_counter() - self.start_time
+        return {
+            "episodes": self.episodes,
+            "mean_reward": self.rewards.mean,
+            "std_reward": self.rewards.std,
+            "seconds": elapsed,
+            "episodes_per_sec": self.episodes / max(elapsed, 1e-9),
+        }
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from agent import QLearningAgent
+from blackjack.custom_env import CustomBlackjackEnv
+from blackjack.rng import STREAMS, child_seed, seed_sequence
+from .checkpoint import restore_shoe, shoe_state
+from .metrics import TrainingMetrics
+from .train import play_episode, play_episode_all_actions
+
+
+def _split_rounds(episodes, workers, merge_every):
+    """Plan how many episodes each worker plays in every merge round."""
+    plan = []
+    remaining = episodes
+    while remaining > 0:
+        round_total = min(remaining, workers * merge_every)
+        base, extra = divmod(round_total, workers)
+        plan.append([base + (worker < extra) for worker in range(workers)])
+        remaining -= round_total
+    return plan
+
+
+def _attach(blocks):
+    """Map every shared-memory block described by (name, shape, dtype) onto a NumPy array."""
+    handles, arrays = [], {}
+    for key, (name, shape, dtype) in blocks.items():
+        shm = shared_memory.SharedMemory(name=name)
+        handles.append(shm)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return handles, arrays
+
+
+def _merge_slice(arrays, start, stop):
+    """Merge the shards into rows [start, stop) of the shared table, touching only rows visited this round."""
+    counts = arrays["shard_n"][:, start:stop].sum(axis=0)
+    rows = np.flatnonzero(counts.any(axis=1)) + start
+    if not len(rows):
+        return
+    counts = counts[rows - start]
+    seen = counts > 0
+    weighted = np.einsum("kij,kij->ij", arrays["shard_q"][:, rows], arrays["shard_n"][:, rows])
+    merged = arrays["global_q"][rows]
+    merged[seen] = weighted[seen] / counts[seen]
+    arrays["global_q"][rows] = merged
+    arrays["visits"][rows] += counts
+
+
+def _worker(worker_id, workers, seed, settings, blocks, plan, barrier, env_factory, all_actions, resume, states):
+    """Train a private agent copy on its own env, then merge one slice of the table after every round."""
+    handles, arrays = [], {}
+    try:
+        handles, arrays = _attach(blocks)
+        env = env_factory()
+        env.seed(child_seed(seed, worker_id, STREAMS["env"]))
+        agent = QLearningAgent(**settings, seed=child_seed(seed, worker_id, STREAMS["agent"]))
+        if resume is not None:
+            agent.rng.set_state(resume["agent_rng"])
+            restore_shoe(env.shoe, resume["shoe"])
+        table = agent.q_table
+        # Train straight into this worker's shard, so publishing it costs nothing
+        table.values, table.visits = arrays["shard_q"][worker_id], arrays["shard_n"][worker_id]
+        rows = arrays["global_q"].shape[0]
+        start, stop = rows * worker_id // workers, rows * (worker_id + 1) // workers
+        play = play_episode_all_actions if all_actions else play_episode
+
+        for round_plan in plan:
+            table.values[:] = arrays["global_q"]
+            table.visits[:] = 0
+            agent.epsilon, agent.alpha = arrays["schedule"][:2]
+            total = total_sq = 0.0
+            outcomes = [0, 0, 0]  # Wins, losses, pushes
+            for _ in range(round_plan[worker_id]):
+                reward = play(env, agent)
+                total += reward
+                total_sq += reward * reward
+                outcomes[0 if reward > 0 else 1 if reward < 0 else 2] += 1
+            arrays["stats"][worker_id] = (total, total_sq, *outcomes, table.visits.sum())
+            barrier.wait()  # Shards published
+            _merge_slice(arrays, start, stop)
+            barrier.wait()  # Merged table ready
+            if arrays["schedule"][2]:  # The parent is checkpointing this round
+                states.put((worker_id, {"agent_rng": agent.rng.get_state(), "shoe": shoe_state(env.shoe)}))
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        table = agent = None  # Drop the shard views before their buffers are closed
+        arrays.clear()
+        for shm in handles:
+            shm.close()
+
+
+def train_agent_parallel(agent, episodes=50000, workers=None, merge_every=10000, seed=None,
+                         env_factory=CustomBlackjackEnv, metrics=None, checkpointer=None, all_actions=False,
+                         worker_states=None, timeout=60.0):
+    """
+    Train a QLearningAgent with several worker processes sharing one Q-table.
+
+    Each worker owns an env, a seed and a copy of the agent. Training runs in
+    synchronous rounds: every worker plays its share of the round starting from
+    the shared table, then the table is replaced by the visit-weighted average
+    of the workers' Q-values for every (state, action) visited in the round.
+    The merge itself runs in the workers, each reducing its own slice of the
+    table's rows and skipping rows nobody visited, so the parent only sums the
+    round's statistics while they work. Epsilon and alpha decay by the total
+    number of updates across workers, as they would in train_agent. With the
+    same seed and worker count the result is identical from run to run.
+
+    Args:
+        agent: QLearningAgent whose q_table, epsilon and alpha are trained in place.
+        episodes: Total number of episodes across all workers.
+        workers: Number of worker processes (defaults to the CPU count).
+        merge_every: Episodes each worker plays between merges.
+        seed: Root seed (int or SeedSequence); each worker's shoe and exploration streams derive from it
+            (see blackjack.rng.child_seed), and nothing reads the global RNGs.
+        env_factory: Callable returning a fresh environment in each worker.
+        metrics: TrainingMetrics fed with every round's rewards (a printing one by default).
+        checkpointer: Optional Checkpointer saving the merged agent, with every worker's exploration
+            stream and shoe, between rounds and at the end.
+        all_actions: Update every action at each decision (see play_episode_all_actions).
+        worker_states: Worker states of a checkpoint (see training.checkpoint.load_worker_states) to
+            resume from instead of starting the workers' streams from ``seed``; with the same seed,
+            workers and merge_every the resumed run continues exactly as the interrupted one would have.
+        timeout: Seconds to wait for the workers' states before checking that they are still alive.
+    Returns:
+        dict: Episodes, workers, wall time, episodes/sec and mean reward per episode.
+    """
+    if metrics is None:
+        metrics = TrainingMetrics()
+    workers = workers or (len(worker_states) if worker_states else os.cpu_count())
+    if worker_states is not None and len(worker_states) != workers:
+        raise ValueError(f"Checkpoint holds {len(worker_states)} worker states, expected {workers}")
+    worker_states = worker_states or [None] * workers
+    seed = seed_sequence(seed)
+    settings = dict(actions=agent.actions, alpha=agent.alpha, gamma=agent.gamma, epsilon=agent.epsilon,
+                    epsilon_decay=agent.epsilon_decay, epsilon_min=agent.epsilon_min,
+                    alpha_decay=agent.alpha_decay, alpha_min=agent.alpha_min,
+                    state_index=agent.q_table.index.name)
+    table = agent.q_table
+    shape = table.values.shape
+    plan = _split_rounds(episodes, workers, merge_every)
+
+    specs = {
+        "global_q": (shape, np.float64),
+        "visits": (shape, np.int64),
+        "shard_q": ((workers,) + shape, np.float64),
+        "shard_n": ((workers,) + shape, np.int64),
+        "schedule": ((3,), np.float64),  # Epsilon, alpha, whether workers send their states this round
+        "stats": ((workers, 6), np.float64),  # Reward sum, sum of squares, wins, losses, pushes, updates
+    }
+    handles, blocks, arrays = [], {}, {}
+    ctx = mp.get_context()
+    processes = []
+    start = time.perf_counter()
+    try:
+        for key, (block_shape, dtype) in specs.items():
+            nbytes = int(np.prod(block_shape)) * np.dtype(dtype).itemsize
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            handles.append(shm)
+            blocks[key] = (shm.name, block_shape, np.dtype(dtype).str)
+            arrays[key] = np.ndarray(block_shape, dtype=dtype, buffer=shm.buf)
+        arrays["global_q"][:] = table.values
+        arrays["visits"][:] = table.visits
+        arrays["schedule"][:] = agent.epsilon, agent.alpha, 0
+
+        barrier = ctx.Barrier(workers + 1)
+        states = ctx.Queue()
+        processes = [
+            ctx.Process(target=_worker, args=(worker_id, workers, seed, settings, blocks, plan, barrier, env_factory,
+                                                     all_actions, worker_states[worker_id], states),
+                        daemon=True)
+            for worker_id in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        played = 0
+        saved_states = None
+        for number, round_plan in enumerate(plan, 1):
+            barrier.wait()
+            # Workers merge their slices of the table meanwhile
+            stats = arrays["stats"].sum(axis=0)
+            agent.advance_schedule(int(stats[5]))
+            played += sum(round_plan)
+            save = checkpointer is not None and (checkpointer.due(played) or number == len(plan))
+            arrays["schedule"][:] = agent.epsilon, agent.alpha, save
+            barrier.wait()
+
+            metrics.record_batch(sum(round_plan), *stats[:5])
+            metrics.maybe_log(agent)
+            if save:
+                saved_states = [None] * workers
+                while None in saved_states:
+                    try:
+                        worker_id, state = states.get(timeout=timeout)
+                    except queue.Empty:
+                        if any(not processes[worker_id].is_alive()
+                               for worker_id, state in enumerate(saved_states) if state is None):
+                            raise RuntimeError("A training worker failed; see its traceback above.") from None
+                        continue
+                    saved_states[worker_id] = state
+                table.values[:] = arrays["global_q"]
+                table.visits[:] = arrays["visits"]
+                if number < len(plan):
+                    checkpointer.save(agent, played, workers=saved_states)
+
+        for process in processes:
+            process.join()
+    except threading.BrokenBarrierError:
+        raise RuntimeError("A training worker failed; see its traceback above.") from None
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        if "global_q" in arrays:
+            table.values[:] = arrays["global_q"]
+            table.visits[:] = arrays["visits"]
+        arrays.clear()
+        for shm in handles:
+            shm.close()
+            shm.unlink()
+
+    if checkpointer is not None:
+        checkpointer.save(agent, episodes, workers=saved_states)
+    elapsed = time.perf_counter() - start
+    return {
+        "episodes": episodes,
+        "workers": workers,
+        "seconds": elapsed,
+        "episodes_per_sec": episodes / elapsed,
+        "mean_reward": metrics.rewards.mean,
+    }
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+import numpy as np
+
+from agent import BasicStrategyAgent
+from blackjack.strategy import HARD, SOFT, PAIR, hand_category
+from .convergence import starting_states
+from .metrics import open_writer
+
+ACTION_LETTERS = "SHDPR"  # Stick, Hit, Double, Split, Surrender
+CATEGORY_NAMES = {HARD: "hard", SOFT: "soft", PAIR: "pair"}
+DEALER_ORDER = (2, 3, 4, 5, 6, 7, 8, 9, 10, 1)  # Chart columns, ace last
+
+
+def policy_actions(agent, states):
+    """
+    Every state's action, queried in one batch where the agent allows it.
+    Args:
+        agent: Q-table agent (played greedily), agent with a StrategyTable (BasicStrategyAgent)
+            or any agent with choose_action(state).
+        states: List of (player_cards, dealer_card, probability) from starting_states.
+    Returns:
+        np.ndarray: One action per state.
+    """
+    hands = []
+    for cards, dealer_card, _ in states:
+        total = sum(cards)
+        usable_ace = 1 in cards and total + 10 <= 21
+        hands.append((total + 10 * usable_ace, dealer_card, usable_ace, cards))
+    if hasattr(agent, "q_table"):
+        rows = np.array([agent.state_representation(*hand) for hand in hands])
+        return agent.q_table.values[rows].argmax(axis=1)  # First action on ties, like greedy_action
+    if hasattr(agent, "table"):
+        cells = [hand_category(total, usable_ace, cards) + (dealer_card, len(cards) == 2)
+                 for total, dealer_card, usable_ace, cards in hands]
+        return np.asarray(agent.table.choose_actions(np.array(cells, dtype=np.int64)))
+    return np.array([agent.choose_action(hand) for hand in hands])
+
+
+def compare_policies(agent, reference=None, states=None):
+    """
+    Compare two policies on every two-card start, one strategy-chart cell at a time.
+
+    Starts are grouped into the cells of a strategy chart (hard total, soft total or
+    pair rank, against each dealer card) and weighted by how often they are dealt
+    from an infinite deck. An agent that tells compositions apart can play one cell
+    in several ways; the cell then shows its most likely action and the agreement
+    is the share of the cell's probability where the two policies agree.
+
+    Args:
+        agent: Agent to check (see policy_actions).
+        reference: Agent to compare with (basic strategy by default).
+        states: Output of starting_states (computed when omitted).
+    Returns:
+        dict: "cells", a list of one dict per cell (category, total, dealer_card,
+        probability, action, reference_action, agreement), and the overall
+        "agreement" (share of starts) and "weighted_agreement" (share of deal probability).
+    """
+    states = states or starting_states()
+    reference = reference or BasicStrategyAgent()
+    actions, reference_actions = policy_actions(agent, states), policy_actions(reference, states)
+
+    cells = {}
+    for (cards, dealer_card, probability), action, reference_action in zip(states, actions, reference_actions):
+        total = sum(cards)
+        usable_ace = 1 in cards and total + 10 <= 21
+        category, index = hand_category(total + 10 * usable_ace, usable_ace, cards)
+        cell = cells.setdefault((category, index, dealer_card),
+                                {"probability": 0.0, "agree": 0.0, "actions": {}, "reference_actions": {}})
+        cell["probability"] += probability
+        cell["agree"] += probability * (action == reference_action)
+        for key, value in (("actions", int(action)), ("reference_actions", int(reference_action))):
+            cell[key][value] = cell[key].get(value, 0.0) + probability
+
+    rows = []
+    for (category, index, dealer_card), cell in sorted(cells.items()):
+        rows.append({
+            "category": CATEGORY_NAMES[category],
+            "total": index,
+            "dealer_card": dealer_card,
+            "probability": cell["probability"],
+            "action": max(cell["actions"], key=cell["actions"].get),
+            "reference_action": max(cell["reference_actions"], key=cell["reference_actions"].get),
+            "agreement": cell["agree"] / cell["probability"],
+        })
+    matches = actions == reference_actions
+    weights = np.array([probability for _, _, probability in states])
+    return {"cells": rows, "agreement": float(matches.mean()),
+            "weighted_agreement": float(weights[matches].sum() / weights.sum())}
+
+
+def format_chart_diff(diff):
+    """
+    The agent's strategy charts as text, one per category.
+    A matching cell shows the agent's action letter (see ACTION_LETTERS); a cell that differs
+    shows it followed by the reference action in lower case, e.g. "Hs" for hit where the
+    reference sticks.
+    """
+    charts = {}
+    for row in diff["cells"]:
+        charts.setdefault(row["category"], {})[row["total"], row["dealer_card"]] = row
+    lines = [f"Agreement {diff['agreement']:.1%} of starts, {diff['weighted_agreement']:.1%} weighted by deal probability"]
+    for category, cells in charts.items():
+        lines.append("")
+        lines.append(f"{category:>5} " + "".join(f"{'A' if dealer == 1 else dealer:>3}" for dealer in DEALER_ORDER))
+        for total in sorted({total for total, _ in cells}):
+            label = ("A" if total == 1 else total) if category == "pair" else total
+            marks = []
+            for dealer in DEALER_ORDER:
+                row = cells[total, dealer]
+                mark = ACTION_LETTERS[row["action"]]
+                if row["action"] != row["reference_action"]:
+                    mark += ACTION_LETTERS[row["reference_action"]].lower()
+                marks.append(f"{mark:>3}")
+            lines.append(f"{label:>5} " + "".join(marks))
+    return "\n".join(lines)
+
+
+def write_chart_csv(diff, path):
+    """Write one row per chart cell (see compare_policies) to a .csv or .jsonl file."""
+    writer = open_writer(path)
+    try:
+        for row in diff["cells"]:
+            writer.write(row)
+    finally:
+        writer.close()
+
+
+def plot_chart_diff(diff, path):
+    """
+    Save the strategy charts as an image: cells are coloured by agreement with the reference
+    and labelled with the agent's action, with the reference action under it where they differ.
+    """
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError as error:
+        raise ImportError("Plotting the strategy charts needs matplotlib installed.") from error
+
+    categories = [name for name in CATEGORY_NAMES.values() if any(row["category"] == name for row in diff["cells"])]
+    figure, axes = plt.subplots(1, len(categories), figsize=(5 * len(categories), 7), squeeze=False)
+    for axis, category in zip(axes[0], categories):
+        cells = {(row["total"], row["dealer_card"]): row for row in diff["cells"] if row["category"] == category}
+        totals = sorted({total for total, _ in cells})
+        agreement = np.array([[cells[total, dealer]["agreement"] for dealer in DEALER_ORDER] for total in totals])
+        axis.imshow(agreement, cmap="RdYlGn", vmin=0, vmax=1, aspect="auto")
+        for y, total in enumerate(totals):
+            for x, dealer in enumerate(DEALER_ORDER):
+                row = cells[total, dealer]
+                label = ACTION_LETTERS[row["action"]]
+                if row["action"] != row["reference_action"]:
+                    label += "\n" + ACTION_LETTERS[row["reference_action"]].lower()
+                axis.text(x, y, label, ha="center", va="center", fontsize=8)
+        axis.set_xticks(range(len(DEALER_ORDER)), ["A" if dealer == 1 else dealer for dealer in DEALER_ORDER])
+        axis.set_yticks(range(len(totals)), [("A" if total == 1 else total) if category == "pair" else total
+                                             for total in totals])
+        axis.set_title(category)
+        axis.set_xlabel("dealer card")
+    figure.suptitle(f"Agreement {diff['agreement']:.1%} ({diff['weighted_agreement']:.1%} weighted)")
+    figure.tight_layout()
+    figure.savefig(path)
+    plt.close(figure)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Strategy-chart diff of a Q-table checkpoint against a reference policy.")
+    parser.add_argument("checkpoint", help="Checkpoint directory (see training.checkpoint).")
+    parser.add_argument("--reference", choices=("basic", "optimal"), default="basic")
+    parser.add_argument("--csv", help="Write the cells to this .csv or .jsonl file.")
+    parser.add_argument("--png", help="Save the charts to this image.")
+    args = parser.parse_args(argv)
+
+    from .checkpoint import load_checkpoint
+    agent, _ = load_checkpoint(args.checkpoint, mmap=True, restore_rng=False)
+    if args.reference == "optimal":
+        from agent import OptimalStrategyAgent
+        reference = OptimalStrategyAgent()
+    else:
+        reference = BasicStrategyAgent()
+    start = time.perf_counter()
+    diff = compare_policies(agent, reference)
+    print(format_chart_diff(diff))
+    print(f"\nCompared {len(diff['cells'])} cells in {(time.perf_counter() - start) * 1000:.0f} ms")
+    if args.csv:
+        write_chart_csv(diff, args.csv)
+    if args.png:
+        plot_chart_diff(diff, args.png)
+    return diff
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+import cProfile
+import io
+import pstats
+import time
+
+from .metrics import TrainingMetrics
+from .train import train_agent
+
+# Phase -> (owner, method) instrumented by Profiler.attach; nested phases are timed inside their parents
+PHASES = {
+    "env_reset": ("env", "reset"),
+    "env_step": ("env", "step"),
+    "dealer_play": ("env", "play_dealer_hand"),
+    "reshuffle": ("env", "reset_shoe"),
+    "state": ("agent", "state_representation"),
+    "choose_action": ("agent", "choose_action"),
+    "q_lookup": ("q_table", "greedy_action"),
+    "update": ("agent", "update"),
+}
+PARENTS = {"dealer_play": "env_step", "reshuffle": "env_step", "q_lookup": "choose_action"}
+
+
+class Profiler:
+    """
+    Opt-in per-phase timings and call counts of the training loop.
+
+    attach() shadows the instrumented methods of one env and one agent with
+    timing wrappers on those instances; detach() (or leaving the ``with``
+    block) deletes the wrappers again. Nothing in the env or the agent checks
+    for a profiler, so an unattached run pays no overhead at all. Times are
+    inclusive: a nested phase (see PARENTS) is also counted in its parent.
+    """
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.counters = {}
+        self.wall_seconds = 0.0
+        self._patched = []
+        self._start = None
+
+    def attach(self, env, agent):
+        """Instrument ``env`` and ``agent`` (and the agent's q_table, if any) until detach()."""
+        owners = {"env": env, "agent": agent, "q_table": getattr(agent, "q_table", None)}
+        for phase, (owner_name, method) in PHASES.items():
+            owner = owners[owner_name]
+            if owner is not None and hasattr(owner, method):
+                setattr(owner, method, self._timed(phase, getattr(owner, method)))
+                self._patched.append((owner, method))
+        self._start = time.perf_counter()
+        return self
+
+    def detach(self):
+        if self._start is not None:
+            self.wall_seconds += time.perf_counter() - self._start
+            self._start = None
+        for owner, method in self._patched:
+            delattr(owner, method)  # Uncovers the class's own method again
+        self._patched = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.detach()
+
+    def count(self, name, amount=1):
+        """Add to a free-form counter reported with the phases."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def _timed(self, phase, method):
+        seconds, calls, clock = self.seconds, self.calls, time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                seconds[phase] += clock() - start
+                calls[phase] += 1
+        return timed
+
+    def summary(self):
+        """
+        Returns:
+            dict: Wall seconds, counters and phase -> {calls, seconds, us_per_call, share of wall time}.
+        """
+        wall = self.wall_seconds or sum(self.seconds[phase] for phase in PHASES if phase not in PARENTS)
+        phases = {}
+        for phase in PHASES:
+            calls, seconds = self.calls[phase], self.seconds[phase]
+            if calls:
+                phases[phase] = {"calls": calls, "seconds": seconds, "us_per_call": seconds / calls * 1e6,
+                                 "share": seconds / wall if wall else 0.0}
+        return {"wall_seconds": wall, "counters": dict(self.counters), "phases": phases}
+
+    def format_summary(self):
+        """The summary as a compact text table; nested phases are indented under their parents."""
+        summary = self.summary()
+        lines = [f"{'phase':<16} {'calls':>10} {'seconds':>9} {'us/call':>9} {'share':>7}"]
+        for phase, stats in summary["phases"].items():
+            name = ("  " + phase) if phase in PARENTS else phase
+            lines.append(f"{name:<16} {stats['calls']:>10} {stats['seconds']:>9.3f} "
+                         f"{stats['us_per_call']:>9.2f} {stats['share']:>7.1%}")
+        lines.append(f"{'wall':<16} {'':>10} {summary['wall_seconds']:>9.3f}")
+        for name, value in summary["counters"].items():
+            lines.append(f"{name:<16} {value:>10}")
+        return "\n".join(lines)
+
+
+def profile_training(env, agent, episodes=100000, cprofile_path=None, top=0):
+    """
+    Train an agent with the phase profiler attached, optionally under cProfile too.
+    Args:
+        env: The environment.
+        agent: Agent with state_representation, choose_action and update.
+        episodes: Number of training episodes.
+        cprofile_path: Where to dump the cProfile statistics (readable with pstats or snakeviz), if anywhere.
+        top: Number of functions by internal time to include from cProfile (needs cprofile_path).
+    Returns:
+        tuple: (Profiler, text of the top cProfile entries or "").
+    """
+    metrics = TrainingMetrics(log_every=float("inf"), verbose=False)
+    profiler = Profiler()
+    with profiler.attach(env, agent):
+        if cprofile_path is None:
+            train_agent(env, agent, episodes=episodes, metrics=metrics)
+        else:
+            cprofiler = cProfile.Profile()
+            cprofiler.runcall(train_agent, env, agent, episodes=episodes, metrics=metrics)
+    profiler.count("episodes", episodes)
+    report = ""
+    if cprofile_path is not None:
+        cprofiler.dump_stats(cprofile_path)
+        if top:
+            stream = io.StringIO()
+            pstats.Stats(cprofiler, stream=stream).sort_stats("tottime").print_stats(top)
+            report = stream.getvalue()
+    return profiler, report
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+import argparse
+import itertools
+import math
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+from agent import QLearningAgent, BasicStrategyAgent
+from blackjack.custom_env import CustomBlackjackEnv
+from blackjack.shoe import Shoe
+from .convergence import policy_agreement
+from .evaluate import evaluate_agent_expected
+from .metrics import TrainingMetrics, open_writer
+from .train import train_agent
+
+ACTIONS = [0, 1, 2, 3]
+METRICS = ("weighted_agreement", "agreement", "ev", "ev_vs_basic")
+
+
+def grid_configs(space):
+    """
+    Every combination of a search space.
+    Args:
+        space: Dict of QLearningAgent argument -> list of values, or a single fixed value.
+    Returns:
+        list: One dict of agent arguments per combination.
+    """
+    names, choices = [], []
+    for name, values in space.items():
+        if isinstance(values, tuple):
+            raise ValueError(f"Range {values} of {name} can only be sampled; use random search or list values")
+        names.append(name)
+        choices.append(values if isinstance(values, list) else [values])
+    return [dict(zip(names, combination)) for combination in itertools.product(*choices)]
+
+
+def random_configs(space, samples, seed=None):
+    """
+    Sample configurations from a search space.
+    Args:
+        space: Dict of QLearningAgent argument -> list of values (picked uniformly), a (low, high) tuple
+            (sampled uniformly), a (low, high, "log") tuple (sampled log-uniformly) or a single fixed value.
+        samples: Number of configurations to draw.
+        seed: Seed of the sampling generator.
+    Returns:
+        list: One dict of agent arguments per sample.
+    """
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(samples):
+        config = {}
+        for name, values in space.items():
+            if isinstance(values, list):
+                config[name] = values[rng.integers(len(values))]
+            elif isinstance(values, tuple):
+                low, high = values[:2]
+                if values[2:] == ("log",):
+                    config[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+                else:
+                    config[name] = float(rng.uniform(low, high))
+            else:
+                config[name] = values
+        configs.append(config)
+    return configs
+
+
+def _seeded_env(env_factory, seed):
+    """Fresh env whose shoe follows ``seed`` (a SeedSequence, which is left untouched)."""
+    # A generator seeded with the sequence does not spawn from it, so every env built from one seed deals the same shoes
+    env = env_factory()
+    env.shoe = Shoe(env.deck_count, rng=np.random.default_rng(seed))
+    return env
+
+
+def _evaluate(agent, eval_seed, eval_episodes, env_factory):
+    """Agreement with basic strategy and expected reward per round of an agent's greedy policy."""
+    agreement, weighted = policy_agreement(agent)
+    ev, _ = evaluate_agent_expected(agent, eval_episodes, env=_seeded_env(env_factory, eval_seed))
+    return {"agreement": agreement, "weighted_agreement": weighted, "ev": ev}
+
+
+def _run_rung(task):
+    """Train one configuration up to the rung's budget, then evaluate it."""
+    config_id, settings, agent, episodes, train_seed, eval_seed, eval_episodes, env_factory = task
+    start = time.perf_counter()
+    if agent is None:
+        agent = QLearningAgent(actions=ACTIONS, **settings)
+    agent_seed, env_seed = train_seed.spawn(2)
+    agent.seed(agent_seed)
+    metrics = TrainingMetrics(log_every=float("inf"), verbose=False)
+    train_agent(_seeded_env(env_factory, env_seed), agent, episodes=episodes, metrics=metrics)
+    result = _evaluate(agent, eval_seed, eval_episodes, env_factory)
+    result["mean_reward"] = metrics.rewards.mean
+    result["seconds"] = time.perf_counter() - start
+    return config_id, agent, result
+
+
+def successive_halving(configs, min_episodes=20000, eta=3, max_rungs=4, metric="weighted_agreement",
+                       eval_episodes=20000, workers=None, seed=None, env_factory=CustomBlackjackEnv, writer=None):
+    """
+    Train Q-learning configurations with successive halving.
+
+    Every surviving configuration is trained up to the rung's budget (``min_episodes``
+    times ``eta`` to the rung number, counted from the start), then scored by its
+    agreement with basic strategy and its expected reward (see evaluate_agent_expected)
+    relative to basic strategy on the same shoes. Only the best 1/eta carry on to the
+    next rung; the rest stop there. Runs are spread over a process pool and each
+    (configuration, rung) has its own seeds, so results do not depend on ``workers``.
+
+    Args:
+        configs: List of dicts of QLearningAgent arguments (see grid_configs and random_configs).
+        min_episodes: Training episodes of the first rung.
+        eta: Budget growth per rung and inverse fraction of configurations promoted.
+        max_rungs: Most rungs played; fewer when a single configuration is left.
+        metric: Result ranking the configurations, one of METRICS (higher is better).
+        eval_episodes: Rounds of expected-reward evaluation per configuration and rung.
+        workers: Number of worker processes (defaults to the CPU count; 1 runs in this process).
+        seed: Root seed of every training and evaluation stream.
+        env_factory: Callable returning a fresh CustomBlackjackEnv-like environment.
+        writer: Optional metrics writer (see open_writer) receiving every row.
+    Returns:
+        tuple: (rows, best) where rows hold one dict per (configuration, rung) with the
+        configuration's arguments, its results and whether it was promoted, and best is
+        the final row of the winning configuration.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric}; expected one of {METRICS}")
+    workers = workers or os.cpu_count()
+    config_seeds = np.random.SeedSequence(seed).spawn(len(configs) + 1)
+    eval_seed = config_seeds.pop()
+    basic_ev, _ = evaluate_agent_expected(BasicStrategyAgent(), eval_episodes,
+                                          env=_seeded_env(env_factory, eval_seed))
+
+    agents = {config_id: None for config_id in range(len(configs))}
+    trained = dict.fromkeys(agents, 0)
+    rows = []
+    pool = mp.get_context().Pool(workers) if workers > 1 else None
+    try:
+        for rung in range(max_rungs):
+            budget = min_episodes * eta ** rung
+            rung_seeds = {config_id: config_seeds[config_id].spawn(1)[0] for config_id in agents}
+            tasks = [(config_id, configs[config_id], agents[config_id], budget - trained[config_id],
+                      rung_seeds[config_id], eval_seed, eval_episodes, env_factory) for config_id in agents]
+            results = pool.map(_run_rung, tasks) if pool else [_run_rung(task) for task in tasks]
+
+            rung_rows = []
+            for config_id, agent, result in results:
+                agents[config_id] = agent
+                trained[config_id] = budget
+                result["ev_vs_basic"] = result["ev"] - basic_ev
+                rung_rows.append({"config": config_id, "rung": rung, "episodes": budget,
+                                  **configs[config_id], **result})
+            rung_rows.sort(key=lambda row: row[metric], reverse=True)
+            last = rung == max_rungs - 1 or len(rung_rows) <= 1
+            keep = 1 if last else max(1, len(rung_rows) // eta)
+            for place, row in enumerate(rung_rows):
+                row["status"] = ("best" if place == 0 else "final") if last else \
+                    ("promoted" if place < keep else "stopped")
+                rows.append(row)
+                if writer is not None:
+                    writer.write(row)
+            agents = {row["config"]: agents[row["config"]] for row in rung_rows[:keep]}
+            if last:
+                return rows, rung_rows[0]
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+def print_sweep_table(rows):
+    """Print one line per (configuration, rung), best first within each rung."""
+    settings = [name for name in rows[0] if name not in
+                {"config", "rung", "episodes", "status", "mean_reward", "seconds", *METRICS}]
+    print(f"{'config':>6} {'rung':>4} {'episodes':>9} " + " ".join(f"{name:>13}" for name in settings) +
+          f" {'agreement':>9} {'weighted':>8} {'ev':>8} {'vs basic':>8}  status")
+    for row in rows:
+        print(f"{row['config']:>6} {row['rung']:>4} {row['episodes']:>9} " +
+              " ".join(f"{row[name]:>13}" if isinstance(row[name], str) else f"{row[name]:>13.6g}"
+                       for name in settings) +
+              f" {row['agreement']:>9.3f} {row['weighted_agreement']:>8.3f} {row['ev']:>8.3f}"
+              f" {row['ev_vs_basic']:>8.3f}  {row['status']}")
+
+
+def add_sweep_arguments(parser):
+    """Add the sweep options to an argparse parser (shared by this module's CLI and main.py)."""
+    parser.add_argument("--search", choices=("grid", "random"), default="grid")
+    parser.add_argument("--samples", type=int, default=27, help="Configurations drawn by random search.")
+    parser.add_argument("--min-episodes", type=int, default=20000, help="Training episodes of the first rung.")
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--max-rungs", type=int, default=4)
+    parser.add_argument("--metric", choices=METRICS, default="weighted_agreement")
+    parser.add_argument("--eval-episodes", type=int, default=20000)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Results table (.csv or .jsonl); logs/sweep-<time>.csv by default.")
+
+
+def run_sweep(args):
+    """Sweep config.SWEEP_SPACE as configured by add_sweep_arguments and print the results table."""
+    from config import SWEEP_SPACE
+    if args.search == "grid":
+        configs = grid_configs(SWEEP_SPACE)
+    else:
+        configs = random_configs(SWEEP_SPACE, args.samples, seed=args.seed)
+    output = args.output or os.path.join("logs", time.strftime("sweep-%Y%m%d-%H%M%S.csv"))
+    writer = open_writer(output)
+    try:
+        rows, best = successive_halving(configs, args.min_episodes, args.eta, args.max_rungs, args.metric,
+                                        args.eval_episodes, args.workers, args.seed, writer=writer)
+    finally:
+        writer.close()
+    print_sweep_table(rows)
+    print(f"\nBest configuration {best['config']}: {configs[best['config']]} ({output})")
+    return rows, best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Successive-halving sweep of Q-learning hyperparameters.")
+    add_sweep_arguments(parser)
+    return run_sweep(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
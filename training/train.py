@@ -1,29 +1,82 @@
 #!/usr/bin/env python3
-def train_agent(env, agent, episodes=50000):
-    rewards = []
-    for episode in range(episodes):
-        obs = env.reset()
-        player_total, dealer_card, usable_ace = obs
-        player_cards = env.player
-        state = agent.state_representation(player_total, dealer_card, usable_ace, player_cards)
-        done = False
-        total_reward = 0
-        
-        while not done:
-            action = agent.choose_action(state)
-            next_obs, reward, done, _ = env.step(action)
-            next_player_total, next_dealer_card, next_usable_ace = next_obs
-            next_player_cards = env.player
-            next_state = agent.state_representation(next_player_total, next_dealer_card, next_usable_ace, next_player_cards)
-
-            agent.update(state, action, reward, next_state, done)
-
-            state = next_state
-            total_reward += reward
-
-        rewards.append(total_reward)
-
-        if episode % 1000 == 0:
-            print(f"Episode {episode}/{episodes} - Total Reward: {total_reward}")
-
-    return rewards
+from .metrics import TrainingMetrics
+
+
+def play_episode(env, agent):
+    """Play one training episode, updating the agent after every step, and return its total reward."""
+    obs = env.reset()
+    player_total, dealer_card, usable_ace = obs[:3]  # Count features, if any, follow
+    player_cards = env.player
+    state = agent.state_representation(player_total, dealer_card, usable_ace, player_cards)
+    done = False
+    total_reward = 0
+
+    while not done:
+        action = agent.choose_action(state)
+        next_obs, reward, done, _ = env.step(action)
+        next_player_total, next_dealer_card, next_usable_ace = next_obs[:3]
+        next_player_cards = env.player
+        next_state = agent.state_representation(next_player_total, next_dealer_card, next_usable_ace, next_player_cards)
+
+        agent.update(state, action, reward, next_state, done)
+
+        state = next_state
+        total_reward += reward
+
+    return total_reward
+
+
+def play_episode_all_actions(env, agent):
+    """
+    Play one training episode, updating the agent on every action at each decision, not just the one taken.
+
+    Every action of the agent is stepped from the same state with the same future
+    cards (see CustomBlackjackEnv.step_all) and the episode carries on along the
+    agent's choice. The agent needs one-step updates (QLearningAgent), and its
+    epsilon and alpha schedules advance once per update, i.e. once per action.
+    Returns the total reward of the path actually played.
+    """
+    obs = env.reset()
+    state = agent.state_representation(obs[0], obs[1], obs[2], env.player)
+    done = False
+    total_reward = 0
+
+    while not done:
+        action = agent.choose_action(state)
+        outcomes = env.step_all(agent.actions, follow=action)
+        for tried, (next_obs, reward, tried_done, hand) in outcomes.items():
+            next_state = agent.state_representation(next_obs[0], next_obs[1], next_obs[2], hand)
+            agent.update(state, tried, reward, next_state, tried_done)
+            if tried == action:
+                chosen = next_state, reward, tried_done
+        state, reward, done = chosen
+        total_reward += reward
+
+    return total_reward
+
+
+def train_agent(env, agent, episodes=50000, metrics=None, checkpointer=None, all_actions=False):
+    """
+    Train an agent on a single env.
+    Args:
+        env: The environment.
+        agent: Agent with state_representation, choose_action and update.
+        episodes: Number of episodes to play.
+        metrics: TrainingMetrics receiving every episode's reward (a printing one by default).
+        checkpointer: Optional Checkpointer saving the agent and the env's shoe periodically and at the end.
+        all_actions: Update every action at each decision from counterfactual steps
+            (see play_episode_all_actions) instead of only the action taken.
+    Returns:
+        TrainingMetrics: Streaming statistics of the run.
+    """
+    if metrics is None:
+        metrics = TrainingMetrics()
+    play = play_episode_all_actions if all_actions else play_episode
+    for episode in range(1, episodes + 1):
+        metrics.record(play(env, agent))
+        metrics.maybe_log(agent)
+        if checkpointer is not None:
+            checkpointer.maybe_save(agent, episode, env)
+    if checkpointer is not None:
+        checkpointer.save(agent, episodes, env)
+    return metrics